@@ -1,69 +1,78 @@
-"""Example storing short text with 3D embeddings."""
+"""Example storing short text with model embeddings."""
 
 from __future__ import annotations
 
-import json
-import subprocess
+import argparse
+import sys
 from pathlib import Path
 
-import httpx
-
-DB_URL = "http://127.0.0.1:8000"
-ASK_QWEN = Path(__file__).resolve().parents[1] / "scripts" / "ask_qwen.py"
-
-_SQL_HEADER = {"Accept": "application/json"}
+if __package__ in (None, ""):  # run as `python demo/text_vector_demo.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from vector_db.client import SurrealClient
+from vector_db.embedding_cache import CachedEmbedder, EmbeddingCache
+from vector_db.embeddings import OllamaEmbedder
+from vector_db.qwen import DEFAULT_QWEN_SERVER, QwenClient
 
-def _sql(client: httpx.Client, query: str) -> list:
-    res = client.post("/sql", headers=_SQL_HEADER, content=query)
-    res.raise_for_status()
-    return res.json()
+DB_URL = "http://127.0.0.1:8000"
+EMBED_CACHE = Path(__file__).with_name(".embed-cache.sqlite")
 
 
-def _get_embedding(text: str) -> list[float]:
-    prompt = (
-        "Return a JSON array with three float numbers between 0 and 1 "
-        f"representing an embedding for: {text!r}"
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--ask",
+        nargs="?",
+        const=DEFAULT_QWEN_SERVER,
+        metavar="URL",
+        help="Answer the query from the top result via a running qwen_server.py",
     )
-    result = subprocess.run(
-        ["python", str(ASK_QWEN), prompt], capture_output=True, text=True, check=True
+    parser.add_argument(
+        "--embed-cache",
+        type=Path,
+        default=EMBED_CACHE,
+        help="SQLite file caching embeddings across runs",
     )
-    return json.loads(result.stdout.strip())
-
-
-def main() -> None:
-    with httpx.Client(base_url=DB_URL, auth=("root", "root"), timeout=10.0) as c:
-        setup = [
-            "DEFINE TABLE item SCHEMALESS;",
-            "DEFINE INDEX idx_emb ON item FIELDS embedding MTREE DIMENSION 3;",
-        ]
-        _sql(c, "USE NS test DB test; " + " ".join(setup))
+    args = parser.parse_args()
 
+    with (
+        SurrealClient(DB_URL) as c,
+        OllamaEmbedder() as ollama,
+        EmbeddingCache(args.embed_cache) as cache,
+    ):
+        embedder = CachedEmbedder(ollama, cache)
         docs = [
             "The quick brown fox jumps over the lazy dog",
             "SurrealDB unifies multiple data models",
             "Vectors enable similarity search",
         ]
-        for i, doc in enumerate(docs):
-            vec = _get_embedding(doc)
-            q = (
-                "USE NS test DB test; "
-                f"CREATE item:{i} SET text = {json.dumps(doc)}, embedding = {vec};"
+        query = "What lets me find similar sentences?"
+        *vectors, query_vec = embedder.embed([*docs, query])
+
+        setup = [
+            "DEFINE TABLE item SCHEMALESS;",
+            "DEFINE INDEX idx_emb ON item FIELDS embedding "
+            f"MTREE DIMENSION {embedder.dimension};",
+        ]
+        c.raw(" ".join(setup))  # DEFINEs error harmlessly once they exist
+
+        for i, (doc, vec) in enumerate(zip(docs, vectors)):
+            c.query(
+                "CREATE type::thing('item', $id) SET text = $text, embedding = $vec;",
+                {"id": i, "text": doc, "vec": vec},
             )
-            _sql(c, q)
 
-        query_vec = _get_embedding("What lets me find similar sentences?")
-        res = _sql(
-            c,
-            f"USE NS test DB test; SELECT text FROM item WHERE embedding <|3|> {query_vec} LIMIT 1;",
-        )
-        top = (
-            res[0]["result"][0]["text"]
-            if res and res[0].get("result")
-            else "(no match)"
+        [rows] = c.query(
+            "SELECT text FROM item WHERE embedding <|3|> $vec LIMIT 1;",
+            {"vec": query_vec},
         )
+        top = rows[0]["text"] if rows else "(no match)"
         print("Top result:", top)
 
+    if args.ask:
+        with QwenClient(args.ask) as qwen:
+            print("Answer:", qwen.ask(f"Context: {top}\n\nQuestion: {query}"))
+
 
 if __name__ == "__main__":
     main()
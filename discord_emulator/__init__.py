@@ -1,5 +1,14 @@
 """Local Discord emulator package."""
 
+from .ratelimit import RateLimiter
 from .server import DiscordEmulator, run
+from .storage import MemoryStore, MessageStore, SurrealStore
 
-__all__ = ["DiscordEmulator", "run"]
+__all__ = [
+    "DiscordEmulator",
+    "MemoryStore",
+    "MessageStore",
+    "RateLimiter",
+    "SurrealStore",
+    "run",
+]
@@ -0,0 +1,132 @@
+"""Per-connection gateway send queues and shard routing."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+import uuid
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from aiohttp import web
+
+SEND_QUEUE_SIZE = 256
+SLOW_CONSUMER_POLICIES = ("drop", "disconnect")
+# Discord closes sessions it cannot keep up with using a 4000-range code
+SLOW_CONSUMER_CLOSE_CODE = 4008
+SESSION_TIMEOUT_CLOSE_CODE = 4009
+REPLAY_BUFFER_SIZE = 1024
+
+
+def shard_for(guild_id: str, num_shards: int) -> int:
+    """Discord's shard formula: ``(guild_id >> 22) % num_shards``."""
+    return (int(guild_id) >> 22) % num_shards
+
+
+class Session:
+    """
+    A gateway session that outlives its sockets until it expires.
+
+    Every frame dispatched to the session is kept in a ring buffer of the
+    last `buffer_size` ``(s, frame)`` pairs, so a RESUME can replay what a
+    dropped connection missed.
+    """
+
+    def __init__(
+        self,
+        shard_id: int = 0,
+        num_shards: int = 1,
+        buffer_size: int = REPLAY_BUFFER_SIZE,
+    ) -> None:
+        self.id = uuid.uuid4().hex
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self.buffer: Deque[Tuple[int, str]] = deque(maxlen=buffer_size)
+        self.evicted = 0  # highest sequence number pushed out of the buffer
+        self.connection: Optional[GatewayConnection] = None
+        self.disconnected_at: Optional[float] = None
+
+    def owns(self, guild_id: Optional[str]) -> bool:
+        if guild_id is None:
+            return True
+        return shard_for(guild_id, self.num_shards) == self.shard_id
+
+    def send(self, seq: int, frame: str) -> bool:
+        """Buffer a dispatch and push it to the live connection, if any."""
+        if len(self.buffer) == self.buffer.maxlen:
+            self.evicted = self.buffer[0][0]
+        self.buffer.append((seq, frame))
+        return self.connection is not None and self.connection.push(frame)
+
+    def missed(self, seq: int) -> Optional[List[Tuple[int, str]]]:
+        """``(s, frame)`` pairs after `seq`, or None if some were evicted."""
+        if seq < self.evicted:
+            return None
+        return [(s, frame) for s, frame in self.buffer if s > seq]
+
+
+class GatewayConnection:
+    """
+    One gateway socket with a bounded queue drained by its own writer task.
+
+    `push` never waits: frames that do not fit in the queue are counted in
+    `dropped` and, with the ``disconnect`` policy, the socket is closed
+    instead.  A slow client therefore never holds up the sender.
+    """
+
+    def __init__(
+        self,
+        ws: web.WebSocketResponse,
+        queue_size: int = SEND_QUEUE_SIZE,
+        slow_consumer: str = "drop",
+    ) -> None:
+        if slow_consumer not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(
+                f"slow_consumer must be one of {SLOW_CONSUMER_POLICIES}, "
+                f"got {slow_consumer!r}"
+            )
+        self.ws = ws
+        self.slow_consumer = slow_consumer
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(queue_size)
+        self.session: Optional[Session] = None
+        self.last_heartbeat = time.monotonic()
+        self.dropped = 0
+        self.closing = False
+        self.writer = asyncio.create_task(self._write())
+
+    def push(self, frame: str) -> bool:
+        """Queue an encoded frame; return False if it was dropped."""
+        if self.closing:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.slow_consumer == "disconnect":
+                self._shut()
+            return False
+
+    def _shut(self) -> None:
+        self.closing = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def _write(self) -> None:
+        try:
+            while (frame := await self.queue.get()) is not None:
+                await self.ws.send_str(frame)
+        except ConnectionResetError:
+            return
+        if self.closing:
+            await self.ws.close(
+                code=SLOW_CONSUMER_CLOSE_CODE, message=b"Slow consumer"
+            )
+
+    async def close(self) -> None:
+        self.closing = True
+        self.writer.cancel()
+        with contextlib.suppress(asyncio.CancelledError, ConnectionResetError):
+            await self.writer
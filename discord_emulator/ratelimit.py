@@ -0,0 +1,178 @@
+"""Discord-style token-bucket rate limits for the emulator's REST routes."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from aiohttp import web
+
+# route name -> (requests, per seconds); buckets are per major parameter
+DEFAULT_ROUTE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "get_channels": (10, 10.0),
+    "post_message": (5, 5.0),
+    "patch_message": (5, 5.0),
+    "delete_message": (5, 5.0),
+    "post_webhook": (5, 2.0),
+}
+DEFAULT_GLOBAL_LIMIT: Tuple[int, float] = (50, 1.0)
+MAJOR_PARAMS = ("channel_id", "guild_id", "app_id")
+_SWEEP_EVERY = 1024
+
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """Parse ``LIMIT/SECONDS`` (e.g. ``5/5``) into a limit tuple."""
+    count, _, window = spec.partition("/")
+    return int(count), float(window or 1)
+
+
+class TokenBucket:
+    """`limit` tokens refilled continuously over `window` seconds."""
+
+    def __init__(self, limit: int, window: float, now: float) -> None:
+        self.limit = limit
+        self.rate = limit / window
+        self.tokens = float(limit)
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def remaining(self) -> int:
+        return int(self.tokens)
+
+    @property
+    def reset_after(self) -> float:
+        """Seconds until the bucket is full again."""
+        return (self.limit - self.tokens) / self.rate
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until one whole token is available."""
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Per-route buckets keyed by major parameter, plus one global bucket.
+
+    A request is admitted only if both its route bucket and the global
+    bucket hold a token; a rejected request consumes nothing.  Routes not
+    in `route_limits` only count against the global limit.
+    """
+
+    def __init__(
+        self,
+        route_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        global_limit: Optional[Tuple[int, float]] = DEFAULT_GLOBAL_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.route_limits = dict(
+            DEFAULT_ROUTE_LIMITS if route_limits is None else route_limits
+        )
+        self.clock = clock
+        now = clock()
+        self.global_bucket = TokenBucket(*global_limit, now) if global_limit else None
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.limited = 0
+        self._created = 0
+
+    def _bucket(self, route: str, major: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get((route, major))
+        if bucket is None:
+            self._created += 1
+            if self._created % _SWEEP_EVERY == 0:
+                self._sweep(now)
+            bucket = TokenBucket(*self.route_limits[route], now)
+            self.buckets[(route, major)] = bucket
+        return bucket
+
+    def _sweep(self, now: float) -> None:
+        # a full bucket holds no state worth keeping
+        for key, bucket in list(self.buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.limit:
+                del self.buckets[key]
+
+    def check(self, route: str, major: str) -> Tuple[bool, Dict[str, str], Dict]:
+        """
+        Try to admit one request; return ``(allowed, headers, body)``.
+
+        `body` is the 429 JSON payload when the request is rejected.
+        """
+        now = self.clock()
+        bucket = self._bucket(route, major, now) if route in self.route_limits else None
+        headers: Dict[str, str] = {}
+        for b in (bucket, self.global_bucket):
+            if b is not None:
+                b.refill(now)
+
+        if self.global_bucket is not None and self.global_bucket.tokens < 1:
+            retry = self.global_bucket.retry_after
+            self.limited += 1
+            headers.update(
+                {
+                    "Retry-After": str(math.ceil(retry)),
+                    "X-RateLimit-Global": "true",
+                    "X-RateLimit-Scope": "global",
+                }
+            )
+            return False, headers, _limited_body(retry, True)
+
+        if bucket is not None:
+            headers.update(
+                {
+                    "X-RateLimit-Bucket": route,
+                    "X-RateLimit-Limit": str(bucket.limit),
+                }
+            )
+            if bucket.tokens < 1:
+                retry = bucket.retry_after
+                self.limited += 1
+                headers.update(
+                    {
+                        "X-RateLimit-Remaining": "0",
+                        "X-RateLimit-Reset": f"{time.time() + retry:.3f}",
+                        "X-RateLimit-Reset-After": f"{retry:.3f}",
+                        "Retry-After": str(math.ceil(retry)),
+                        "X-RateLimit-Scope": "user",
+                    }
+                )
+                return False, headers, _limited_body(retry, False)
+            bucket.tokens -= 1
+            reset_after = bucket.reset_after
+            headers.update(
+                {
+                    "X-RateLimit-Remaining": str(bucket.remaining),
+                    "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+                    "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                }
+            )
+        if self.global_bucket is not None:
+            self.global_bucket.tokens -= 1
+        return True, headers, {}
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        route = request.match_info.route.name
+        if route is None:  # unnamed routes (the gateway) are not limited
+            return await handler(request)
+        info = request.match_info
+        major = next((info[p] for p in MAJOR_PARAMS if p in info), "")
+        allowed, headers, body = self.check(route, major)
+        if not allowed:
+            return web.json_response(body, status=429, headers=headers)
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+
+def _limited_body(retry_after: float, is_global: bool) -> Dict:
+    return {
+        "message": "You are being rate limited.",
+        "retry_after": round(retry_after, 3),
+        "global": is_global,
+    }
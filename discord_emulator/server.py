@@ -3,18 +3,62 @@
 
 from __future__ import annotations
 
+import argparse
 import asyncio
+import contextlib
 import json
+import time
 import uuid
-from typing import Dict, List
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from aiohttp import WSMsgType, web
 
+from vector_db.client import AsyncSurrealClient
+from vector_db.metrics import Metrics
+
+from .gateway import (
+    REPLAY_BUFFER_SIZE,
+    SEND_QUEUE_SIZE,
+    SESSION_TIMEOUT_CLOSE_CODE,
+    SLOW_CONSUMER_POLICIES,
+    GatewayConnection,
+    Session,
+)
+from .ratelimit import (
+    DEFAULT_GLOBAL_LIMIT,
+    DEFAULT_ROUTE_LIMITS,
+    RateLimiter,
+    parse_limit,
+)
+from .storage import MemoryStore, MessageStore, SurrealStore
+
+SNAPSHOT_INTERVAL = 30.0
+HEARTBEAT_INTERVAL = 5000  # milliseconds, as sent in HELLO
+HEARTBEAT_GRACE = 1.5  # missed-heartbeat allowance before a socket is a zombie
+SESSION_TTL = 120.0  # seconds a disconnected session stays resumable
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 class DiscordEmulator:
-    """In-memory Discord HTTP and Gateway emulator."""
+    """
+    In-memory Discord HTTP and Gateway emulator.
 
-    def __init__(self) -> None:
+    Gateway counters, send queue depths and REST route latencies are kept
+    in `metrics` and served in the Prometheus text format at ``/metrics``.
+    """
+
+    def __init__(
+        self,
+        store: Optional[MessageStore] = None,
+        send_queue_size: int = SEND_QUEUE_SIZE,
+        slow_consumer: str = "drop",
+        rate_limiter: Optional[RateLimiter] = None,
+        heartbeat_interval: int = HEARTBEAT_INTERVAL,
+        replay_buffer_size: int = REPLAY_BUFFER_SIZE,
+        session_ttl: float = SESSION_TTL,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
         self.guilds: Dict[str, Dict] = {
             "1": {
                 "id": "1",
@@ -28,25 +72,70 @@ class DiscordEmulator:
                 ],
             }
         }
-        self.messages: Dict[str, Dict[str, Dict]] = {}
-        self.websockets: List[web.WebSocketResponse] = []
-        self.heartbeat_interval = 5000
+        # channel id -> guild id, so lookups do not scan every guild
+        self.channels: Dict[str, str] = {
+            c["id"]: g["id"] for g in self.guilds.values() for c in g["channels"]
+        }
+        self.store: MessageStore = store if store is not None else MemoryStore()
+        self.connections: List[GatewayConnection] = []
+        self.send_queue_size = send_queue_size
+        self.slow_consumer = slow_consumer
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.heartbeat_interval = heartbeat_interval
+        self.replay_buffer_size = replay_buffer_size
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, Session] = {}
+        self._closing: Set[asyncio.Task] = set()
         self.sequence = 0
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._describe_metrics()
 
-    def _rate_headers(self) -> Dict[str, str]:
-        return {
-            "X-RateLimit-Bucket": "emulator",
-            "X-RateLimit-Limit": "5",
-            "X-RateLimit-Remaining": "5",
-        }
+    def _describe_metrics(self) -> None:
+        m = self.metrics
+        m.gauge(
+            "gateway_connections",
+            lambda: len(self.connections),
+            "Open gateway sockets",
+        )
+        m.gauge(
+            "gateway_sessions",
+            lambda: len(self.sessions),
+            "Live and resumable gateway sessions",
+        )
+        m.gauge(
+            "gateway_send_queue_frames",
+            lambda: sum(conn.queue.qsize() for conn in self.connections),
+            "Frames waiting in all send queues",
+        )
+        m.gauge(
+            "gateway_send_queue_max",
+            lambda: max((c.queue.qsize() for c in self.connections), default=0),
+            "Frames waiting in the fullest send queue",
+        )
+        m.describe("gateway_connections_total", "Gateway sockets accepted")
+        m.describe("gateway_events_total", "Dispatch frames queued, by event")
+        m.describe(
+            "gateway_events_dropped_total",
+            "Dispatch frames not queued for a live connection, by event",
+        )
+        m.describe("http_request_seconds", "REST handler latency, by route")
+        m.describe("http_requests_total", "REST responses, by route and status")
+
+    def add_guild(self, guild_id: str, name: str) -> None:
+        self.guilds[guild_id] = {"id": guild_id, "name": name, "channels": []}
+
+    def add_channel(self, guild_id: str, channel: Dict) -> None:
+        self.guilds[guild_id]["channels"].append(channel)
+        self.channels[channel["id"]] = guild_id
 
     async def gateway(self, request: web.Request) -> web.WebSocketResponse:
         ws = web.WebSocketResponse()
         await ws.prepare(request)
-        self.websockets.append(ws)
-        await ws.send_json(
-            {"op": 10, "d": {"heartbeat_interval": self.heartbeat_interval}}
-        )
+        conn = GatewayConnection(ws, self.send_queue_size, self.slow_consumer)
+        self.connections.append(conn)
+        self.metrics.inc("gateway_connections_total")
+        hello = {"op": 10, "d": {"heartbeat_interval": self.heartbeat_interval}}
+        conn.push(json.dumps(hello))
 
         try:
             async for msg in ws:
@@ -55,42 +144,193 @@ class DiscordEmulator:
                 data = json.loads(msg.data)
                 op = data.get("op")
                 if op == 1:  # Heartbeat
-                    await ws.send_json({"op": 11})
+                    conn.last_heartbeat = time.monotonic()
+                    conn.push(json.dumps({"op": 11}))
                 elif op == 2:  # Identify
-                    self.sequence += 1
-                    payload = {
-                        "op": 0,
-                        "t": "READY",
-                        "s": self.sequence,
-                        "d": {
-                            "user": {"id": "999", "username": "bot"},
-                            "guilds": [{"id": g["id"]} for g in self.guilds.values()],
-                        },
-                    }
-                    await ws.send_json(payload)
+                    if not await self._identify(conn, data.get("d") or {}, request):
+                        break
+                elif op == 6:  # Resume
+                    await self._resume(conn, data.get("d") or {})
         finally:
-            self.websockets.remove(ws)
+            self.connections.remove(conn)
+            session = conn.session
+            if session is not None and session.connection is conn:
+                session.connection = None
+                session.disconnected_at = time.monotonic()
+            await conn.close()
         return ws
 
-    async def _broadcast(self, event: Dict) -> None:
-        if not self.websockets:
+    async def _identify(
+        self, conn: GatewayConnection, d: Dict, request: web.Request
+    ) -> bool:
+        shard = d.get("shard") or [0, 1]
+        shard_id, num_shards = int(shard[0]), int(shard[1])
+        if not 0 <= shard_id < num_shards:
+            await conn.ws.close(code=4010, message=b"Invalid shard")
+            return False
+        session = Session(shard_id, num_shards, self.replay_buffer_size)
+        self.sessions[session.id] = session
+        session.connection, conn.session = conn, session
+        ready = {
+            "user": {"id": "999", "username": "bot"},
+            "guilds": [{"id": gid} for gid in self.guilds if session.owns(gid)],
+            "session_id": session.id,
+            "resume_gateway_url": f"ws://{request.host}/gateway",
+            "shard": [shard_id, num_shards],
+        }
+        self._send(session, "READY", ready)
+        return True
+
+    async def _resume(self, conn: GatewayConnection, d: Dict) -> None:
+        """
+        Re-attach `conn` to a session and replay the frames it missed.
+
+        The replay awaits queue space instead of dropping, and the session
+        is only switched to `conn` once no buffered frame is left, so no
+        event dispatched during the replay is lost or reordered.
+        """
+        session = self.sessions.get(d.get("session_id", ""))
+        if session is None:
+            conn.push(json.dumps({"op": 9, "d": False}))  # Invalid Session
             return
-        for ws in list(self.websockets):
-            try:
-                await ws.send_json(event)
-            except ConnectionResetError:
-                self.websockets.remove(ws)
+        old, session.connection = session.connection, None
+        if old is not None:  # superseded zombie
+            self._close_later(old, 4000, b"Session resumed elsewhere")
+        seq = int(d.get("seq") or 0)
+        while True:
+            missed = session.missed(seq)
+            if missed is None:
+                conn.push(json.dumps({"op": 9, "d": False}))
+                return
+            if not missed:
+                break
+            for seq, frame in missed:
+                await conn.queue.put(frame)
+        session.connection, conn.session = conn, session
+        session.disconnected_at = None
+        self._send(session, "RESUMED", {})
+
+    def _send(self, session: Session, event: str, data: Dict) -> bool:
+        self.sequence += 1
+        frame = json.dumps({"op": 0, "t": event, "s": self.sequence, "d": data})
+        sent = session.send(self.sequence, frame)
+        self._count(event, int(sent), int(not sent))
+        return sent
+
+    def _dispatch(self, event: str, data: Dict, guild_id: Optional[str] = None) -> int:
+        """
+        Encode `event` once and hand it to every session that should see it.
+
+        Guild events only go to sessions of the shard owning `guild_id`.
+        Each session buffers the frame for RESUME and queues it on its live
+        connection; returns how many connections it was queued for.  Slow
+        consumers are skipped rather than waited on.
+        """
+        self.sequence += 1
+        frame = json.dumps({"op": 0, "t": event, "s": self.sequence, "d": data})
+        sent = dropped = 0
+        for session in self.sessions.values():
+            if session.owns(guild_id):
+                if session.send(self.sequence, frame):
+                    sent += 1
+                elif session.connection is not None:
+                    dropped += 1
+        self._count(event, sent, dropped)
+        return sent
+
+    def _count(self, event: str, sent: int, dropped: int) -> None:
+        if sent:
+            self.metrics.inc("gateway_events_total", sent, event=event)
+        if dropped:
+            self.metrics.inc("gateway_events_dropped_total", dropped, event=event)
+
+    def _close_later(self, conn: GatewayConnection, code: int, message: bytes) -> None:
+        # a zombie never answers the close handshake; do not wait on it here
+        task = asyncio.create_task(conn.ws.close(code=code, message=message))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def reap(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Close connections that missed their heartbeats and drop expired sessions.
+
+        A connection is a zombie once no heartbeat arrived for
+        `HEARTBEAT_GRACE` intervals; its session stays resumable for
+        `session_ttl` seconds.  Returns ``(zombies, expired sessions)``.
+        """
+        now = time.monotonic() if now is None else now
+        timeout = self.heartbeat_interval / 1000 * HEARTBEAT_GRACE
+        zombies = 0
+        for conn in self.connections:
+            if not conn.closing and now - conn.last_heartbeat > timeout:
+                conn.closing = True
+                self._close_later(
+                    conn, SESSION_TIMEOUT_CLOSE_CODE, b"Session timed out"
+                )
+                zombies += 1
+        expired = [
+            sid
+            for sid, session in self.sessions.items()
+            if session.connection is None
+            and session.disconnected_at is not None
+            and now - session.disconnected_at > self.session_ttl
+        ]
+        for sid in expired:
+            del self.sessions[sid]
+        return zombies, len(expired)
+
+    async def _reaper(self, app: web.Application) -> AsyncIterator[None]:
+        async def loop() -> None:
+            while True:
+                await asyncio.sleep(self.heartbeat_interval / 1000 / 2)
+                self.reap()
+
+        task = asyncio.create_task(loop())
+        yield
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    @web.middleware
+    async def _observe(self, request: web.Request, handler) -> web.StreamResponse:
+        """Time every named REST route, including rate-limited requests."""
+        route = request.match_info.route.name
+        if route is None:
+            return await handler(request)
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as exc:
+            status = exc.status
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("http_request_seconds", elapsed, route=route)
+            self.metrics.inc("http_requests_total", route=route, status=str(status))
+
+    async def get_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.metrics.render().encode(),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
+
+    @property
+    def dropped_events(self) -> int:
+        return sum(conn.dropped for conn in self.connections)
 
     async def get_channels(self, request: web.Request) -> web.Response:
         gid = request.match_info["guild_id"]
         guild = self.guilds.get(gid)
         if not guild:
             return web.json_response({"message": "Unknown Guild"}, status=404)
-        return web.json_response(guild["channels"], headers=self._rate_headers())
+        return web.json_response(guild["channels"])
 
     async def post_message(self, request: web.Request) -> web.Response:
         cid = request.match_info["channel_id"]
-        if not any(cid == c["id"] for g in self.guilds.values() for c in g["channels"]):
+        if cid not in self.channels:
             return web.json_response({"message": "Unknown Channel"}, status=404)
         data = await request.json()
         message_id = str(uuid.uuid4())
@@ -99,66 +339,209 @@ class DiscordEmulator:
             "channel_id": cid,
             "content": data.get("content", ""),
         }
-        self.messages.setdefault(cid, {})[message_id] = msg
-        await self._broadcast({"op": 0, "t": "MESSAGE_CREATE", "d": msg})
-        return web.json_response(msg, headers=self._rate_headers())
+        await self.store.add(msg)
+        self._dispatch("MESSAGE_CREATE", msg, self.channels[cid])
+        return web.json_response(msg)
 
     async def patch_message(self, request: web.Request) -> web.Response:
         cid = request.match_info["channel_id"]
         mid = request.match_info["message_id"]
-        channel = self.messages.get(cid, {})
-        if mid not in channel:
-            return web.json_response({"message": "Unknown Message"}, status=404)
         data = await request.json()
-        channel[mid].update({"content": data.get("content", "")})
-        return web.json_response(channel[mid], headers=self._rate_headers())
+        msg = await self.store.update(cid, mid, {"content": data.get("content", "")})
+        if msg is None:
+            return web.json_response({"message": "Unknown Message"}, status=404)
+        return web.json_response(msg)
 
     async def delete_message(self, request: web.Request) -> web.Response:
         cid = request.match_info["channel_id"]
         mid = request.match_info["message_id"]
-        channel = self.messages.get(cid, {})
-        if mid not in channel:
+        if not await self.store.delete(cid, mid):
             return web.json_response({"message": "Unknown Message"}, status=404)
-        channel.pop(mid)
-        return web.json_response({}, headers=self._rate_headers())
+        return web.json_response({})
 
     async def post_interaction(self, request: web.Request) -> web.Response:
         data = await request.json()
-        return web.json_response(
-            {"type": 4, "data": data}, headers=self._rate_headers()
-        )
+        return web.json_response({"type": 4, "data": data})
 
     async def post_webhook(self, request: web.Request) -> web.Response:
         return await self.post_message(request)
 
     def create_app(self) -> web.Application:
-        app = web.Application()
+        app = web.Application(
+            middlewares=[self._observe, self.rate_limiter.middleware]
+        )
+        app.cleanup_ctx.append(self._reaper)
         app.router.add_get("/gateway", self.gateway)
-        app.router.add_get("/api/v10/guilds/{guild_id}/channels", self.get_channels)
+        app.router.add_get("/metrics", self.get_metrics)
+        app.router.add_get(
+            "/api/v10/guilds/{guild_id}/channels",
+            self.get_channels,
+            name="get_channels",
+        )
         app.router.add_post(
-            "/api/v10/channels/{channel_id}/messages", self.post_message
+            "/api/v10/channels/{channel_id}/messages",
+            self.post_message,
+            name="post_message",
         )
         app.router.add_patch(
-            "/api/v10/channels/{channel_id}/messages/{message_id}", self.patch_message
+            "/api/v10/channels/{channel_id}/messages/{message_id}",
+            self.patch_message,
+            name="patch_message",
         )
         app.router.add_delete(
-            "/api/v10/channels/{channel_id}/messages/{message_id}", self.delete_message
+            "/api/v10/channels/{channel_id}/messages/{message_id}",
+            self.delete_message,
+            name="delete_message",
+        )
+        app.router.add_post(
+            "/api/v10/interactions", self.post_interaction, name="post_interaction"
+        )
+        app.router.add_post(
+            "/api/v10/webhooks/{app_id}/{token}",
+            self.post_webhook,
+            name="post_webhook",
         )
-        app.router.add_post("/api/v10/interactions", self.post_interaction)
-        app.router.add_post("/api/v10/webhooks/{app_id}/{token}", self.post_webhook)
         return app
 
 
-async def run(port: int = 8001) -> None:
-    emulator = DiscordEmulator()
+async def run(
+    port: int = 8001,
+    store: Optional[MessageStore] = None,
+    snapshot_interval: float = SNAPSHOT_INTERVAL,
+    **options: Any,
+) -> None:
+    """Serve an emulator built with `store` and `options` until cancelled."""
+    emulator = DiscordEmulator(store, **options)
     runner = web.AppRunner(emulator.create_app())
     await runner.setup()
     site = web.TCPSite(runner, "127.0.0.1", port)
     await site.start()
     print(f"Discord emulator running on http://127.0.0.1:{port}")
-    while True:
-        await asyncio.sleep(3600)
+    try:
+        while True:
+            await asyncio.sleep(snapshot_interval)
+            await emulator.store.snapshot()
+    finally:
+        await emulator.store.close()
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Discord emulator")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        help="JSON file the in-memory store snapshots to and recovers from",
+    )
+    parser.add_argument("--snapshot-interval", type=float, default=SNAPSHOT_INTERVAL)
+    parser.add_argument(
+        "--max-per-channel",
+        type=int,
+        help="Keep only the newest N messages per channel",
+    )
+    parser.add_argument(
+        "--send-queue-size",
+        type=int,
+        default=SEND_QUEUE_SIZE,
+        help="Gateway frames buffered per connection before it counts as slow",
+    )
+    parser.add_argument(
+        "--slow-consumer",
+        choices=SLOW_CONSUMER_POLICIES,
+        default="drop",
+        help="Drop events for, or disconnect, connections whose queue is full",
+    )
+    parser.add_argument(
+        "--heartbeat-interval",
+        type=int,
+        default=HEARTBEAT_INTERVAL,
+        help="Milliseconds; sockets silent for 1.5 intervals are closed",
+    )
+    parser.add_argument(
+        "--replay-buffer",
+        type=int,
+        default=REPLAY_BUFFER_SIZE,
+        help="Dispatched events kept per session for RESUME",
+    )
+    parser.add_argument(
+        "--session-ttl",
+        type=float,
+        default=SESSION_TTL,
+        help="Seconds a disconnected session can still be resumed",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="ROUTE=N/SECONDS",
+        help="Override a route bucket, e.g. post_message=50/1 (repeatable)",
+    )
+    parser.add_argument(
+        "--global-limit",
+        default="{}/{}".format(*DEFAULT_GLOBAL_LIMIT),
+        metavar="N/SECONDS",
+        help="Requests per window across all routes",
+    )
+    parser.add_argument(
+        "--no-rate-limits",
+        action="store_true",
+        help="Disable route and global rate limits",
+    )
+    parser.add_argument(
+        "--surreal-url",
+        help="Persist messages in SurrealDB at this URL instead of memory",
+    )
+    parser.add_argument("--surreal-user", default="root")
+    parser.add_argument("--surreal-password", default="root")
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        metavar="PATH",
+        help="On shutdown, write a JSON summary of the /metrics data here",
+    )
+    args = parser.parse_args()
+    if args.no_rate_limits:
+        limiter = RateLimiter({}, None)
+    else:
+        routes = dict(DEFAULT_ROUTE_LIMITS)
+        for spec in args.rate_limit:
+            route, _, limit = spec.partition("=")
+            routes[route] = parse_limit(limit)
+        limiter = RateLimiter(routes, parse_limit(args.global_limit))
+
+    metrics = Metrics()
+
+    async def serve() -> None:
+        if args.surreal_url:
+            client = AsyncSurrealClient(
+                args.surreal_url,
+                args.surreal_user,
+                args.surreal_password,
+                metrics=metrics,
+            )
+            store: MessageStore = SurrealStore(client)
+        else:
+            store = MemoryStore(args.snapshot, args.max_per_channel)
+        await run(
+            args.port,
+            store,
+            args.snapshot_interval,
+            send_queue_size=args.send_queue_size,
+            slow_consumer=args.slow_consumer,
+            rate_limiter=limiter,
+            heartbeat_interval=args.heartbeat_interval,
+            replay_buffer_size=args.replay_buffer,
+            session_ttl=args.session_ttl,
+            metrics=metrics,
+        )
+
+    try:
+        asyncio.run(serve())
+    finally:
+        if args.metrics_json:
+            metrics.dump(args.metrics_json)
 
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    main()
@@ -0,0 +1,191 @@
+"""Pluggable message stores for the Discord emulator."""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol
+
+from vector_db.client import AsyncSurrealClient
+
+
+class MessageStore(Protocol):
+    """Storage for channel messages, keyed by channel id then message id."""
+
+    async def add(self, msg: Dict) -> None: ...
+
+    async def get(self, channel_id: str, message_id: str) -> Optional[Dict]: ...
+
+    async def update(
+        self, channel_id: str, message_id: str, fields: Dict
+    ) -> Optional[Dict]: ...
+
+    async def delete(self, channel_id: str, message_id: str) -> bool: ...
+
+    async def list(self, channel_id: str) -> List[Dict]: ...
+
+    async def snapshot(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class MemoryStore:
+    """
+    In-process store with optional JSON snapshots.
+
+    With `path`, `snapshot` writes every message atomically (temp file +
+    rename) and a new store recovers from the file on start-up.
+    `max_per_channel` caps each channel, evicting its oldest messages, so
+    long soak runs do not grow without bound.
+    """
+
+    def __init__(
+        self, path: Optional[Path] = None, max_per_channel: Optional[int] = None
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.max_per_channel = max_per_channel
+        self.messages: Dict[str, OrderedDict[str, Dict]] = {}
+        self.dirty = False
+        if self.path and self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for cid, msgs in data.items():
+                self.messages[cid] = OrderedDict((m["id"], m) for m in msgs)
+
+    async def add(self, msg: Dict) -> None:
+        channel = self.messages.setdefault(msg["channel_id"], OrderedDict())
+        channel[msg["id"]] = msg
+        if self.max_per_channel is not None:
+            while len(channel) > self.max_per_channel:
+                channel.popitem(last=False)
+        self.dirty = True
+
+    async def get(self, channel_id: str, message_id: str) -> Optional[Dict]:
+        return self.messages.get(channel_id, {}).get(message_id)
+
+    async def update(
+        self, channel_id: str, message_id: str, fields: Dict
+    ) -> Optional[Dict]:
+        msg = self.messages.get(channel_id, {}).get(message_id)
+        if msg is None:
+            return None
+        msg.update(fields)
+        self.dirty = True
+        return msg
+
+    async def delete(self, channel_id: str, message_id: str) -> bool:
+        if self.messages.get(channel_id, {}).pop(message_id, None) is None:
+            return False
+        self.dirty = True
+        return True
+
+    async def list(self, channel_id: str) -> List[Dict]:
+        return list(self.messages.get(channel_id, {}).values())
+
+    async def snapshot(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        data = {cid: list(msgs.values()) for cid, msgs in self.messages.items()}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    async def close(self) -> None:
+        await self.snapshot()
+
+
+class SurrealStore:
+    """
+    Messages persisted as records of a SurrealDB table.
+
+    Record ids are the message ids and ``channel_id`` is indexed, so
+    lookups and per-channel listings stay cheap.  Every write goes to the
+    database, so recovery is whatever the server's storage engine keeps;
+    `snapshot` is a no-op.
+    """
+
+    def __init__(
+        self, client: AsyncSurrealClient, table: str = "discord_message"
+    ) -> None:
+        self.client = client
+        self.table = table
+        self._ready = False
+
+    async def _setup(self) -> None:
+        if not self._ready:
+            await self.client.raw(
+                f"DEFINE TABLE {self.table} SCHEMALESS; "
+                f"DEFINE INDEX idx_{self.table}_channel ON {self.table} "
+                "FIELDS channel_id;"
+            )
+            self._ready = True
+
+    @staticmethod
+    def _row(row: Dict) -> Dict:
+        # record ids come back as "table:⟨id⟩"; the message keeps its own id
+        row = dict(row)
+        row["id"] = row.pop("message_id")
+        return row
+
+    async def add(self, msg: Dict) -> None:
+        await self._setup()
+        await self.client.query(
+            "CREATE type::thing($table, $id) CONTENT $msg;",
+            {"table": self.table, "id": msg["id"], "msg": _content(msg)},
+        )
+
+    async def get(self, channel_id: str, message_id: str) -> Optional[Dict]:
+        await self._setup()
+        [rows] = await self.client.query(
+            "SELECT * FROM type::thing($table, $id) WHERE channel_id = $cid;",
+            {"table": self.table, "id": message_id, "cid": channel_id},
+        )
+        return self._row(rows[0]) if rows else None
+
+    async def update(
+        self, channel_id: str, message_id: str, fields: Dict
+    ) -> Optional[Dict]:
+        await self._setup()
+        [rows] = await self.client.query(
+            "UPDATE type::thing($table, $id) MERGE $fields "
+            "WHERE channel_id = $cid RETURN AFTER;",
+            {
+                "table": self.table,
+                "id": message_id,
+                "cid": channel_id,
+                "fields": _content(fields),
+            },
+        )
+        return self._row(rows[0]) if rows else None
+
+    async def delete(self, channel_id: str, message_id: str) -> bool:
+        await self._setup()
+        [rows] = await self.client.query(
+            "DELETE type::thing($table, $id) WHERE channel_id = $cid RETURN BEFORE;",
+            {"table": self.table, "id": message_id, "cid": channel_id},
+        )
+        return bool(rows)
+
+    async def list(self, channel_id: str) -> List[Dict]:
+        await self._setup()
+        [rows] = await self.client.query(
+            "SELECT * FROM type::table($table) WHERE channel_id = $cid;",
+            {"table": self.table, "cid": channel_id},
+        )
+        return [self._row(row) for row in rows]
+
+    async def snapshot(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def _content(msg: Dict) -> Dict:
+    """Move ``id`` aside: SurrealDB reserves it for the record id."""
+    content = {k: v for k, v in msg.items() if k != "id"}
+    if "id" in msg:
+        content["message_id"] = msg["id"]
+    return content
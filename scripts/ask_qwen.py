@@ -1,6 +1,83 @@
 import argparse
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TextIO
+
 from openai import OpenAI
 
+if __package__ in (None, ""):  # run as `python scripts/ask_qwen.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from vector_db.client import DEFAULT_DATABASE, DEFAULT_NAMESPACE, SurrealClient
+from vector_db.embeddings import (
+    DEFAULT_HASH_DIMENSION,
+    DEFAULT_OLLAMA_MODEL,
+    OLLAMA_URL,
+    EmbeddingProvider,
+    build_provider,
+)
+from vector_db.rag import (
+    DEFAULT_ANSWER_CACHE,
+    DEFAULT_CONTEXT_TOKENS,
+    DEFAULT_TOP_K,
+    AnswerCache,
+    build_messages,
+    retrieve,
+)
+
+
+def stream_answer(
+    client: OpenAI, model: str, messages: list[dict], out: TextIO = sys.stdout
+) -> str:
+    """Write the completion to `out` token by token; return the full text."""
+    parts = []
+    stream = client.chat.completions.create(model=model, messages=messages, stream=True)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            out.write(delta)
+            out.flush()
+            parts.append(delta)
+    out.write("\n")
+    return "".join(parts)
+
+
+def ask(
+    client: OpenAI,
+    model: str,
+    question: str,
+    db: SurrealClient | None = None,
+    embedder: EmbeddingProvider | None = None,
+    cache: AnswerCache | None = None,
+    table: str = "docs",
+    k: int = DEFAULT_TOP_K,
+    max_context_tokens: int = DEFAULT_CONTEXT_TOKENS,
+    out: TextIO = sys.stdout,
+) -> str:
+    """
+    Answer `question`, streaming to `out`.
+
+    With `db` and `embedder` the prompt carries the top-`k` docs chunks
+    (hybrid BM25 + kNN) cut to `max_context_tokens`; a `cache` hit on the
+    same question and retrieved ids is printed without calling the model.
+    """
+    if db is None:
+        return stream_answer(client, model, [{"role": "user", "content": question}], out)
+    chunks = retrieve(db, embedder, question, table, k)
+    key = AnswerCache.key(model, question, chunks)
+    if cache is not None and (answer := cache.get(key)) is not None:
+        out.write(answer + "\n")
+        return answer
+    answer = stream_answer(
+        client, model, build_messages(question, chunks, max_context_tokens), out
+    )
+    if cache is not None:
+        cache.put(key, answer)
+    return answer
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Query a local Qwen model")
@@ -10,16 +87,75 @@ def main() -> None:
         default="qwen3:0.6b",
         help="Ollama model identifier",
     )
+    parser.add_argument(
+        "--rag",
+        action="store_true",
+        help="Answer from the top-k chunks of the indexed docs table",
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="root")
+    parser.add_argument("--namespace", default=DEFAULT_NAMESPACE)
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument("--table", default="docs")
+    parser.add_argument("-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument(
+        "--max-context-tokens",
+        type=int,
+        default=DEFAULT_CONTEXT_TOKENS,
+        help="Prompt token budget for question plus retrieved context",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=["hash", "fhash", "ollama"],
+        default="hash",
+        help="Embedding provider; must match the one used by index_docs.py",
+    )
+    parser.add_argument("--embed-model", default=DEFAULT_OLLAMA_MODEL)
+    parser.add_argument("--dimension", type=int, default=DEFAULT_HASH_DIMENSION)
+    parser.add_argument("--ollama-url", default=OLLAMA_URL)
+    parser.add_argument(
+        "--answer-cache-size",
+        type=int,
+        default=DEFAULT_ANSWER_CACHE,
+        help="Answers kept for repeated questions in interactive mode",
+    )
     parser.add_argument("prompt", nargs="*", help="Prompt text")
     args = parser.parse_args()
 
     client = OpenAI(base_url="http://localhost:11434/v1", api_key="ollama")
-    prompt = " ".join(args.prompt) if args.prompt else input(f"{args.model}> ")
-    response = client.chat.completions.create(
-        model=args.model,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    print(response.choices[0].message.content)
+    embedder = None
+    if args.rag:
+        embedder = build_provider(
+            args.embedder, args.embed_model, args.dimension, args.ollama_url
+        )
+    with (
+        SurrealClient(
+            args.url, args.user, args.password, args.namespace, args.database
+        )
+        if args.rag
+        else nullcontext()
+    ) as db:
+        options = {
+            "db": db,
+            "embedder": embedder,
+            "cache": AnswerCache(args.answer_cache_size),
+            "table": args.table,
+            "k": args.k,
+            "max_context_tokens": args.max_context_tokens,
+        }
+
+        if args.prompt:
+            ask(client, args.model, " ".join(args.prompt), **options)
+            return
+        # interactive: keep asking until EOF so repeated questions hit the cache
+        while True:
+            try:
+                prompt = input(f"{args.model}> ")
+            except EOFError:
+                break
+            if prompt.strip():
+                ask(client, args.model, prompt, **options)
 
 
 if __name__ == "__main__":
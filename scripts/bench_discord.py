@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Load-test the Discord emulator: REST throughput and gateway delivery latency."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+from contextlib import suppress
+from pathlib import Path
+
+import httpx
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+
+if __package__ in (None, ""):  # run as `python scripts/bench_discord.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from discord_emulator import DiscordEmulator, RateLimiter
+from vector_db.metrics import percentiles_ms
+from vector_db.server import free_port
+
+GUILD_ID = "1"
+FIRST_CHANNEL = 10
+STARTUP_TIMEOUT = 15.0
+
+
+def _worker(port: int, channels: int, rate_limits: bool) -> None:
+    """Serve one emulator process; all workers share `port` via SO_REUSEPORT."""
+    from aiohttp import web
+
+    async def serve() -> None:
+        emulator = DiscordEmulator(
+            rate_limiter=None if rate_limits else RateLimiter({}, None)
+        )
+        for i in range(1, channels):
+            emulator.add_channel(
+                GUILD_ID, {"id": str(FIRST_CHANNEL + i), "name": f"load-{i}", "type": 0}
+            )
+        runner = web.AppRunner(emulator.create_app())
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, reuse_port=True).start()
+        await asyncio.Event().wait()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve())
+
+
+def spawn_workers(
+    workers: int, channels: int, rate_limits: bool
+) -> tuple[str, list[multiprocessing.Process]]:
+    """Start `workers` emulator processes on one free port; return its URL."""
+    port = free_port()
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=_worker, args=(port, channels, rate_limits), daemon=True)
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            httpx.get(f"{url}/api/v10/guilds/{GUILD_ID}/channels", timeout=1.0)
+            return url, procs
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                stop_workers(procs)
+                raise RuntimeError("emulator workers did not start") from None
+            time.sleep(0.1)
+
+
+def stop_workers(procs: list[multiprocessing.Process]) -> None:
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        proc.join(5)
+
+
+class GatewayClient:
+    """One identified gateway connection that records MESSAGE_CREATE latency."""
+
+    def __init__(self, url: str, sent: dict[str, float]) -> None:
+        self.url = url.replace("http", "ws", 1) + "/gateway"
+        self.sent = sent
+        self.latencies: list[float] = []
+        self.ws: ClientConnection | None = None
+
+    async def connect(self) -> None:
+        self.ws = await connect(self.url, max_size=None)
+        hello = json.loads(await self.ws.recv())
+        self.interval = hello["d"]["heartbeat_interval"] / 1000
+        await self.ws.send(json.dumps({"op": 2, "d": {"token": "load"}}))
+        while json.loads(await self.ws.recv()).get("t") != "READY":
+            pass
+
+    async def run(self) -> None:
+        assert self.ws is not None
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.ws.send(json.dumps({"op": 1, "d": None}))
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            async for raw in self.ws:
+                now = time.perf_counter()
+                event = json.loads(raw)
+                if event.get("t") == "MESSAGE_CREATE":
+                    sent = self.sent.get(event["d"]["content"])
+                    if sent is not None:
+                        self.latencies.append(now - sent)
+        except ConnectionClosed:
+            pass
+        finally:
+            beat.cancel()
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
+
+
+async def load(
+    url: str,
+    gateways: int,
+    posters: int,
+    messages: int,
+    drain: float,
+) -> dict:
+    """Drive `messages` posts from `posters` tasks while `gateways` listen."""
+    sent: dict[str, float] = {}
+    rest: list[float] = []
+    counts = {"ok": 0, "errors": 0, "rate_limited": 0}
+
+    async with httpx.AsyncClient(
+        base_url=url,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=posters, max_keepalive_connections=posters),
+    ) as http:
+        res = await http.get(f"/api/v10/guilds/{GUILD_ID}/channels")
+        channels = [c["id"] for c in res.json()]
+
+        clients = [GatewayClient(url, sent) for _ in range(gateways)]
+        await asyncio.gather(*(c.connect() for c in clients))
+        listeners = [asyncio.create_task(c.run()) for c in clients]
+
+        numbers = iter(range(messages))
+
+        async def poster() -> None:
+            for n in numbers:
+                content = f"load-{n}"
+                cid = channels[n % len(channels)]
+                while True:
+                    sent[content] = start = time.perf_counter()
+                    r = await http.post(
+                        f"/api/v10/channels/{cid}/messages", json={"content": content}
+                    )
+                    if r.status_code != 429:
+                        break
+                    counts["rate_limited"] += 1
+                    await asyncio.sleep(float(r.json().get("retry_after", 1)))
+                rest.append(time.perf_counter() - start)
+                counts["ok" if r.status_code == 200 else "errors"] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(poster() for _ in range(posters)))
+        elapsed = time.perf_counter() - start
+
+        expected = counts["ok"] * gateways
+        deadline = time.perf_counter() + drain
+        while time.perf_counter() < deadline:
+            if sum(len(c.latencies) for c in clients) >= expected:
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*(c.close() for c in clients))
+        for task in listeners:
+            task.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+    delivered = list(itertools.chain.from_iterable(c.latencies for c in clients))
+    return {
+        "rest": {
+            **counts,
+            "seconds": elapsed,
+            "msgs_per_sec": counts["ok"] / elapsed if elapsed else 0.0,
+            **percentiles_ms(rest),
+        },
+        "gateway": {
+            "connections": gateways,
+            "expected": expected,
+            "delivered": len(delivered),
+            "dropped": expected - len(delivered),
+            **percentiles_ms(delivered),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8001")
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="Start private emulator worker processes instead of using --url",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="With --spawn, emulator processes sharing one port (SO_REUSEPORT)",
+    )
+    parser.add_argument(
+        "--channels",
+        type=int,
+        default=4,
+        help="With --spawn, channels in the test guild to spread posts across",
+    )
+    parser.add_argument(
+        "--rate-limits",
+        action="store_true",
+        help="With --spawn, keep the emulator's default rate limits",
+    )
+    parser.add_argument("--gateways", type=int, default=50)
+    parser.add_argument("--posters", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument(
+        "--drain",
+        type=float,
+        default=5.0,
+        help="Seconds to wait for outstanding gateway deliveries",
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_discord.json"))
+    args = parser.parse_args()
+
+    procs: list[multiprocessing.Process] = []
+    url = args.url
+    if args.spawn:
+        url, procs = spawn_workers(args.workers, args.channels, args.rate_limits)
+    try:
+        results = asyncio.run(
+            load(url, args.gateways, args.posters, args.messages, args.drain)
+        )
+    finally:
+        stop_workers(procs)
+
+    if args.spawn and args.workers > 1:
+        # each worker has its own state: a gateway only sees posts its worker
+        # handled, so delivery counts are not comparable to a single process
+        results["gateway"]["note"] = "per-worker delivery; dropped is not meaningful"
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "params": {
+            key: getattr(args, key)
+            for key in ("workers", "channels", "gateways", "posters", "messages")
+        },
+        **results,
+    }
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
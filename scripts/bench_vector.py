@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Benchmark SurrealDB vector search: MTREE vs HNSW vs brute force."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+
+if __package__ in (None, ""):  # run as `python scripts/bench_vector.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from vector_db.client import AsyncSurrealClient, SurrealClient
+from vector_db.knn import KnnIndex, recall_at_k
+from vector_db.metrics import percentiles_ms
+from vector_db.quantize import DEFAULT_OVERSAMPLE, QUANT_MODES, recall_memory_report
+from vector_db.server import SurrealServer
+
+BENCH_DATABASE = "bench"
+INSERT_BATCH = 1000
+DEFAULT_INDEXES = ["brute", "mtree:capacity=40", "hnsw:efc=150,m=12,ef=40"]
+
+
+def parse_index(spec: str) -> tuple[str, dict[str, int]]:
+    """Split ``kind:key=value,...`` into its kind and integer parameters."""
+    kind, _, rest = spec.partition(":")
+    kind = kind.lower()
+    if kind not in ("brute", "mtree", "hnsw"):
+        raise ValueError(f"unknown index kind in {spec!r}")
+    params = {}
+    for item in filter(None, rest.split(",")):
+        key, _, value = item.partition("=")
+        params[key.lower()] = int(value)
+    return kind, params
+
+
+def index_ddl(table: str, kind: str, params: dict[str, int], dimension: int) -> str:
+    """Return the DEFINE INDEX statement for an index spec."""
+    ddl = (
+        f"DEFINE INDEX idx_{table}_emb ON {table} FIELDS embedding "
+        f"{kind.upper()} DIMENSION {dimension} DIST EUCLIDEAN"
+    )
+    if kind == "mtree" and "capacity" in params:
+        ddl += f" CAPACITY {params['capacity']}"
+    if kind == "hnsw":
+        for key in ("efc", "m"):
+            if key in params:
+                ddl += f" {key.upper()} {params[key]}"
+    return ddl + ";"
+
+
+def knn_operator(kind: str, params: dict[str, int], k: int) -> str:
+    """Return the ``<|...|>`` operator matching an index spec."""
+    if kind == "brute":
+        return f"<|{k},EUCLIDEAN|>"
+    if kind == "hnsw":
+        return f"<|{k},{params.get('ef', 40)}|>"
+    return f"<|{k}|>"
+
+
+def _load(client: SurrealClient, table: str, vectors: np.ndarray) -> float:
+    """Replace `table` with `vectors` (ids 0..n-1); return seconds spent."""
+    start = time.perf_counter()
+    client.query(f"REMOVE TABLE IF EXISTS {table}; DEFINE TABLE {table} SCHEMALESS;")
+    for lo in range(0, len(vectors), INSERT_BATCH):
+        rows = [
+            {"id": i, "embedding": vec}
+            for i, vec in enumerate(vectors[lo : lo + INSERT_BATCH].tolist(), lo)
+        ]
+        client.query(f"INSERT INTO {table} $rows;", {"rows": rows})
+    return time.perf_counter() - start
+
+
+async def _qps(
+    url: str,
+    auth: tuple[str, str],
+    sql: str,
+    vectors: list[list[float]],
+    concurrency: int,
+) -> float:
+    """Run `sql` once per vector with `concurrency` workers; return queries/s."""
+    pending = iter(vectors)
+
+    async with AsyncSurrealClient(
+        url,
+        *auth,
+        database=BENCH_DATABASE,
+        timeout=60.0,
+        max_connections=concurrency,
+    ) as client:
+
+        async def worker() -> None:
+            for vector in pending:
+                await client.query(sql, {"vector": vector})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return len(vectors) / (time.perf_counter() - start)
+
+
+def bench_case(
+    url: str,
+    auth: tuple[str, str],
+    n: int,
+    dimension: int,
+    indexes: list[str],
+    k: int,
+    num_queries: int,
+    concurrency: int,
+    seed: int,
+) -> list[dict]:
+    """Load `n` random vectors and measure every index spec against them."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((n, dimension), dtype=np.float32)
+    queries = rng.random((num_queries, dimension), dtype=np.float32)
+    table = f"bench_{n}_{dimension}"
+    exact, _ = KnnIndex([f"{table}:{i}" for i in range(n)], vectors).search(queries, k)
+
+    with SurrealClient(
+        url, *auth, database=BENCH_DATABASE, timeout=600.0
+    ) as client:
+        return _bench_table(
+            client, auth, table, vectors, queries, exact, indexes, k, concurrency
+        )
+
+
+def quantization_case(
+    n: int,
+    dimension: int,
+    modes: list[str],
+    k: int,
+    num_queries: int,
+    oversample: int,
+    seed: int,
+    full_in_record: bool = True,
+) -> list[dict]:
+    """Recall@k vs stored bytes per vector for each quantization mode."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((n, dimension), dtype=np.float32)
+    queries = rng.random((num_queries, dimension), dtype=np.float32)
+    rows = recall_memory_report(
+        vectors, queries, k, modes, oversample, full_in_record=full_in_record
+    )
+    for row in rows:
+        row.update({"n": n, "dimension": dimension, "k": k, "oversample": oversample})
+        row["full_in_record"] = full_in_record
+        print(json.dumps(row), flush=True)
+    return rows
+
+
+def _bench_table(
+    client: SurrealClient,
+    auth: tuple[str, str],
+    table: str,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    exact: list[list[str]],
+    indexes: list[str],
+    k: int,
+    concurrency: int,
+) -> list[dict]:
+    n, dimension = vectors.shape
+    load_s = _load(client, table, vectors)
+    results = []
+    for spec in indexes:
+        kind, params = parse_index(spec)
+        client.query(f"REMOVE INDEX IF EXISTS idx_{table}_emb ON {table};")
+        build_s = 0.0
+        if kind != "brute":
+            start = time.perf_counter()
+            client.query(index_ddl(table, kind, params, dimension))
+            build_s = time.perf_counter() - start
+
+        op = knn_operator(kind, params, k)
+        sql = f"SELECT id FROM {table} WHERE embedding {op} $vector;"
+        vectors = queries.tolist()
+        latencies = []
+        found = []
+        for vector in vectors:
+            start = time.perf_counter()
+            [rows] = client.query(sql, {"vector": vector})
+            latencies.append(time.perf_counter() - start)
+            found.append([row["id"] for row in rows])
+        qps = asyncio.run(_qps(client.url, auth, sql, vectors, concurrency))
+        results.append(
+            {
+                "index": spec,
+                "n": n,
+                "dimension": dimension,
+                "k": k,
+                "load_s": load_s,
+                "build_s": build_s,
+                **percentiles_ms(latencies),
+                "qps": qps,
+                "concurrency": concurrency,
+                f"recall@{k}": recall_at_k(found, exact),
+            }
+        )
+        print(json.dumps(results[-1]), flush=True)
+    client.query(f"REMOVE TABLE IF EXISTS {table};")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="root")
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="Start a private bin/surreal on a free port instead of using --url",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--dims", type=int, nargs="+", default=[3, 128])
+    parser.add_argument(
+        "--index",
+        dest="indexes",
+        nargs="+",
+        default=DEFAULT_INDEXES,
+        help="Index specs: brute, mtree[:capacity=N], hnsw[:efc=N,m=N,ef=N]",
+    )
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--quantize",
+        nargs="+",
+        choices=QUANT_MODES,
+        default=[],
+        help="Also report recall vs memory for these quantization modes",
+    )
+    parser.add_argument(
+        "--oversample",
+        type=int,
+        default=DEFAULT_OVERSAMPLE,
+        help="Candidates fetched per result before exact re-ranking",
+    )
+    parser.add_argument(
+        "--full-file",
+        action="store_true",
+        help="Size quantized records for full vectors kept in a FullPrecisionFile",
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    args = parser.parse_args()
+    for spec in args.indexes:
+        parse_index(spec)
+
+    auth = (args.user, args.password)
+    server = SurrealServer(user=args.user, password=args.password)
+    with server if args.spawn else nullcontext():
+        url = server.url if args.spawn else args.url
+        with SurrealClient(url, *auth) as client:
+            version = client.http.get("/version").text.strip()
+        results = [
+            row
+            for n in args.sizes
+            for dim in args.dims
+            for row in bench_case(
+                url,
+                auth,
+                n,
+                dim,
+                args.indexes,
+                args.k,
+                args.queries,
+                args.concurrency,
+                args.seed,
+            )
+        ]
+    report = {
+        "surreal_version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "params": {
+            key: getattr(args, key)
+            for key in ("sizes", "dims", "indexes", "k", "queries", "concurrency", "seed")
+        },
+        "results": results,
+    }
+    if args.quantize:
+        report["quantization"] = [
+            row
+            for n in args.sizes
+            for dim in args.dims
+            for row in quantization_case(
+                n,
+                dim,
+                args.quantize,
+                args.k,
+                args.queries,
+                args.oversample,
+                args.seed,
+                full_in_record=not args.full_file,
+            )
+        ]
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,63 +4,634 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import hashlib
 import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterable, Iterator
 
-import httpx
+if __package__ in (None, ""):  # run as `python scripts/index_docs.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-_SQL_HEADER = {"Accept": "application/json"}
+from vector_db.client import (
+    DEFAULT_DATABASE,
+    DEFAULT_NAMESPACE,
+    AsyncSurrealClient,
+    SurrealClient,
+)
+from vector_db.embedding_cache import (
+    DEFAULT_CACHE_ENTRIES,
+    CachedEmbedder,
+    EmbeddingCache,
+)
+from vector_db.embeddings import (
+    DEFAULT_EMBED_BATCH,
+    DEFAULT_HASH_DIMENSION,
+    DEFAULT_OLLAMA_MODEL,
+    OLLAMA_URL,
+    EmbeddingProvider,
+    HashEmbedder,
+    build_provider,
+)
+from vector_db.hybrid import text_index_ddl
+from vector_db.knn_cache import KnnCache
+from vector_db.metrics import Metrics, timer
+from vector_db.quantize import (
+    QUANT_MODES,
+    FullPrecisionFile,
+    quantize_records,
+    quantized_index_ddl,
+)
+from vector_db.rpc import RpcClient
+from vector_db.shard import ShardedClient, shard_of
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_BYTES = 4 * 1024 * 1024
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_CHUNK_OVERLAP = 256
+STAGE_METRIC = "index_stage_seconds"
+SHARD_IN_FLIGHT = 2  # insert batches queued or running per shard
 
 
 def simple_embedding(text: str) -> list[float]:
     """Return a deterministic 3-dimensional embedding for *text*."""
-    digest = hashlib.sha256(text.encode()).digest()
-    return [b / 255 for b in digest[:3]]
+    return HashEmbedder().embed([text])[0]
+
+
+def _find_docs(base: Path) -> list[Path]:
+    """Return `base` itself or every *.md / *.mdx below it."""
+    # allow single‐file invocation:
+    if base.is_file():
+        return [base]
+    if base.is_dir():
+        return list(base.rglob("*.md")) + list(base.rglob("*.mdx"))
+    raise FileNotFoundError(f"{base!r} does not exist")
+
+
+def _setup_query(
+    table: str, dimension: int = 3, quantize: str | None = None
+) -> str:
+    """
+    Return the statements that ensure `table` and its indexes exist.
+
+    Besides the MTREE vector index, ``text`` gets a BM25 full-text index
+    so keyword and hybrid queries (`vector_db.hybrid`) avoid table scans.
+    With `quantize`, the vector index is built over the quantized codes
+    instead (see `vector_db.quantize`).  Every DEFINE is ``IF NOT EXISTS``,
+    so re-runs succeed and the statements can go through ``client.query``,
+    which raises on a genuinely broken definition.
+    """
+    if quantize:
+        vector_index = quantized_index_ddl(table, quantize, dimension)
+    else:
+        vector_index = (
+            f"DEFINE INDEX IF NOT EXISTS idx_{table}_emb ON {table} "
+            f"FIELDS embedding MTREE DIMENSION {dimension};"
+        )
+    setup = [
+        f"DEFINE TABLE IF NOT EXISTS {table} SCHEMALESS;",
+        vector_index,
+        text_index_ddl(table),
+    ]
+    return " ".join(setup)
+
+
+@contextmanager
+def _invalidating(knn_cache: KnnCache | None, table: str) -> Iterator[None]:
+    """Drop cached kNN results for `table` once the writes in the block end."""
+    try:
+        yield
+    finally:
+        if knn_cache is not None:
+            knn_cache.invalidate(table)
+
+
+def _doc_record(path: Path) -> dict:
+    """Read `path` and return the (not yet embedded) record stored for it."""
+    return {"path": str(path), "text": path.read_text(encoding="utf-8", errors="ignore")}
+
+
+def embed_records(
+    records: Iterable[dict],
+    embedder: EmbeddingProvider,
+    batch_size: int = DEFAULT_EMBED_BATCH,
+    metrics: Metrics | None = None,
+) -> Iterator[dict]:
+    """
+    Fill in each record's ``embedding``, `batch_size` texts per provider call.
+
+    Each call is timed as the ``embed`` stage in `metrics`.
+    """
+    batch: list[dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from _embed_batch(batch, embedder, metrics)
+            batch = []
+    if batch:
+        yield from _embed_batch(batch, embedder, metrics)
+
+
+def _embed_batch(
+    batch: list[dict], embedder: EmbeddingProvider, metrics: Metrics | None = None
+) -> list[dict]:
+    with timer(metrics, STAGE_METRIC, stage="embed"):
+        vectors = embedder.embed([record["text"] for record in batch])
+    for record, vector in zip(batch, vectors):
+        record["embedding"] = vector
+    return batch
+
+
+def iter_chunks(
+    path: Path, max_bytes: int, overlap: int = DEFAULT_CHUNK_OVERLAP
+) -> Iterator[tuple[int, str]]:
+    """
+    Stream `path` and yield ``(byte_offset, text)`` chunks.
+
+    A new chunk starts at every markdown heading outside a code fence, or
+    once the current chunk would exceed `max_bytes`.  In the latter case the
+    trailing lines of the previous chunk, up to `overlap` bytes, are repeated
+    at the start of the next one.  Lines longer than `max_bytes` are split.
+    """
+    if not 0 <= overlap < max_bytes:
+        raise ValueError("overlap must be in [0, max_bytes)")
+    lines: list[tuple[int, bytes]] = []
+    size = 0
+    offset = 0
+    fenced = False
+    with path.open("rb") as fh:
+        for line in fh:
+            heading = not fenced and line.startswith(b"#")
+            if line.lstrip().startswith((b"```", b"~~~")):
+                fenced = not fenced
+            for i in range(0, len(line), max_bytes):
+                piece = line[i : i + max_bytes]
+                if lines and (heading or size + len(piece) > max_bytes):
+                    yield lines[0][0], b"".join(b for _, b in lines).decode(
+                        "utf-8", errors="ignore"
+                    )
+                    if heading:
+                        lines, size = [], 0
+                    else:
+                        # keep the tail for overlap, but never past `max_bytes`
+                        while lines and (
+                            size > overlap or size + len(piece) > max_bytes
+                        ):
+                            size -= len(lines.pop(0)[1])
+                heading = False
+                lines.append((offset + i, piece))
+                size += len(piece)
+            offset += len(line)
+    if lines:
+        yield lines[0][0], b"".join(b for _, b in lines).decode(
+            "utf-8", errors="ignore"
+        )
+
+
+def _timed_reads(records: Iterable[dict], metrics: Metrics | None) -> Iterator[dict]:
+    """Yield `records`, timing how long each takes to produce as ``read``."""
+    if metrics is None:
+        yield from records
+        return
+    it = iter(records)
+    while True:
+        start = time.perf_counter()
+        record = next(it, None)
+        if record is None:
+            return
+        metrics.observe(STAGE_METRIC, time.perf_counter() - start, stage="read")
+        yield record
+
+
+def _chunk_records(
+    path: Path, max_bytes: int, overlap: int = DEFAULT_CHUNK_OVERLAP
+) -> Iterator[dict]:
+    """Yield one record per chunk of `path`, pointing back at its parent."""
+    for n, (offset, text) in enumerate(iter_chunks(path, max_bytes, overlap)):
+        yield {"path": str(path), "chunk": n, "offset": offset, "text": text}
+
+
+def doc_id(path: Path) -> str:
+    """Return the deterministic record id used for `path`."""
+    return hashlib.sha1(str(path).encode()).hexdigest()
 
 
-def _sql(client: httpx.Client, query: str) -> list[dict]:
-    """Send a SQL POST; return the parsed JSON payload."""
-    res = client.post("/sql", headers=_SQL_HEADER, content=query)
-    res.raise_for_status()
-    return res.json()
+def load_manifest(path: Path) -> dict[str, dict]:
+    """Return the manifest stored at `path`, or an empty one."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(path: Path, manifest: dict[str, dict]) -> None:
+    """Atomically write `manifest` to `path`."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def batch_records(
+    records: Iterable[dict],
+    max_records: int = DEFAULT_BATCH_SIZE,
+    max_bytes: int = DEFAULT_BATCH_BYTES,
+) -> Iterator[list[str]]:
+    """
+    Group `records` into lists of JSON-encoded objects.
+
+    A batch is closed once it holds `max_records` records or adding the next
+    record would push its encoded size past `max_bytes`.  A single record
+    larger than `max_bytes` still gets a batch of its own.
+    """
+    if max_records < 1:
+        raise ValueError("max_records must be at least 1")
+    batch: list[str] = []
+    size = 0
+    for record in records:
+        encoded = json.dumps(record)
+        if batch and (len(batch) >= max_records or size + len(encoded) > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        yield batch
+
+
+def _insert_query(table: str, batch: list[str]) -> str:
+    """Return a transaction that INSERTs a batch of encoded records."""
+    return (
+        "BEGIN TRANSACTION; "
+        f"INSERT INTO {table} [{','.join(batch)}]; "
+        "COMMIT TRANSACTION;"
+    )
+
+
+def _insert_batch(client: SurrealClient, table: str, batch: list[str]) -> None:
+    """INSERT a batch of encoded records in a single transaction."""
+    client.query(_insert_query(table, batch))
 
 
 def index_docs(
     base: Path,
-    client: httpx.Client,
+    client: SurrealClient,
     table: str = "docs",
-) -> None:
+    bulk: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    batch_bytes: int = DEFAULT_BATCH_BYTES,
+    chunk_bytes: int = 0,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    embedder: EmbeddingProvider | None = None,
+    quantize: str | None = None,
+    full_precision: FullPrecisionFile | None = None,
+    knn_cache: KnnCache | None = None,
+    metrics: Metrics | None = None,
+) -> int:
     """
     Walk `base` (file or directory), find all *.md and *.mdx,
     compute embeddings, and CREATE into SurrealDB `table`.
+
+    With `bulk`, records are packed into transactional ``INSERT`` batches
+    of at most `batch_size` records / `batch_bytes` bytes instead of one
+    request per file.  With `chunk_bytes`, each file is streamed and stored
+    as one record per chunk (see `iter_chunks`) carrying its ``path`` and
+    byte ``offset``.  Vectors come from `embedder` (default `HashEmbedder`).
+    With `quantize` (``int8`` or ``binary``), the indexed ``embedding``
+    holds quantized codes and the full vector is kept in a side field, or
+    in `full_precision` when given; search such tables with
+    `vector_db.quantize.quantized_search`.  Entries for `table` in
+    `knn_cache` are invalidated once writing ends.  With `metrics`, the
+    ``read``, ``embed`` and ``upload`` stages are timed into the
+    ``index_stage_seconds`` histogram.  Returns the number of files indexed.
     """
-    # allow single‐file invocation:
-    if base.is_file():
-        files = [base]
-    elif base.is_dir():
-        files = list(base.rglob("*.md")) + list(base.rglob("*.mdx"))
+    embedder = embedder or HashEmbedder()
+    files = _find_docs(base)
+    client.query(_setup_query(table, embedder.dimension, quantize))
+
+    if chunk_bytes:
+        records = (
+            record
+            for path in files
+            for record in _chunk_records(path, chunk_bytes, chunk_overlap)
+        )
     else:
-        raise FileNotFoundError(f"{base!r} does not exist")
+        records = (_doc_record(path) for path in files)
+    records = embed_records(_timed_reads(records, metrics), embedder, metrics=metrics)
+    if quantize:
+        records = quantize_records(records, quantize, full_precision)
 
-    # ensure table + index exist
-    setup = [
-        f"DEFINE TABLE {table} SCHEMALESS;",
-        f"DEFINE INDEX idx_{table}_emb ON {table} FIELDS embedding MTREE DIMENSION 3;",
-    ]
-    _sql(client, "USE NS test DB test; " + " ".join(setup))
+    with _invalidating(knn_cache, table):
+        if bulk:
+            for batch in batch_records(records, batch_size, batch_bytes):
+                with timer(metrics, STAGE_METRIC, stage="upload"):
+                    _insert_batch(client, table, batch)
+        else:
+            for record in records:
+                with timer(metrics, STAGE_METRIC, stage="upload"):
+                    client.query(
+                        "CREATE type::table($table) CONTENT $record;",
+                        {"table": table, "record": record},
+                    )
+    return len(files)
+
+
+def index_docs_sharded(
+    base: Path,
+    sharded: ShardedClient,
+    table: str = "docs",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    batch_bytes: int = DEFAULT_BATCH_BYTES,
+    chunk_bytes: int = 0,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    embedder: EmbeddingProvider | None = None,
+    metrics: Metrics | None = None,
+) -> int:
+    """
+    Like `index_docs` with `bulk`, but hash-partitioned across `sharded`.
+
+    Every shard gets the same table and indexes; each record goes to
+    ``shard_of(path)``, so all chunks of a file land on one shard.  Batches
+    for different shards are inserted in parallel, with at most
+    `SHARD_IN_FLIGHT` in flight per shard: the next batch for a busy shard
+    waits for its oldest one.  `metrics` gets the same ``read``, ``embed``
+    and ``upload`` stage timings as `index_docs`.  Query the result with
+    `ShardedClient.knn`.
+    """
+    embedder = embedder or HashEmbedder()
+    files = _find_docs(base)
+    sharded.query(_setup_query(table, embedder.dimension))
+
+    if chunk_bytes:
+        records = (
+            record
+            for path in files
+            for record in _chunk_records(path, chunk_bytes, chunk_overlap)
+        )
+    else:
+        records = (_doc_record(path) for path in files)
+
+    shards = len(sharded)
+    pending: list[list[str]] = [[] for _ in range(shards)]
+    sizes = [0] * shards
+    in_flight: list[deque[Future]] = [deque() for _ in range(shards)]
+
+    def upload(client: SurrealClient, batch: list[str]) -> None:
+        with timer(metrics, STAGE_METRIC, stage="upload"):
+            _insert_batch(client, table, batch)
+
+    def flush(shard: int) -> None:
+        if len(in_flight[shard]) >= SHARD_IN_FLIGHT:
+            in_flight[shard].popleft().result()
+        in_flight[shard].append(sharded.submit(shard, upload, pending[shard]))
+        pending[shard], sizes[shard] = [], 0
+
+    records = _timed_reads(records, metrics)
+    for record in embed_records(records, embedder, metrics=metrics):
+        shard = shard_of(record["path"], shards)
+        encoded = json.dumps(record)
+        batch = pending[shard]
+        if batch and (
+            len(batch) >= batch_size or sizes[shard] + len(encoded) > batch_bytes
+        ):
+            flush(shard)
+        pending[shard].append(encoded)
+        sizes[shard] += len(encoded) + 1
+    for shard in range(shards):
+        if pending[shard]:
+            flush(shard)
+    for futures in in_flight:
+        for future in futures:
+            future.result()
+    return len(files)
+
+
+def _commit(client: SurrealClient, statements: list[str], params: dict) -> None:
+    """Run `statements` with `params` in a single transaction."""
+    client.query(
+        "BEGIN TRANSACTION; " + " ".join(statements) + " COMMIT TRANSACTION;",
+        params,
+    )
+
+
+def index_docs_incremental(
+    base: Path,
+    client: SurrealClient,
+    manifest_path: Path,
+    table: str = "docs",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embedder: EmbeddingProvider | None = None,
+    knn_cache: KnnCache | None = None,
+) -> tuple[int, int]:
+    """
+    Bring `table` in line with `base` using the manifest at `manifest_path`.
+
+    Records are keyed by `doc_id` so re-runs update rows in place.  A file
+    whose mtime and size match its manifest entry is skipped without being
+    read; one whose sha256 is unchanged is not re-uploaded.  Rows for files
+    that disappeared from `base` are deleted.  Every committed write
+    invalidates `table` in `knn_cache`.  Returns ``(upserted, deleted)``.
+    """
+    embedder = embedder or HashEmbedder()
+    files = _find_docs(base)
+    client.query(_setup_query(table, embedder.dimension))
+    old = load_manifest(manifest_path)
+    new: dict[str, dict] = {}
+    pending: list[tuple[str, dict]] = []
+    upserted = 0
+
+    def flush() -> None:
+        nonlocal upserted
+        if pending:
+            records = embed_records((record for _, record in pending), embedder)
+            params: dict = {"table": table}
+            for i, ((rid, _), record) in enumerate(zip(pending, records)):
+                params[f"id{i}"] = rid
+                params[f"rec{i}"] = record
+            _commit(
+                client,
+                [
+                    f"UPSERT type::thing($table, $id{i}) CONTENT $rec{i};"
+                    for i in range(len(pending))
+                ],
+                params,
+            )
+            if knn_cache is not None:
+                knn_cache.invalidate(table)
+            upserted += len(pending)
+            pending.clear()
+            save_manifest(manifest_path, {**old, **new})
 
     for path in files:
-        text = path.read_text(encoding="utf-8", errors="ignore")
-        emb = simple_embedding(text)
-        q = (
-            "USE NS test DB test; "
-            f"CREATE {table} SET "
-            f"path = {json.dumps(str(path))}, "
-            f"text = {json.dumps(text)}, "
-            f"embedding = {emb};"
+        key = str(path)
+        st = path.stat()
+        entry = {"mtime": st.st_mtime_ns, "size": st.st_size}
+        prev = old.get(key)
+        if prev and prev["mtime"] == entry["mtime"] and prev["size"] == entry["size"]:
+            new[key] = prev
+            continue
+        data = path.read_bytes()
+        entry["sha256"] = hashlib.sha256(data).hexdigest()
+        new[key] = entry
+        if prev and prev.get("sha256") == entry["sha256"]:
+            continue
+        text = data.decode("utf-8", errors="ignore")
+        pending.append((doc_id(path), {"path": key, "text": text}))
+        if len(pending) >= batch_size:
+            flush()
+    flush()
+
+    removed = [key for key in old if key not in new]
+    for start in range(0, len(removed), batch_size):
+        keys = removed[start : start + batch_size]
+        params = {"table": table}
+        params.update((f"id{i}", doc_id(Path(key))) for i, key in enumerate(keys))
+        _commit(
+            client,
+            [f"DELETE type::thing($table, $id{i});" for i in range(len(keys))],
+            params,
+        )
+    if removed and knn_cache is not None:
+        knn_cache.invalidate(table)
+    save_manifest(manifest_path, new)
+    return upserted, len(removed)
+
+
+async def index_docs_async(
+    base: Path,
+    client: AsyncSurrealClient | RpcClient,
+    table: str = "docs",
+    concurrency: int = 4,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    embedder: EmbeddingProvider | None = None,
+    knn_cache: KnnCache | None = None,
+    metrics: Metrics | None = None,
+    embed_batch: int = DEFAULT_EMBED_BATCH,
+    bulk: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    batch_bytes: int = DEFAULT_BATCH_BYTES,
+    chunk_bytes: int = 0,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> int:
+    """
+    Concurrent variant of `index_docs`.
+
+    A producer reads files, an embedding stage computes vectors with one
+    provider call per `embed_batch` texts and `concurrency` uploaders
+    CREATE records over the shared `client`, either a pooled HTTP client or
+    one multiplexed WebSocket `RpcClient`.  The stages are joined by queues
+    of at most `queue_size` items, so memory use does not grow with the
+    size of the tree.  `bulk`, `batch_size`, `batch_bytes`, `chunk_bytes`
+    and `chunk_overlap` behave as in `index_docs`; with `bulk` each uploader
+    sends its own transactional INSERT batches.  `knn_cache` entries for
+    `table` are invalidated once uploading ends.  `metrics` receives the
+    same stage timings as in `index_docs`.  Returns the number of files
+    indexed.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    embedder = embedder or HashEmbedder()
+    files = _find_docs(base)
+    dimension = await asyncio.to_thread(lambda: embedder.dimension)
+    await client.query(_setup_query(table, dimension))
+
+    texts: asyncio.Queue[dict | None] = asyncio.Queue(queue_size)
+    records: asyncio.Queue[dict | None] = asyncio.Queue(queue_size)
+
+    def load(path: Path) -> list[dict]:
+        if chunk_bytes:
+            return list(_chunk_records(path, chunk_bytes, chunk_overlap))
+        return [_doc_record(path)]
+
+    async def read() -> None:
+        for path in files:
+            with timer(metrics, STAGE_METRIC, stage="read"):
+                loaded = await asyncio.to_thread(load, path)
+            for record in loaded:
+                await texts.put(record)
+        await texts.put(None)
+
+    async def embed() -> None:
+        done = False
+        while not done:
+            batch: list[dict] = []
+            while len(batch) < embed_batch:
+                if (record := await texts.get()) is None:
+                    done = True
+                    break
+                batch.append(record)
+            if batch:
+                await asyncio.to_thread(_embed_batch, batch, embedder, metrics)
+                for record in batch:
+                    await records.put(record)
+        for _ in range(concurrency):
+            await records.put(None)
+
+    async def upload() -> None:
+        while (record := await records.get()) is not None:
+            with timer(metrics, STAGE_METRIC, stage="upload"):
+                await client.query(
+                    "CREATE type::table($table) CONTENT $record;",
+                    {"table": table, "record": record},
+                )
+
+    async def upload_bulk() -> None:
+        pending: list[dict] = []
+        done = False
+        while not done:
+            if (record := await records.get()) is None:
+                done = True
+            else:
+                pending.append(record)
+            if pending and (done or len(pending) >= batch_size):
+                for batch in batch_records(pending, batch_size, batch_bytes):
+                    with timer(metrics, STAGE_METRIC, stage="upload"):
+                        await client.query(_insert_query(table, batch))
+                pending = []
+
+    with _invalidating(knn_cache, table):
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(read())
+            tg.create_task(embed())
+            for _ in range(concurrency):
+                tg.create_task(upload_bulk() if bulk else upload())
+    return len(files)
+
+
+async def _index_async_cli(
+    args: argparse.Namespace, embedder: EmbeddingProvider, metrics: Metrics | None
+) -> int:
+    if args.ws:
+        client = RpcClient(
+            args.url, args.user, args.password, args.namespace, args.database
+        )
+    else:
+        client = AsyncSurrealClient(
+            args.url,
+            args.user,
+            args.password,
+            args.namespace,
+            args.database,
+            max_connections=args.concurrency,
+            metrics=metrics,
+        )
+    async with client:
+        return await index_docs_async(
+            args.doc_root,
+            client,
+            table=args.table,
+            concurrency=args.concurrency,
+            embedder=embedder,
+            metrics=metrics,
+            bulk=args.bulk,
+            batch_size=args.batch_size,
+            batch_bytes=args.batch_bytes,
+            chunk_bytes=args.chunk_bytes,
+            chunk_overlap=args.chunk_overlap,
         )
-        _sql(client, q)
 
 
 def main() -> None:
@@ -75,15 +646,219 @@ def main() -> None:
     parser.add_argument("--url", default="http://127.0.0.1:8000")
     parser.add_argument("--user", default="root")
     parser.add_argument("--password", default="root")
+    parser.add_argument("--namespace", default=DEFAULT_NAMESPACE)
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
     parser.add_argument("--table", default="docs")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Pack records into transactional INSERT batches",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Maximum records per bulk batch",
+    )
+    parser.add_argument(
+        "--batch-bytes",
+        type=int,
+        default=DEFAULT_BATCH_BYTES,
+        help="Maximum encoded payload bytes per bulk batch",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="Upload with N concurrent async workers",
+    )
+    parser.add_argument(
+        "--ws",
+        action="store_true",
+        help="With --concurrency, stream uploads over one WebSocket RPC connection",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=0,
+        help="Store each file as chunks of at most N bytes",
+    )
+    parser.add_argument(
+        "--chunk-overlap",
+        type=int,
+        default=DEFAULT_CHUNK_OVERLAP,
+        help="Bytes repeated between consecutive size-split chunks",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=["hash", "fhash", "ollama"],
+        default="hash",
+        help="Embedding provider",
+    )
+    parser.add_argument("--embed-model", default=DEFAULT_OLLAMA_MODEL)
+    parser.add_argument(
+        "--dimension",
+        type=int,
+        default=DEFAULT_HASH_DIMENSION,
+        help="Vector dimension for the fhash embedder",
+    )
+    parser.add_argument("--ollama-url", default=OLLAMA_URL)
+    parser.add_argument(
+        "--embed-cache",
+        type=Path,
+        help="SQLite file caching embeddings across runs",
+    )
+    parser.add_argument(
+        "--embed-cache-size",
+        type=int,
+        default=DEFAULT_CACHE_ENTRIES,
+        help="Maximum cached vectors before LRU eviction",
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=QUANT_MODES,
+        help="Index quantized codes; full vectors stay in each record for "
+        "re-ranking, so only the index shrinks unless --full-precision-file",
+    )
+    parser.add_argument(
+        "--full-precision-file",
+        type=Path,
+        help="With --quantize, keep full vectors in this memory-mapped file",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Incrementally sync against this content-hash manifest",
+    )
+    parser.add_argument(
+        "--shard",
+        action="append",
+        metavar="URL",
+        help="Hash-partition across these servers (repeat per shard)",
+    )
+    parser.add_argument(
+        "--shard-namespaces",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Hash-partition across N namespaces <namespace>_0.. of --url",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        metavar="PATH",
+        help="Write stage, query latency and payload size histograms here",
+    )
     args = parser.parse_args()
+    if args.quantize and (args.concurrency or args.manifest):
+        parser.error("--quantize cannot be combined with --concurrency or --manifest")
+    sharding = args.shard or args.shard_namespaces
+    if args.shard and args.shard_namespaces:
+        parser.error("--shard and --shard-namespaces are mutually exclusive")
+    if sharding and (args.concurrency or args.manifest or args.quantize):
+        parser.error(
+            "sharding cannot be combined with --concurrency, --manifest or --quantize"
+        )
+    if args.full_precision_file and not args.quantize:
+        parser.error("--full-precision-file requires --quantize")
+    if args.manifest and args.chunk_bytes:
+        # incremental records are keyed per file, not per chunk
+        parser.error("--manifest cannot be combined with --chunk-bytes")
 
-    with httpx.Client(
-        base_url=args.url,
-        auth=(args.user, args.password),
-        timeout=10.0,
-    ) as client:
-        index_docs(args.doc_root, client, table=args.table)
+    embedder = build_provider(
+        args.embedder, args.embed_model, args.dimension, args.ollama_url
+    )
+    cache = None
+    if args.embed_cache:
+        cache = EmbeddingCache(args.embed_cache, args.embed_cache_size)
+        embedder = CachedEmbedder(embedder, cache)
+
+    full_precision = None
+    if args.full_precision_file:
+        full_precision = FullPrecisionFile(args.full_precision_file, embedder.dimension)
+
+    metrics = Metrics() if args.metrics_json else None
+    start = time.perf_counter()
+    if args.concurrency:
+        count = asyncio.run(_index_async_cli(args, embedder, metrics))
+    elif sharding:
+        if args.shard:
+            sharded = ShardedClient.from_urls(
+                args.shard,
+                args.user,
+                args.password,
+                args.namespace,
+                args.database,
+                metrics=metrics,
+            )
+        else:
+            sharded = ShardedClient.from_namespaces(
+                [f"{args.namespace}_{i}" for i in range(args.shard_namespaces)],
+                args.url,
+                args.user,
+                args.password,
+                args.database,
+                metrics=metrics,
+            )
+        with sharded:
+            count = index_docs_sharded(
+                args.doc_root,
+                sharded,
+                table=args.table,
+                batch_size=args.batch_size,
+                batch_bytes=args.batch_bytes,
+                chunk_bytes=args.chunk_bytes,
+                chunk_overlap=args.chunk_overlap,
+                embedder=embedder,
+                metrics=metrics,
+            )
+    else:
+        with SurrealClient(
+            args.url,
+            args.user,
+            args.password,
+            args.namespace,
+            args.database,
+            metrics=metrics,
+        ) as client:
+            if args.manifest:
+                count, deleted = index_docs_incremental(
+                    args.doc_root,
+                    client,
+                    args.manifest,
+                    table=args.table,
+                    batch_size=args.batch_size,
+                    embedder=embedder,
+                )
+                print(f"Deleted rows for {deleted} removed files")
+            else:
+                count = index_docs(
+                    args.doc_root,
+                    client,
+                    table=args.table,
+                    bulk=args.bulk,
+                    batch_size=args.batch_size,
+                    batch_bytes=args.batch_bytes,
+                    chunk_bytes=args.chunk_bytes,
+                    chunk_overlap=args.chunk_overlap,
+                    embedder=embedder,
+                    quantize=args.quantize,
+                    full_precision=full_precision,
+                    metrics=metrics,
+                )
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Indexed {count} files in {elapsed:.2f}s ({rate:.1f} files/sec)")
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}), {stats['entries']} entries"
+        )
+        cache.close()
+    if metrics is not None:
+        metrics.dump(args.metrics_json)
+        print(f"Metrics written to {args.metrics_json}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Resident ask_qwen service keeping one warm AsyncOpenAI client."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+from openai import AsyncOpenAI
+
+if __package__ in (None, ""):  # run as `python scripts/qwen_server.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from vector_db.rag import DEFAULT_ANSWER_CACHE, AnswerCache
+
+OPENAI_BASE_URL = "http://localhost:11434/v1"
+DEFAULT_MODEL = "qwen3:0.6b"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 4
+
+
+class QwenServer:
+    """
+    HTTP front for a local model.
+
+    ``POST /complete`` takes ``{"prompts": [...], "model"?, "system"?,
+    "max_tokens"?}`` and answers ``{"answers": [...]}`` in prompt order.
+    Prompts from all requests share one semaphore of `concurrency` slots,
+    and identical (model, system, max_tokens, prompt) requests are answered
+    from an LRU without calling the model.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI | None = None,
+        model: str = DEFAULT_MODEL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache_size: int = DEFAULT_ANSWER_CACHE,
+    ) -> None:
+        self.client = client or AsyncOpenAI(base_url=OPENAI_BASE_URL, api_key="ollama")
+        self.model = model
+        self.concurrency = concurrency
+        self.limit = asyncio.Semaphore(concurrency)
+        self.cache = AnswerCache(cache_size)
+        self.in_flight = 0
+        self.completed = 0
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str,
+        system: str | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        # max_tokens is part of the key: a truncated answer must not be
+        # served to a request allowing a longer one
+        key = (model, system, max_tokens, prompt)
+        if (answer := self.cache.get(key)) is not None:
+            return answer
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        async with self.limit:
+            self.in_flight += 1
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model, messages=messages, **options
+                )
+            finally:
+                self.in_flight -= 1
+        answer = response.choices[0].message.content or ""
+        self.cache.put(key, answer)
+        self.completed += 1
+        return answer
+
+    async def handle_complete(self, request: web.Request) -> web.Response:
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"message": "body must be JSON"}, status=400)
+        if not isinstance(data, dict):
+            return web.json_response(
+                {"message": "body must be a JSON object"}, status=400
+            )
+        prompts = data.get("prompts")
+        if not isinstance(prompts, list) or not all(
+            isinstance(p, str) for p in prompts
+        ):
+            return web.json_response(
+                {"message": "prompts must be a list of strings"}, status=400
+            )
+        max_tokens = data.get("max_tokens")
+        if max_tokens is not None and (
+            not isinstance(max_tokens, int) or isinstance(max_tokens, bool)
+        ):
+            return web.json_response(
+                {"message": "max_tokens must be an integer"}, status=400
+            )
+        model = data.get("model") or self.model
+        start = time.perf_counter()
+        answers = await asyncio.gather(
+            *(
+                self.complete(p, model, data.get("system"), max_tokens)
+                for p in prompts
+            )
+        )
+        return web.json_response(
+            {"answers": answers, "model": model, "seconds": time.perf_counter() - start}
+        )
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "model": self.model,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses,
+            }
+        )
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/complete", self.handle_complete)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+
+async def run(
+    server: QwenServer, port: int = DEFAULT_PORT, unix_socket: str | None = None
+) -> None:
+    runner = web.AppRunner(server.create_app())
+    await runner.setup()
+    if unix_socket:
+        site = web.UnixSite(runner, unix_socket)
+        where = f"unix:{unix_socket}"
+    else:
+        site = web.TCPSite(runner, "127.0.0.1", port)
+        where = f"http://127.0.0.1:{port}"
+    await site.start()
+    print(f"ask_qwen server ({server.model}) running on {where}")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-m", "--model", default=DEFAULT_MODEL)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Completions run against the model at once",
+    )
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_ANSWER_CACHE)
+    args = parser.parse_args()
+
+    async def serve() -> None:
+        server = QwenServer(
+            model=args.model, concurrency=args.concurrency, cache_size=args.cache_size
+        )
+        await run(server, args.port, args.unix)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
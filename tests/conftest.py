@@ -0,0 +1,102 @@
+"""
+Shared fixtures: one SurrealDB per session, one namespace per test.
+
+Each pytest session (and so each ``pytest-xdist`` worker) starts its own
+in-memory ``bin/surreal`` on a free port.  Set ``SURREAL_URL`` to use an
+already running server instead; without either, tests fall back to
+``vector_db.client.DEFAULT_URL``.  Every test namespace has a ``guest``
+database user with the read-only VIEWER role.
+"""
+
+import contextlib
+import os
+import uuid
+
+import httpx
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from vector_db.client import DEFAULT_DATABASE, DEFAULT_URL, SurrealClient
+from vector_db.server import SURREAL_BIN, SurrealServer
+
+SURREAL_USER = "root"
+SURREAL_PASSWORD = "root"
+GUEST_USER = "guest"
+GUEST_PASSWORD = "guest"
+
+
+@pytest.fixture(scope="session")
+def surreal_url():
+    url = os.environ.get("SURREAL_URL")
+    if url or not SURREAL_BIN.exists():
+        yield url or DEFAULT_URL
+        return
+    with SurrealServer(user=SURREAL_USER, password=SURREAL_PASSWORD) as server:
+        yield server.url
+
+
+@pytest.fixture
+def surreal(surreal_url):
+    """Connection settings for a fresh namespace, removed after the test."""
+    namespace = f"t_{uuid.uuid4().hex[:12]}"
+    settings = {
+        "url": surreal_url,
+        "user": SURREAL_USER,
+        "password": SURREAL_PASSWORD,
+        "namespace": namespace,
+        "database": DEFAULT_DATABASE,
+    }
+    with SurrealClient(**settings) as root:
+        root.query(
+            f'DEFINE USER {GUEST_USER} ON DATABASE PASSWORD "{GUEST_PASSWORD}" '
+            "ROLES VIEWER;"
+        )
+    yield settings
+    # a test that could not reach the server has already failed for it
+    with (
+        contextlib.suppress(httpx.TransportError),
+        SurrealClient(surreal_url, SURREAL_USER, SURREAL_PASSWORD) as root,
+    ):
+        root.raw(f"REMOVE NAMESPACE IF EXISTS {namespace};")
+
+
+@pytest.fixture
+def client(surreal):
+    with SurrealClient(**surreal) as c:
+        yield c
+
+
+@pytest.fixture
+def guest(surreal):
+    """A `SurrealClient` signed in as the namespace's read-only guest user."""
+    settings = {**surreal, "user": GUEST_USER, "password": GUEST_PASSWORD}
+    with SurrealClient(**settings) as c:
+        yield c
+
+
+@pytest_asyncio.fixture
+async def serve_app():
+    """
+    Start aiohttp apps on free ports; ``await serve_app(app)`` returns the URL.
+
+    ``await serve_app(app, unix_socket=path)`` listens on `path` instead
+    and returns it.
+    """
+    runners = []
+
+    async def serve(app: web.Application, unix_socket: str | None = None) -> str:
+        runner = web.AppRunner(app)
+        await runner.setup()
+        runners.append(runner)
+        if unix_socket:
+            await web.UnixSite(runner, unix_socket).start()
+            return unix_socket
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    yield serve
+    for runner in reversed(runners):
+        await runner.cleanup()
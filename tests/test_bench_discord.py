@@ -0,0 +1,18 @@
+import pytest
+
+from discord_emulator import DiscordEmulator, RateLimiter
+from scripts.bench_discord import load
+
+
+@pytest.mark.asyncio
+async def test_load_reports_rest_and_gateway_latency(serve_app):
+    emulator = DiscordEmulator(rate_limiter=RateLimiter({}, None))
+    url = await serve_app(emulator.create_app())
+
+    report = await load(url, gateways=3, posters=2, messages=20, drain=2.0)
+
+    assert report["rest"]["ok"] == 20 and report["rest"]["errors"] == 0
+    assert report["rest"]["p50_ms"] > 0
+    assert report["gateway"]["expected"] == 60
+    assert report["gateway"]["delivered"] == 60
+    assert report["gateway"]["dropped"] == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from scripts.bench_vector import bench_case, index_ddl, knn_operator, parse_index
+
+
+def test_parse_index_specs():
+    assert parse_index("brute") == ("brute", {})
+    assert parse_index("MTREE:capacity=40") == ("mtree", {"capacity": 40})
+    assert parse_index("hnsw:efc=150,m=12,ef=40") == (
+        "hnsw",
+        {"efc": 150, "m": 12, "ef": 40},
+    )
+    with pytest.raises(ValueError):
+        parse_index("ivf:lists=10")
+
+
+def test_index_ddl_and_operator():
+    kind, params = parse_index("hnsw:efc=150,m=12,ef=64")
+    assert index_ddl("t", kind, params, 8) == (
+        "DEFINE INDEX idx_t_emb ON t FIELDS embedding "
+        "HNSW DIMENSION 8 DIST EUCLIDEAN EFC 150 M 12;"
+    )
+    assert knn_operator(kind, params, 5) == "<|5,64|>"
+    assert knn_operator("brute", {}, 5) == "<|5,EUCLIDEAN|>"
+    assert knn_operator("mtree", {}, 5) == "<|5|>"
+
+
+def test_bench_case_small(surreal_url):
+    results = bench_case(
+        surreal_url,
+        ("root", "root"),
+        n=200,
+        dimension=4,
+        indexes=["brute", "mtree", "hnsw"],
+        k=5,
+        num_queries=10,
+        concurrency=2,
+        seed=1,
+    )
+    assert [r["index"] for r in results] == ["brute", "mtree", "hnsw"]
+    assert results[0]["recall@5"] == 1.0
+    for r in results:
+        assert r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+        assert r["qps"] > 0
@@ -0,0 +1,61 @@
+import pytest
+from pytest_httpx import HTTPXMock
+
+from vector_db.client import (
+    AsyncSurrealClient,
+    SurrealClient,
+    SurrealError,
+    encode_query,
+    encode_value,
+)
+
+
+def test_encode_query_binds_params():
+    q = encode_query("SELECT * FROM t WHERE a = $a;", {"a": 'x"; REMOVE TABLE t; --'})
+    assert q == 'LET $a = s"x\\"; REMOVE TABLE t; --"; SELECT * FROM t WHERE a = $a;'
+    assert encode_query("RETURN 1;") == "RETURN 1;"
+    with pytest.raises(ValueError):
+        encode_query("RETURN $x;", {"x; DROP": 1})
+
+
+def test_encode_value_writes_surrealql_literals():
+    value = {"id": "t:1", "at": "2024-01-01T00:00:00Z", "v": [0.5, 1, None, True]}
+    assert encode_value(value) == (
+        '{"id": s"t:1", "at": s"2024-01-01T00:00:00Z", "v": [0.5, 1, NULL, true]}'
+    )
+    assert encode_value("é\n") == 's"é\\n"'
+    for bad in (float("nan"), float("inf"), 2**63):
+        with pytest.raises(ValueError):
+            encode_value(bad)
+    with pytest.raises(TypeError):
+        encode_value({1: "x"})
+
+
+def test_query_sends_ns_headers_and_strips_lets(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        json=[
+            {"status": "OK", "result": None},
+            {"status": "OK", "result": [{"id": "t:1"}]},
+        ]
+    )
+    with SurrealClient(namespace="ns1", database="db1") as client:
+        assert client.query("SELECT * FROM t WHERE id = $id;", {"id": 1}) == [
+            [{"id": "t:1"}]
+        ]
+    request = httpx_mock.get_request()
+    assert request.headers["Surreal-NS"] == "ns1"
+    assert request.headers["Surreal-DB"] == "db1"
+    assert b"USE NS" not in request.content
+
+
+def test_query_raises_on_statement_error(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=[{"status": "ERR", "result": "boom"}])
+    with SurrealClient() as client, pytest.raises(SurrealError, match="boom"):
+        client.query("THROW 'boom';")
+
+
+@pytest.mark.asyncio
+async def test_async_query(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=[{"status": "OK", "result": 2}])
+    async with AsyncSurrealClient() as client:
+        assert await client.query("RETURN 1 + 1;") == [2]
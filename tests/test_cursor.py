@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from vector_db.client import SurrealClient, SurrealError
+from vector_db.cursor import iter_json_rows, iter_table
+
+ROWS = [
+    {"id": "t:1", "text": 'quote " slash \\ brackets ]},[{ ünïcode'},
+    [1, [2, 3]],
+    "a,]",
+    5,
+    None,
+]
+
+
+def _body(*statements) -> bytes:
+    return json.dumps(list(statements), ensure_ascii=False).encode()
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 64, 1 << 20])
+def test_rows_split_across_chunks(chunk):
+    body = _body(
+        {"result": None, "status": "OK", "time": "1µs"},
+        {"result": ROWS, "status": "OK", "time": "2ms"},
+    )
+    chunks = [body[i : i + chunk] for i in range(0, len(body), chunk)]
+    assert list(iter_json_rows(chunks)) == ROWS
+
+
+def test_error_status_raises_after_stream():
+    body = _body({"result": "bad [thing]", "status": "ERR", "time": "1µs"})
+    with pytest.raises(SurrealError, match=r"bad \[thing\]"):
+        list(iter_json_rows([body[:7], body[7:]]))
+
+
+def test_iter_table_pages_by_id_range(httpx_mock: HTTPXMock):
+    pages = [[{"id": "t:1"}, {"id": "t:2"}], [{"id": "t:3"}]]
+    for page in pages:
+        httpx_mock.add_response(content=_body({"result": page, "status": "OK"}))
+    with SurrealClient() as client:
+        rows = list(iter_table(client, "t", "text", page_size=2))
+    assert [r["id"] for r in rows] == ["t:1", "t:2", "t:3"]
+    sent = [r.content.decode() for r in httpx_mock.get_requests()]
+    assert sent == [
+        "SELECT id, text FROM t:.. LIMIT 2;",
+        "SELECT id, text FROM t:2>.. LIMIT 2;",
+    ]
+
+
+@pytest.mark.parametrize("mode", ["range", "offset"])
+def test_iter_table_against_surreal(client: SurrealClient, mode):
+    client.raw(
+        "DEFINE TABLE cursor_item SCHEMALESS; "
+        "FOR $i IN 0..25 { CREATE type::thing('cursor_item', $i) SET n = $i; };"
+    )
+    rows = list(iter_table(client, "cursor_item", "n", page_size=4, mode=mode))
+    assert [r["n"] for r in rows] == list(range(25))
@@ -1,54 +1,293 @@
+import asyncio
 import json
+import time
 
 import httpx
 import pytest
 import websockets
-from aiohttp import web
 
-from discord_emulator import DiscordEmulator
+from discord_emulator import DiscordEmulator, MemoryStore, SurrealStore
+from discord_emulator.gateway import (
+    SESSION_TIMEOUT_CLOSE_CODE,
+    SLOW_CONSUMER_CLOSE_CODE,
+    GatewayConnection,
+    Session,
+)
+from discord_emulator.ratelimit import RateLimiter
+from vector_db.client import AsyncSurrealClient
+
+
+def gateway_url(url):
+    return url.replace("http", "ws", 1) + "/gateway"
 
 
 @pytest.mark.asyncio
-async def test_gateway_ready_and_message_create():
+async def test_gateway_ready_and_message_create(serve_app):
     emulator = DiscordEmulator()
-    app = emulator.create_app()
-    runner = web.AppRunner(app)
-    await runner.setup()
-    site = web.TCPSite(runner, "127.0.0.1", 9010)
-    await site.start()
-
-    try:
-        async with websockets.connect("ws://127.0.0.1:9010/gateway") as ws:
-            hello = json.loads(await ws.recv())
-            assert hello["op"] == 10
-            await ws.send(json.dumps({"op": 2}))
-            ready = json.loads(await ws.recv())
-            assert ready["t"] == "READY"
-            async with httpx.AsyncClient(base_url="http://127.0.0.1:9010") as client:
-                r = await client.post(
-                    "/api/v10/channels/10/messages", json={"content": "hi"}
-                )
-                assert r.status_code == 200
-            event = json.loads(await ws.recv())
-            assert event["t"] == "MESSAGE_CREATE"
-    finally:
-        await runner.cleanup()
+    url = await serve_app(emulator.create_app())
+
+    async with websockets.connect(gateway_url(url)) as ws:
+        hello = json.loads(await ws.recv())
+        assert hello["op"] == 10
+        await ws.send(json.dumps({"op": 2}))
+        ready = json.loads(await ws.recv())
+        assert ready["t"] == "READY"
+        async with httpx.AsyncClient(base_url=url) as client:
+            r = await client.post(
+                "/api/v10/channels/10/messages", json={"content": "hi"}
+            )
+            assert r.status_code == 200
+        event = json.loads(await ws.recv())
+        assert event["t"] == "MESSAGE_CREATE"
+
+
+@pytest.mark.asyncio
+async def test_post_message_unknown_channel(serve_app):
+    emulator = DiscordEmulator()
+    url = await serve_app(emulator.create_app())
+
+    async with httpx.AsyncClient(base_url=url) as client:
+        r = await client.post("/api/v10/channels/999/messages", json={"content": "x"})
+        assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_messages_survive_restart_via_snapshot(tmp_path, serve_app):
+    snapshot = tmp_path / "messages.json"
+    emulator = DiscordEmulator(MemoryStore(snapshot))
+    url = await serve_app(emulator.create_app())
+
+    async with httpx.AsyncClient(base_url=url) as client:
+        r = await client.post("/api/v10/channels/10/messages", json={"content": "a"})
+        mid = r.json()["id"]
+        r = await client.patch(
+            f"/api/v10/channels/10/messages/{mid}", json={"content": "b"}
+        )
+        assert r.json()["content"] == "b"
+        r = await client.delete(f"/api/v10/channels/999/messages/{mid}")
+        assert r.status_code == 404
+    await emulator.store.close()
+
+    recovered = MemoryStore(snapshot)
+    assert (await recovered.get("10", mid))["content"] == "b"
+    assert await recovered.delete("10", mid)
+    assert await recovered.list("10") == []
 
 
 @pytest.mark.asyncio
-async def test_post_message_unknown_channel():
+async def test_memory_store_caps_each_channel():
+    store = MemoryStore(max_per_channel=2)
+    for i in range(3):
+        await store.add({"id": str(i), "channel_id": "10", "content": str(i)})
+    assert [m["id"] for m in await store.list("10")] == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_surreal_store_roundtrip(surreal):
+    async with AsyncSurrealClient(**surreal) as client:
+        store = SurrealStore(client, table="discord_message_test")
+        await store.add({"id": "m1", "channel_id": "10", "content": "hi"})
+        assert (await store.get("10", "m1")) == {
+            "id": "m1",
+            "channel_id": "10",
+            "content": "hi",
+        }
+        assert await store.get("11", "m1") is None
+        assert (await store.update("10", "m1", {"content": "yo"}))["content"] == "yo"
+        assert [m["id"] for m in await store.list("10")] == ["m1"]
+        assert await store.delete("10", "m1")
+        assert not await store.delete("10", "m1")
+
+
+@pytest.mark.asyncio
+async def test_guild_events_go_to_owning_shard(serve_app):
     emulator = DiscordEmulator()
-    app = emulator.create_app()
-    runner = web.AppRunner(app)
-    await runner.setup()
-    site = web.TCPSite(runner, "127.0.0.1", 9011)
-    await site.start()
-
-    try:
-        async with httpx.AsyncClient(base_url="http://127.0.0.1:9011") as client:
+    emulator.add_guild(str(1 << 22), "Second Guild")  # lands on shard 1 of 2
+    emulator.add_channel(str(1 << 22), {"id": "20", "name": "other", "type": 0})
+    url = await serve_app(emulator.create_app())
+
+    async with (
+        websockets.connect(gateway_url(url)) as ws0,
+        websockets.connect(gateway_url(url)) as ws1,
+    ):
+        ready = []
+        for shard, ws in enumerate((ws0, ws1)):
+            await ws.recv()
+            await ws.send(json.dumps({"op": 2, "d": {"shard": [shard, 2]}}))
+            ready.append(json.loads(await ws.recv())["d"]["guilds"])
+        assert ready == [[{"id": "1"}], [{"id": str(1 << 22)}]]
+
+        async with httpx.AsyncClient(base_url=url) as client:
+            for cid in ("10", "20"):
+                await client.post(
+                    f"/api/v10/channels/{cid}/messages", json={"content": cid}
+                )
+        assert json.loads(await ws0.recv())["d"]["channel_id"] == "10"
+        assert json.loads(await ws1.recv())["d"]["channel_id"] == "20"
+
+
+class StalledSocket:
+    """A gateway socket whose client never reads."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.sent = []
+        self.close_code = None
+
+    async def send_str(self, frame):
+        await self.release.wait()
+        self.sent.append(frame)
+
+    async def close(self, code, message=b""):
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["drop", "disconnect"])
+async def test_slow_consumer_never_blocks_sender(policy):
+    ws = StalledSocket()
+    conn = GatewayConnection(ws, queue_size=2, slow_consumer=policy)
+    await asyncio.sleep(0)  # writer takes the first frame and stalls
+    results = [conn.push(f"frame{i}") for i in range(4)]
+    assert results == [True, True, False, False]
+    assert conn.dropped == (2 if policy == "drop" else 1)
+
+    ws.release.set()
+    await asyncio.sleep(0.01)
+    if policy == "drop":
+        assert ws.sent == ["frame0", "frame1"]
+        assert ws.close_code is None
+    else:
+        assert ws.close_code == SLOW_CONSUMER_CLOSE_CODE
+    await conn.close()
+
+
+def test_rate_limiter_buckets_per_channel_and_global():
+    now = [0.0]
+    limiter = RateLimiter({"post_message": (2, 2.0)}, (3, 1.0), clock=lambda: now[0])
+
+    ok, headers, _ = limiter.check("post_message", "10")
+    assert ok and headers["X-RateLimit-Remaining"] == "1"
+    assert headers["X-RateLimit-Reset-After"] == "1.000"
+    assert limiter.check("post_message", "10")[0]
+    ok, headers, body = limiter.check("post_message", "10")
+    assert not ok and headers["Retry-After"] == "1" and body["global"] is False
+
+    assert limiter.check("post_message", "11")[0]  # other channel, own bucket
+    ok, headers, body = limiter.check("post_message", "12")
+    assert not ok and body["global"] and headers["X-RateLimit-Global"] == "true"
+
+    now[0] = 1.0
+    ok, headers, _ = limiter.check("post_message", "10")
+    assert ok and headers["X-RateLimit-Remaining"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_post_message_returns_429_with_retry_after(serve_app):
+    limiter = RateLimiter({"post_message": (2, 60.0)}, None)
+    emulator = DiscordEmulator(rate_limiter=limiter)
+    url = await serve_app(emulator.create_app())
+
+    async with httpx.AsyncClient(base_url=url) as client:
+        codes = []
+        for _ in range(3):
             r = await client.post(
-                "/api/v10/channels/999/messages", json={"content": "x"}
+                "/api/v10/channels/10/messages", json={"content": "x"}
             )
-            assert r.status_code == 404
-    finally:
-        await runner.cleanup()
+            codes.append(r.status_code)
+        assert codes == [200, 200, 429]
+        assert r.headers["X-RateLimit-Bucket"] == "post_message"
+        assert r.headers["X-RateLimit-Remaining"] == "0"
+        assert int(r.headers["Retry-After"]) == 30
+        assert r.json()["retry_after"] == pytest.approx(30, abs=0.1)
+        assert await emulator.store.list("10") != []
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_events(serve_app):
+    emulator = DiscordEmulator()
+    url = await serve_app(emulator.create_app())
+
+    async with httpx.AsyncClient(base_url=url) as client:
+
+        async def post(content):
+            await client.post(
+                "/api/v10/channels/10/messages", json={"content": content}
+            )
+
+        async with websockets.connect(gateway_url(url)) as ws:
+            await ws.recv()
+            await ws.send(json.dumps({"op": 2}))
+            ready = json.loads(await ws.recv())
+            session_id = ready["d"]["session_id"]
+            await post("seen")
+            seq = json.loads(await ws.recv())["s"]
+        await post("missed 1")
+        await post("missed 2")
+
+        async with websockets.connect(gateway_url(url)) as ws:
+            await ws.recv()
+            resume = {"session_id": session_id, "seq": seq, "token": "x"}
+            await ws.send(json.dumps({"op": 6, "d": resume}))
+            events = [json.loads(await ws.recv()) for _ in range(3)]
+            assert [e["d"].get("content") for e in events[:2]] == [
+                "missed 1",
+                "missed 2",
+            ]
+            assert events[2]["t"] == "RESUMED"
+            await post("live")
+            assert json.loads(await ws.recv())["d"]["content"] == "live"
+
+            await ws.send(json.dumps({"op": 6, "d": {"session_id": "nope"}}))
+            assert json.loads(await ws.recv()) == {"op": 9, "d": False}
+
+
+@pytest.mark.asyncio
+async def test_zombie_connection_is_reaped(serve_app):
+    emulator = DiscordEmulator(heartbeat_interval=100)
+    url = await serve_app(emulator.create_app())
+
+    async with websockets.connect(gateway_url(url)) as ws:
+        await ws.recv()
+        await ws.send(json.dumps({"op": 2}))
+        session_id = json.loads(await ws.recv())["d"]["session_id"]
+        with pytest.raises(websockets.ConnectionClosed) as closed:
+            while True:  # never heartbeat
+                await asyncio.wait_for(ws.recv(), 2)
+        assert closed.value.rcvd.code == SESSION_TIMEOUT_CLOSE_CODE
+    assert session_id in emulator.sessions  # still resumable
+    assert emulator.reap(time.monotonic() + emulator.session_ttl + 1) == (0, 1)
+
+
+def test_session_replay_buffer_evicts():
+    session = Session(buffer_size=2)
+    for seq in (1, 2, 3):
+        session.send(seq, f"frame{seq}")
+    assert session.missed(2) == [(3, "frame3")]
+    assert session.missed(1) == [(2, "frame2"), (3, "frame3")]
+    assert session.missed(0) is None
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_counts_gateway_and_rest(serve_app):
+    emulator = DiscordEmulator(rate_limiter=RateLimiter({}, None))
+    url = await serve_app(emulator.create_app())
+
+    async with websockets.connect(gateway_url(url)) as ws:
+        await ws.recv()  # HELLO
+        await ws.send(json.dumps({"op": 2}))
+        await ws.recv()  # READY
+        async with httpx.AsyncClient(base_url=url) as client:
+            await client.post("/api/v10/channels/10/messages", json={"content": "x"})
+            await client.post("/api/v10/channels/9/messages", json={"content": "x"})
+            await ws.recv()  # MESSAGE_CREATE
+            r = await client.get("/metrics")
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = r.text.splitlines()
+    assert "gateway_connections 1" in lines
+    assert "gateway_connections_total 1" in lines
+    assert 'gateway_events_total{event="MESSAGE_CREATE"} 1' in lines
+    assert 'http_requests_total{route="post_message",status="200"} 1' in lines
+    assert 'http_requests_total{route="post_message",status="404"} 1' in lines
+    assert 'http_request_seconds_count{route="post_message"} 2' in lines
+    assert not any("route=\"None\"" in line for line in lines)
@@ -2,55 +2,66 @@ import json
 import subprocess
 from pathlib import Path
 
-import httpx
 import pytest
+from pytest_httpx import HTTPXMock
 
-from scripts.index_docs import index_docs, simple_embedding
+from scripts.index_docs import (
+    batch_records,
+    index_docs,
+    index_docs_async,
+    index_docs_incremental,
+    iter_chunks,
+    load_manifest,
+    main,
+    simple_embedding,
+)
+from vector_db.client import AsyncSurrealClient, SurrealClient, SurrealError
+from vector_db.embeddings import HashEmbedder
 
-_SQL_HEADER = {"Accept": "application/json"}
 
+class CountingEmbedder(HashEmbedder):
+    def __init__(self) -> None:
+        self.calls: list[int] = []
 
-def _sql(client: httpx.Client, query: str) -> list[dict]:
-    res = client.post("/sql", headers=_SQL_HEADER, content=query)
-    res.raise_for_status()
-    return res.json()
+    def embed(self, texts):
+        self.calls.append(len(texts))
+        return super().embed(texts)
 
 
-@pytest.fixture(scope="module")
-def client():
-    with httpx.Client(
-        base_url="http://127.0.0.1:8000",
-        auth=("root", "root"),
-        timeout=10.0,
-    ) as c:
-        yield c
-
-
-def test_index_contains_full_text(client, tmp_path):
+def test_index_contains_full_text(client, surreal):
     # exercise the CLI on a single .md file
     doc = Path("docs/ollama/benchmark.md")
-    subprocess.run(["python", "scripts/index_docs.py", str(doc)], check=True)
-
-    data = _sql(
-        client,
-        f"USE NS test DB test; SELECT text FROM docs WHERE path = {json.dumps(str(doc))};",
+    subprocess.run(
+        [
+            "python",
+            "scripts/index_docs.py",
+            str(doc),
+            "--url",
+            surreal["url"],
+            "--namespace",
+            surreal["namespace"],
+            "--database",
+            surreal["database"],
+        ],
+        check=True,
     )
+
+    data = client.raw("SELECT text FROM docs WHERE path = $path;", {"path": str(doc)})
     result_rows = [row["result"] for row in data if row.get("result")]
     assert result_rows, "No results returned"
     stored = result_rows[0][0]["text"]
     assert stored == doc.read_text(encoding="utf-8")
 
 
-def test_index_docs_success(tmp_path: Path, client: httpx.Client):
+def test_index_docs_success(tmp_path: Path, client: SurrealClient):
     # exercise the programmatic API on a .mdx
     sample = tmp_path / "intro.mdx"
     sample.write_text("SurrealDB docs are great")
     index_docs(tmp_path, client, table="docs_test")
 
     vec = simple_embedding(sample.read_text())
-    data = _sql(
-        client,
-        f"USE NS test DB test; SELECT text FROM docs_test WHERE embedding <|3|> {vec} LIMIT 1;",
+    data = client.raw(
+        "SELECT text FROM docs_test WHERE embedding <|3|> $vec LIMIT 1;", {"vec": vec}
     )
     texts = [
         row["text"] for item in data if item.get("result") for row in item["result"]
@@ -58,6 +69,157 @@ def test_index_docs_success(tmp_path: Path, client: httpx.Client):
     assert sample.read_text() in texts
 
 
-def test_index_docs_missing_dir(client: httpx.Client):
+def test_index_docs_missing_dir(client: SurrealClient):
     with pytest.raises(FileNotFoundError):
         index_docs(Path("/no/such/path"), client, table="docs_err")
+
+
+def test_index_docs_bulk(tmp_path: Path, client: SurrealClient):
+    for i in range(5):
+        (tmp_path / f"page{i}.md").write_text(f"bulk page {i}")
+    count = index_docs(tmp_path, client, table="docs_bulk", bulk=True, batch_size=2)
+    assert count == 5
+
+    data = client.raw("SELECT count() FROM docs_bulk GROUP ALL;")
+    assert data[-1]["result"][0]["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_index_docs_async(tmp_path: Path, client: SurrealClient, surreal):
+    for i in range(6):
+        (tmp_path / f"page{i}.md").write_text(f"async page {i}")
+    async with AsyncSurrealClient(**surreal) as aclient:
+        count = await index_docs_async(
+            tmp_path, aclient, table="docs_async", concurrency=3, queue_size=2
+        )
+    assert count == 6
+
+    data = client.raw("SELECT count() FROM docs_async GROUP ALL;")
+    assert data[-1]["result"][0]["count"] == 6
+
+
+def test_index_docs_stops_on_schema_errors(tmp_path: Path, httpx_mock: HTTPXMock):
+    statuses = ["OK", "OK", "ERR", "OK"]  # table, vector index, analyzer, BM25
+    httpx_mock.add_response(
+        json=[{"status": status, "result": "bad analyzer"} for status in statuses]
+    )
+    (tmp_path / "page.md").write_text("page")
+    with SurrealClient() as client, pytest.raises(SurrealError, match="bad analyzer"):
+        index_docs(tmp_path, client)
+    [setup] = httpx_mock.get_requests()
+    assert setup.content.decode().count("IF NOT EXISTS") == 4
+
+
+@pytest.mark.asyncio
+async def test_index_docs_async_embeds_in_batches(
+    tmp_path: Path, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(json=[], is_reusable=True)
+    for i in range(5):
+        (tmp_path / f"page{i}.md").write_text(f"async page {i}")
+    embedder = CountingEmbedder()
+    async with AsyncSurrealClient() as aclient:
+        count = await index_docs_async(
+            tmp_path, aclient, concurrency=2, embedder=embedder, embed_batch=2
+        )
+    assert count == 5
+    assert embedder.calls == [2, 2, 1]
+    assert len(httpx_mock.get_requests()) == 1 + 5  # setup + one CREATE each
+
+
+@pytest.mark.asyncio
+async def test_index_docs_async_bulk_and_chunks(tmp_path: Path, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=[], is_reusable=True)
+    for i in range(5):
+        (tmp_path / f"page{i}.md").write_text(f"# page {i}\nbody\n# more\ntext\n")
+    async with AsyncSurrealClient() as aclient:
+        count = await index_docs_async(
+            tmp_path,
+            aclient,
+            concurrency=1,
+            bulk=True,
+            batch_size=4,
+            chunk_bytes=64,
+            chunk_overlap=0,
+        )
+    assert count == 5
+    inserts = [r.content.decode() for r in httpx_mock.get_requests()[1:]]
+    assert len(inserts) == 3  # 10 chunk records in batches of 4
+    for sql in inserts:
+        assert sql.startswith("BEGIN TRANSACTION; INSERT INTO docs ")
+    assert sum(sql.count('"chunk": ') for sql in inserts) == 10
+
+
+def test_index_docs_incremental(tmp_path: Path, client: SurrealClient):
+    root = tmp_path / "docs"
+    root.mkdir()
+    manifest = tmp_path / "manifest.json"
+    for i in range(3):
+        (root / f"page{i}.md").write_text(f"incremental page {i}")
+
+    assert index_docs_incremental(root, client, manifest, table="docs_inc") == (3, 0)
+    assert index_docs_incremental(root, client, manifest, table="docs_inc") == (0, 0)
+
+    (root / "page0.md").write_text("incremental page 0, edited")
+    (root / "page2.md").unlink()
+    assert index_docs_incremental(root, client, manifest, table="docs_inc") == (1, 1)
+    assert sorted(Path(p).name for p in load_manifest(manifest)) == [
+        "page0.md",
+        "page1.md",
+    ]
+
+    data = client.raw("SELECT text FROM docs_inc;")
+    texts = sorted(row["text"] for row in data[-1]["result"])
+    assert texts == ["incremental page 0, edited", "incremental page 1"]
+
+
+def test_index_docs_chunked(tmp_path: Path, client: SurrealClient):
+    doc = tmp_path / "guide.md"
+    doc.write_text("# Intro\nhello\n## Usage\n" + "step\n" * 40)
+    index_docs(tmp_path, client, table="docs_chunks", bulk=True, chunk_bytes=64)
+
+    data = client.raw("SELECT chunk, offset, text FROM docs_chunks ORDER BY chunk;")
+    rows = data[-1]["result"]
+    assert len(rows) > 2
+    assert rows[0]["text"] == "# Intro\nhello\n"
+    raw = doc.read_bytes()
+    for row in rows:
+        body = row["text"].encode()
+        assert raw[row["offset"] : row["offset"] + len(body)] == body
+
+
+def test_iter_chunks_headings_and_overlap(tmp_path: Path):
+    doc = tmp_path / "a.md"
+    doc.write_text("# A\n```\n# code\n```\n# B\n" + "".join(f"l{i}\n" for i in range(10)))
+    chunks = list(iter_chunks(doc, max_bytes=24, overlap=3))
+    # the "# code" line sits inside a fence, so only "# B" opens a new chunk
+    assert chunks == [
+        (0, "# A\n```\n# code\n```\n"),
+        (19, "# B\nl0\nl1\nl2\nl3\nl4\nl5\n"),
+        (38, "l5\nl6\nl7\nl8\nl9\n"),
+    ]
+
+
+def test_batch_records_limits():
+    records = [{"n": i, "pad": "x" * 10} for i in range(7)]
+    by_count = list(batch_records(records, max_records=3))
+    assert [len(b) for b in by_count] == [3, 3, 1]
+
+    one = len(json.dumps(records[0]))
+    by_bytes = list(batch_records(records, max_records=100, max_bytes=2 * one + 1))
+    assert [len(b) for b in by_bytes] == [2, 2, 2, 1]
+    assert [json.loads(r)["n"] for b in by_bytes for r in b] == list(range(7))
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [["--manifest", "m.json", "--chunk-bytes", "512"]],
+)
+def test_cli_rejects_flags_it_would_ignore(
+    flags: list[str], monkeypatch: pytest.MonkeyPatch, capsys
+):
+    monkeypatch.setattr("sys.argv", ["index_docs.py", "docs", *flags])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
+    assert "cannot be combined" in capsys.readouterr().err
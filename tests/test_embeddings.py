@@ -0,0 +1,120 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from scripts.index_docs import simple_embedding
+from vector_db.embedding_cache import CachedEmbedder, EmbeddingCache
+from vector_db.embeddings import (
+    FeatureHashEmbedder,
+    HashEmbedder,
+    OllamaEmbedder,
+    build_provider,
+    get_provider,
+)
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    """Answers /api/embed with [len(text), index, 1.0] per input."""
+
+    protocol_version = "HTTP/1.1"
+    requests: list[dict] = []
+    connections: set[int] = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append(body)
+        type(self).connections.add(self.client_address[1])
+        vectors = [[float(len(t)), float(i), 1.0] for i, t in enumerate(body["input"])]
+        payload = json.dumps({"model": body["model"], "embeddings": vectors}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_stub():
+    _StubOllama.requests = []
+    _StubOllama.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_ollama_embedder_batches_over_one_connection(ollama_stub):
+    texts = [f"text {i}" for i in range(5)]
+    with OllamaEmbedder(model="stub", base_url=ollama_stub, batch_size=2) as emb:
+        vectors = emb.embed(texts)
+        assert emb.dimension == 3
+
+    assert vectors == [[6.0, i % 2, 1.0] for i in range(5)]
+    assert [len(r["input"]) for r in _StubOllama.requests] == [2, 2, 1]
+    assert {r["model"] for r in _StubOllama.requests} == {"stub"}
+    assert len(_StubOllama.connections) == 1, "expected a single keep-alive socket"
+
+
+def test_hash_embedder_matches_simple_embedding():
+    emb = get_provider("hash")
+    assert isinstance(emb, HashEmbedder)
+    assert emb.embed(["a", "b"]) == [simple_embedding("a"), simple_embedding("b")]
+
+
+def test_feature_hash_embedder_batch():
+    emb = get_provider("fhash", dimension=64)
+    mat = emb.embed_matrix(["Vector search", "vector SEARCH!", "", "unrelated words"])
+    assert mat.shape == (4, 64) and mat.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(mat, axis=1), [1, 1, 0, 1], atol=1e-6)
+    np.testing.assert_allclose(mat[0], mat[1])
+    assert mat[0] @ mat[3] < 0.5
+    assert emb.embed(["Vector search"]) == [mat[0].tolist()]
+    assert FeatureHashEmbedder(64).embed(["x y"]) == emb.embed(["x y"])
+
+
+def test_unknown_provider():
+    with pytest.raises(ValueError):
+        get_provider("nope")
+
+
+def test_build_provider_passes_only_its_options():
+    assert isinstance(build_provider("hash", dimension=64), HashEmbedder)
+    assert build_provider("fhash", model="m", dimension=64).dimension == 64
+    with build_provider("ollama", "m", 64, "http://x:1") as emb:
+        assert (emb.model, str(emb._client.base_url)) == ("m", "http://x:1")
+
+
+def test_cached_embedder_hits_and_lru_eviction(tmp_path, ollama_stub):
+    path = tmp_path / "cache.sqlite"
+    inner = OllamaEmbedder(model="stub", base_url=ollama_stub)
+    with EmbeddingCache(path, max_entries=3) as cache:
+        emb = CachedEmbedder(inner, cache)
+        first = emb.embed(["a", "bb", "ccc"])
+        assert emb.embed(["bb", "a"]) == [first[1], first[0]]
+        emb.embed(["dddd"])  # evicts "ccc", the least recently used
+        assert cache.stats() == {
+            "entries": 3,
+            "hits": 2,
+            "misses": 4,
+            "hit_rate": 2 / 6,
+        }
+
+    # survives a reopen; "ccc" was evicted, "a" was not
+    calls = len(_StubOllama.requests)
+    with EmbeddingCache(path, max_entries=3) as cache:
+        emb = CachedEmbedder(inner, cache)
+        emb.embed(["a"])
+        assert len(_StubOllama.requests) == calls
+        emb.embed(["ccc"])
+        assert len(_StubOllama.requests) == calls + 1
+    inner.close()
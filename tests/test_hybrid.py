@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from scripts.index_docs import index_docs
+from vector_db.client import SurrealClient
+from vector_db.embeddings import HashEmbedder
+from vector_db.hybrid import fuse_rrf, fuse_weighted, hybrid_search
+
+TEXT_HITS = [{"id": "d:a", "bm25": 9.0}, {"id": "d:b", "bm25": 3.0}]
+VECTOR_HITS = [{"id": "d:c", "distance": 0.1}, {"id": "d:b", "distance": 0.4}]
+
+
+def test_fuse_rrf_rewards_agreement():
+    scores = fuse_rrf([TEXT_HITS, VECTOR_HITS], k=1)
+    assert scores == pytest.approx({"d:a": 1 / 2, "d:b": 1 / 3 + 1 / 3, "d:c": 1 / 2})
+
+
+def test_fuse_weighted_normalises_each_side():
+    scores = fuse_weighted(TEXT_HITS, VECTOR_HITS, text_weight=0.75)
+    assert scores == pytest.approx({"d:a": 0.75, "d:b": 0.0, "d:c": 0.25})
+
+
+def test_hybrid_search_one_round_trip(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        json=[
+            {"status": "OK", "result": None},
+            {"status": "OK", "result": None},
+            {"status": "OK", "result": TEXT_HITS},
+            {"status": "OK", "result": VECTOR_HITS},
+        ]
+    )
+    with SurrealClient() as client:
+        hits = hybrid_search(client, "d", "knn", [0.0, 1.0], k=2)
+    assert [h["id"] for h in hits] == ["d:b", "d:a"]
+    assert hits[0]["bm25"] == 3.0 and hits[0]["distance"] == 0.4
+    sql = httpx_mock.get_request().content.decode()
+    assert "@1@ $text" in sql and "<|8|> $vector" in sql
+
+
+def test_hybrid_search_finds_exact_api_name(tmp_path: Path, client: SurrealClient):
+    (tmp_path / "knn.md").write_text("Use vector::distance::knn() after a KNN operator.")
+    (tmp_path / "math.md").write_text("Vector math: add, subtract and scale vectors.")
+    (tmp_path / "users.md").write_text("Define users and roles for a database.")
+    index_docs(tmp_path, client, table="docs_hybrid")
+
+    vector = HashEmbedder().embed(["Vector math"])[0]
+    hits = hybrid_search(client, "docs_hybrid", "vector::distance::knn", vector, k=2)
+    assert Path(hits[0]["path"]).name == "knn.md"
+    assert "bm25" in hits[0]
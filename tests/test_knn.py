@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from vector_db.client import SurrealClient
+from vector_db.knn import KnnIndex, recall_at_k
+
+
+def _brute_force(vectors, query, k, metric):
+    def dist(v):
+        if metric == "euclidean":
+            return float(np.linalg.norm(v - query))
+        if metric == "cosine":
+            return 1 - float(v @ query / np.linalg.norm(v) / np.linalg.norm(query))
+        return -float(v @ query)
+
+    return sorted(range(len(vectors)), key=lambda i: dist(vectors[i]))[:k]
+
+
+@pytest.mark.parametrize("metric", ["euclidean", "cosine", "dot"])
+def test_search_matches_brute_force(metric):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 8)).astype(np.float32)
+    queries = rng.normal(size=(5, 8)).astype(np.float32)
+    index = KnnIndex([f"v:{i}" for i in range(200)], vectors, metric)
+
+    ids, dist = index.search(queries, k=7)
+    assert dist.shape == (5, 7)
+    assert np.all(np.diff(dist, axis=1) >= 0)
+    for q, row in zip(queries, ids):
+        assert row == [f"v:{i}" for i in _brute_force(vectors, q, 7, metric)]
+
+
+def test_search_single_query_and_k_clipping():
+    index = KnnIndex(["a", "b", "c"], [[0, 0], [1, 0], [5, 5]])
+    ids, dist = index.search([0.9, 0], k=10)
+    assert ids == [["b", "a", "c"]]
+    np.testing.assert_allclose(dist[0, :2], [0.1, 0.9], rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        index.search([1, 2, 3], k=1)
+
+
+def test_recall_at_k():
+    assert recall_at_k([["a", "b"], ["c", "x"]], [["a", "b"], ["c", "d"]]) == 0.75
+
+
+def test_knn_agrees_with_mtree(client: SurrealClient):
+    cmds = [
+        "DEFINE TABLE knn_item SCHEMALESS;",
+        "DEFINE INDEX idx_knn_emb ON knn_item FIELDS embedding MTREE DIMENSION 3;",
+    ]
+    for i in range(20):
+        cmds.append(f"CREATE knn_item:{i} SET embedding = {[i, i + 1, i + 2]};")
+    client.raw(" ".join(cmds))
+
+    index = KnnIndex.from_table(client, "knn_item")
+    assert len(index) == 20
+    local, _ = index.search([5, 6, 7], k=3)
+
+    [rows] = client.query("SELECT id FROM knn_item WHERE embedding <|3|> [5,6,7];")
+    remote = [[row["id"] for row in rows]]
+    assert local[0][0] == "knn_item:5"
+    assert recall_at_k(remote, local) == 1.0
@@ -0,0 +1,118 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from scripts.index_docs import index_docs
+from vector_db.client import SurrealClient
+from vector_db.embeddings import HashEmbedder
+from vector_db.knn_cache import KnnCache, knn_search
+from vector_db.rpc import RpcClient
+
+HITS = [{"id": "d:a", "distance": 0.1}]
+
+
+def test_near_identical_vectors_share_an_entry():
+    cache = KnnCache(resolution=1e-3)
+    key = cache.key("d", 5, "euclidean", [0.1, 0.2])
+    cache.put(key, HITS)
+    assert cache.get(cache.key("d", 5, "euclidean", [0.1 + 1e-6, 0.2])) == HITS
+    assert cache.get(cache.key("d", 5, "euclidean", [0.11, 0.2])) is None
+    assert cache.get(cache.key("d", 6, "euclidean", [0.1, 0.2])) is None
+    assert cache.get(cache.key("d", 5, "cosine", [0.1, 0.2])) is None
+    assert cache.stats() == {
+        "entries": 1,
+        "hits": 1,
+        "misses": 3,
+        "hit_rate": 0.25,
+        "expired": 0,
+        "invalidations": 0,
+    }
+
+
+def test_ttl_lru_and_invalidation():
+    now = [0.0]
+    cache = KnnCache(max_entries=2, ttl=10.0, clock=lambda: now[0])
+    keys = [cache.key("d", 1, "euclidean", [float(i)]) for i in range(3)]
+    for key in keys:
+        cache.put(key, [key])
+    assert len(cache) == 2 and cache.get(keys[0]) is None  # evicted
+
+    now[0] = 10.0
+    assert cache.get(keys[1]) is None and cache.expired == 1
+
+    cache.put(keys[2], HITS)
+    cache.invalidate("d")
+    assert cache.get(cache.key("d", 1, "euclidean", [2.0])) is None
+    cache.put(cache.key("other", 1, "euclidean", [2.0]), HITS)
+    cache.invalidate("d")
+    assert cache.get(cache.key("other", 1, "euclidean", [2.0])) == HITS
+
+
+def test_knn_search_served_from_cache(httpx_mock: HTTPXMock):
+    response = [{"status": "OK", "result": None}, {"status": "OK", "result": HITS}]
+    httpx_mock.add_response(json=response, is_reusable=True)
+    cache = KnnCache()
+    with SurrealClient() as client:
+        for _ in range(3):
+            assert knn_search(client, "d", [0.0, 1.0], k=1, cache=cache) == HITS
+        cache.invalidate("d")
+        knn_search(client, "d", [0.0, 1.0], k=1, cache=cache)
+    assert len(httpx_mock.get_requests()) == 2
+    assert cache.hits == 2 and cache.misses == 2
+    sql = httpx_mock.get_requests()[0].content.decode()
+    assert "WHERE embedding <|1|> $vector ORDER BY distance" in sql
+
+
+def test_knn_search_keys_on_fields_and_ef(httpx_mock: HTTPXMock):
+    with_text = [{**HITS[0], "text": "body"}]
+    for rows in (HITS, with_text, with_text):
+        httpx_mock.add_response(
+            json=[{"status": "OK", "result": None}, {"status": "OK", "result": rows}]
+        )
+    cache = KnnCache()
+    with SurrealClient() as client:
+        assert knn_search(client, "d", [0.0, 1.0], k=1, cache=cache) == HITS
+        rows = knn_search(client, "d", [0.0, 1.0], k=1, fields="id, text", cache=cache)
+        assert rows == with_text
+        knn_search(client, "d", [0.0, 1.0], k=1, fields="id, text", cache=cache, ef=64)
+        knn_search(client, "d", [0.0, 1.0], k=1, fields="id, text", cache=cache)
+    assert len(httpx_mock.get_requests()) == 3
+    assert cache.hits == 1 and cache.misses == 3
+
+
+def test_indexer_invalidates_cached_results(tmp_path: Path, client: SurrealClient):
+    (tmp_path / "a.md").write_text("alpha")
+    index_docs(tmp_path, client, table="docs_cached")
+    cache = KnnCache()
+    vector = HashEmbedder().embed(["beta"])[0]
+
+    def search():
+        return knn_search(
+            client, "docs_cached", vector, k=5, fields="path", cache=cache
+        )
+
+    assert len(search()) == 1
+    assert len(search()) == 1 and cache.hits == 1
+
+    (tmp_path / "b.md").write_text("beta")
+    index_docs(tmp_path / "b.md", client, table="docs_cached", knn_cache=cache)
+    assert len(search()) == 2
+
+
+@pytest.mark.asyncio
+async def test_watch_invalidates_on_live_notifications(surreal):
+    cache = KnnCache()
+    async with RpcClient(**surreal) as rpc:
+        await rpc.raw("DEFINE TABLE docs_live SCHEMALESS;")
+        watcher = await cache.watch(rpc, "docs_live")
+        await rpc.query("CREATE docs_live SET n = 1;")
+        for _ in range(100):
+            if cache.invalidations:
+                break
+            await asyncio.sleep(0.05)
+        watcher.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await watcher
+    assert cache.invalidations == 1
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pytest_httpx import HTTPXMock
+
+from scripts.index_docs import index_docs
+from vector_db.client import SurrealClient
+from vector_db.metrics import Histogram, Metrics, percentiles_ms
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    hist = Histogram((1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        hist.observe(value)
+    assert hist.counts == [1, 2, 1, 1]
+    assert hist.quantile(0.5) == pytest.approx(1.75)
+    assert hist.quantile(0.99) == 10.0
+    assert hist.summary()["mean"] == pytest.approx(3.3)
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_percentiles_ms_match_numpy():
+    samples = [0.004, 0.001, 0.010, 0.002, 0.003, 0.050, 0.007]
+    expected = np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+    assert list(percentiles_ms(samples).values()) == pytest.approx(expected)
+    assert percentiles_ms([0.002]) == {"p50_ms": 2.0, "p95_ms": 2.0, "p99_ms": 2.0}
+    assert set(percentiles_ms([]).values()) == {None}
+
+
+def test_render_prometheus_text():
+    metrics = Metrics()
+    metrics.describe("jobs_total", "Jobs run")
+    metrics.inc("jobs_total", route='a"b')
+    metrics.inc("jobs_total", 2, route='a"b')
+    metrics.observe("job_seconds", 0.003, buckets=(0.001, 0.01), stage="read")
+    metrics.gauge("queue_depth", lambda: 7)
+    assert metrics.render().splitlines() == [
+        "# TYPE queue_depth gauge",
+        "queue_depth 7",
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{route="a\\"b"} 3',
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{stage="read",le="0.001"} 0',
+        'job_seconds_bucket{stage="read",le="0.01"} 1',
+        'job_seconds_bucket{stage="read",le="+Inf"} 1',
+        'job_seconds_sum{stage="read"} 0.003',
+        'job_seconds_count{stage="read"} 1',
+    ]
+
+
+def test_dump_writes_json_summary(tmp_path: Path):
+    metrics = Metrics()
+    with metrics.time("step_seconds", step="a"):
+        pass
+    metrics.inc("steps_total")
+    metrics.dump(tmp_path / "metrics.json")
+    summary = json.loads((tmp_path / "metrics.json").read_text())
+    assert summary["counters"] == {"steps_total": {"": 1}}
+    assert summary["histograms"]["step_seconds"]["step=a"]["count"] == 1
+    assert set(summary["histograms"]["step_seconds"]["step=a"]) >= {"p50", "p99"}
+
+
+def test_client_and_indexer_record_timings(tmp_path: Path, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=[], is_reusable=True)
+    for name in ("a.md", "b.md", "c.md"):
+        (tmp_path / name).write_text(name)
+    metrics = Metrics()
+    with SurrealClient(metrics=metrics) as client:
+        index_docs(tmp_path, client, bulk=True, batch_size=2, metrics=metrics)
+
+    histograms = metrics.summary()["histograms"]
+    stages = histograms["index_stage_seconds"]
+    assert stages["stage=read"]["count"] == 3
+    assert stages["stage=embed"]["count"] == 1
+    assert stages["stage=upload"]["count"] == 2
+    assert histograms["surreal_query_seconds"][""]["count"] == 3  # setup + 2 batches
+    sent = sum(len(r.content) for r in httpx_mock.get_requests())
+    assert histograms["surreal_request_bytes"][""]["sum"] == sent
@@ -0,0 +1,154 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pytest_httpx import HTTPXMock
+
+from scripts.index_docs import index_docs
+from vector_db.client import SurrealClient
+from vector_db.embeddings import FeatureHashEmbedder
+from vector_db.quantize import (
+    FULL_FIELD,
+    FullPrecisionFile,
+    code_bytes,
+    dequantize_int8,
+    quantize_binary,
+    quantize_int8,
+    quantize_records,
+    quantized_index_ddl,
+    quantized_search,
+    recall_memory_report,
+    stored_bytes,
+)
+
+
+def _unit_vectors(n, d, seed=0):
+    x = np.random.default_rng(seed).standard_normal((n, d)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def test_int8_roundtrip_within_half_a_step():
+    x = _unit_vectors(50, 16)
+    codes, scales = quantize_int8(x)
+    assert codes.dtype == np.int8 and np.abs(codes).max() == 127
+    error = np.abs(dequantize_int8(codes, scales) - x)
+    assert (error <= scales[:, None] / 2 + 1e-7).all()
+    assert quantize_int8([0.0, 0.0])[0].tolist() == [[0, 0]]
+
+
+def test_binary_thresholds_at_row_mean():
+    assert quantize_binary([[1.0, 2.0, 3.0, 4.0]]).tolist() == [[0, 0, 1, 1]]
+    assert code_bytes("binary", 768) == 96
+    assert code_bytes("int8", 768) == 772
+    assert code_bytes("float32", 768) == 3072
+
+
+def test_stored_bytes_counts_i16_codes_and_full_vectors():
+    # I16 codes take 2 bytes per component; the float32 original stays in the
+    # record unless it lives in a FullPrecisionFile
+    assert stored_bytes("float32", 768) == 3072
+    assert stored_bytes("int8", 768) == 1536 + 4 + 3072
+    assert stored_bytes("binary", 768) == 1536 + 3072
+    assert stored_bytes("int8", 768, full_in_record=False) == 1536 + 4 + 8
+    assert stored_bytes("binary", 768, full_in_record=False) == 1536 + 8
+
+
+def test_quantized_index_ddl():
+    assert quantized_index_ddl("t", "int8", 8) == (
+        "DEFINE INDEX IF NOT EXISTS idx_t_emb ON t FIELDS embedding "
+        "MTREE DIMENSION 8 TYPE I16 DIST COSINE;"
+    )
+    assert "DIST MANHATTAN" in quantized_index_ddl("t", "binary", 8)
+    with pytest.raises(ValueError):
+        quantized_index_ddl("t", "int4", 8)
+
+
+def test_full_precision_file_appends_and_maps(tmp_path: Path):
+    full = FullPrecisionFile(tmp_path / "vectors.f32", 3)
+    assert full.append([[1, 2, 3], [4, 5, 6]]) == range(0, 2)
+    assert full.rows([1]).tolist() == [[4, 5, 6]]
+    assert full.append([7, 8, 9]) == range(2, 3)
+    assert full.rows([2, 0]).tolist() == [[7, 8, 9], [1, 2, 3]]
+    assert len(FullPrecisionFile(tmp_path / "vectors.f32", 3)) == 3
+
+
+def test_recall_memory_report_reranks_int8_to_exact():
+    vectors = _unit_vectors(2000, 64)
+    queries = _unit_vectors(20, 64, seed=1)
+    report = {r["mode"]: r for r in recall_memory_report(vectors, queries, k=10)}
+    assert report["float32"]["stored_bytes"] == 256
+    assert report["int8"]["stored_bytes"] == 128 + 4 + 256
+    assert report["int8"]["packed_compression"] == pytest.approx(256 / 68)
+    external = recall_memory_report(vectors, queries, k=10, full_in_record=False)
+    assert {r["mode"]: r for r in external}["binary"]["compression"] == 256 / 136
+    assert report["int8"]["recall@10"] >= 0.95
+    for mode in ("int8", "binary"):
+        assert report[mode]["recall@10"] >= report[mode]["recall_raw"]
+
+
+def test_quantized_search_reranks_candidates(httpx_mock: HTTPXMock):
+    # the compact index returns the far vector first; re-ranking fixes the order
+    candidates = [
+        {"id": "d:far", "path": "far.md", FULL_FIELD: [0.0, 1.0]},
+        {"id": "d:near", "path": "near.md", FULL_FIELD: [1.0, 0.1]},
+    ]
+    httpx_mock.add_response(
+        json=[{"status": "OK", "result": None}, {"status": "OK", "result": candidates}]
+    )
+    with SurrealClient() as client:
+        hits = quantized_search(client, "d", [1.0, 0.0], k=1, oversample=2)
+    assert hits == [{"id": "d:near", "path": "near.md", "distance": pytest.approx(0.1)}]
+    sql = httpx_mock.get_request().content.decode()
+    assert "LET $code = [127, 0];" in sql and "<|2|> $code" in sql
+
+
+def test_quantize_records_side_field_or_file(tmp_path: Path):
+    [record] = quantize_records([{"embedding": [0.5, -1.0]}], "int8")
+    assert record["embedding"] == [64, -127]
+    assert record["embedding_scale"] == pytest.approx(1 / 127)
+    assert record[FULL_FIELD] == [0.5, -1.0]
+
+    full = FullPrecisionFile(tmp_path / "v.f32", 2)
+    [record] = quantize_records([{"embedding": [0.5, -1.0]}], "binary", full)
+    assert record == {"embedding": [1, 0], "embedding_row": 0}
+    assert full.rows([0]).tolist() == [[0.5, -1.0]]
+
+
+def test_quantize_records_appends_once_per_batch(tmp_path: Path, monkeypatch):
+    full = FullPrecisionFile(tmp_path / "v.f32", 2)
+    appends = []
+    append = full.append
+    monkeypatch.setattr(full, "append", lambda v: appends.append(len(v)) or append(v))
+    records = [{"embedding": [float(i), 1.0]} for i in range(5)]
+    out = list(quantize_records(records, "int8", full, batch_size=2))
+    assert appends == [2, 2, 1]
+    assert [r["embedding_row"] for r in out] == [0, 1, 2, 3, 4]
+    assert full.rows([4]).tolist() == [[4.0, 1.0]]
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_table_against_surreal(
+    tmp_path: Path, client: SurrealClient, mode: str
+):
+    texts = {
+        "knn.md": "vector search with the knn operator",
+        "users.md": "define users and roles",
+        "math.md": "vector math add subtract",
+    }
+    for name, text in texts.items():
+        (tmp_path / name).write_text(text)
+    embedder = FeatureHashEmbedder(dimension=64)
+    full = FullPrecisionFile(tmp_path / "full.f32", 64)
+    index_docs(
+        tmp_path,
+        client,
+        table="docs_q",
+        embedder=embedder,
+        quantize=mode,
+        full_precision=full,
+    )
+
+    vector = embedder.embed([texts["users.md"]])[0]
+    hits = quantized_search(client, "docs_q", vector, k=1, mode=mode, full=full)
+    assert Path(hits[0]["path"]).name == "users.md"
+    assert hits[0]["distance"] == pytest.approx(0.0, abs=1e-5)
@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.qwen_server import QwenServer
+from vector_db.qwen import QwenClient
+
+
+class FakeAsyncChat:
+    """Stands in for `AsyncOpenAI`: echoes prompts and tracks parallelism."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        message = SimpleNamespace(content=f"{model}:{messages[-1]['content']}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.mark.asyncio
+async def test_batched_prompts_limited_and_cached(tmp_path, serve_app):
+    fake = FakeAsyncChat()
+    server = QwenServer(fake, model="qwen", concurrency=2)
+    sock = await serve_app(server.create_app(), unix_socket=str(tmp_path / "q.sock"))
+
+    with QwenClient(unix_socket=sock) as qwen:
+        prompts = [f"p{i}" for i in range(6)]
+        answers = await asyncio.to_thread(qwen.complete, prompts)
+        assert answers == [f"qwen:p{i}" for i in range(6)]
+        assert fake.peak == 2
+
+        assert await asyncio.to_thread(qwen.ask, "p3") == "qwen:p3"
+        assert fake.calls == 6
+        health = await asyncio.to_thread(qwen.health)
+        assert health["cache_hits"] == 1 and health["completed"] == 6
+
+
+@pytest.mark.asyncio
+async def test_rejects_bad_prompts(serve_app):
+    url = await serve_app(QwenServer(FakeAsyncChat()).create_app())
+
+    with QwenClient(url) as qwen:
+        for body in (
+            {"json": {"prompts": "hi"}},
+            {"json": {"prompts": ["hi"], "max_tokens": "8"}},
+            {"json": ["hi"]},
+            {"content": b"not json"},
+        ):
+            res = await asyncio.to_thread(qwen.http.post, "/complete", **body)
+            assert res.status_code == 400, body
+
+
+@pytest.mark.asyncio
+async def test_cache_key_includes_max_tokens():
+    fake = FakeAsyncChat()
+    server = QwenServer(fake)
+    await server.complete("p", "qwen", max_tokens=4)
+    await server.complete("p", "qwen")
+    await server.complete("p", "qwen", max_tokens=4)
+    assert fake.calls == 2
@@ -0,0 +1,79 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from pytest_httpx import HTTPXMock
+
+from scripts.ask_qwen import ask
+from vector_db.client import SurrealClient
+from vector_db.embeddings import HashEmbedder
+from vector_db.rag import AnswerCache, build_messages, estimate_tokens
+
+
+class FakeChat:
+    """Stands in for `OpenAI`: streams a fixed answer and counts calls."""
+
+    def __init__(self, answer: str) -> None:
+        self.answer = answer
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        assert kwargs["stream"] is True
+        for word in self.answer.split(" "):
+            delta = SimpleNamespace(content=word + " ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def test_build_messages_respects_token_budget():
+    chunks = [
+        {"id": "d:1", "path": "a.md", "text": "a" * 400},
+        {"id": "d:2", "path": "b.md", "text": "b" * 4000},
+        {"id": "d:3", "path": "c.md", "text": "c" * 40},
+    ]
+    messages = build_messages("why?", chunks, max_tokens=300)
+    prompt = messages[-1]["content"]
+    assert "[a.md]" in prompt and "[b.md]" in prompt and "[c.md]" not in prompt
+    assert sum(estimate_tokens(m["content"]) for m in messages) <= 300
+
+
+def test_answer_cache_lru():
+    cache = AnswerCache(max_entries=2)
+    cache.put(("m", "q1", ()), "one")
+    cache.put(("m", "q2", ()), "two")
+    assert cache.get(("m", "q1", ())) == "one"
+    cache.put(("m", "q3", ()), "three")
+    assert cache.get(("m", "q2", ())) is None
+    assert len(cache) == 2 and (cache.hits, cache.misses) == (1, 1)
+
+
+def test_rag_answer_streams_then_hits_cache(httpx_mock: HTTPXMock):
+    hits = [{"id": "docs:1", "path": "knn.md", "text": "use <|k|>", "bm25": 1.0}]
+    for _ in range(2):
+        httpx_mock.add_response(
+            json=[
+                {"status": "OK", "result": None},
+                {"status": "OK", "result": None},
+                {"status": "OK", "result": hits},
+                {"status": "OK", "result": []},
+            ]
+        )
+    llm = FakeChat("Use the KNN operator.")
+    cache = AnswerCache()
+    with SurrealClient() as db:
+        for _ in range(2):
+            out = io.StringIO()
+            answer = ask(llm, "qwen", "How to knn?", db, HashEmbedder(), cache, out=out)
+            assert out.getvalue().strip() == answer.strip() == "Use the KNN operator."
+    assert len(llm.calls) == 1
+    assert "use <|k|>" in llm.calls[0]["messages"][-1]["content"]
+    assert cache.hits == 1
+
+
+def test_ask_qwen_does_not_import_numpy():
+    code = "import sys, scripts.ask_qwen; sys.exit('numpy' in sys.modules)"
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
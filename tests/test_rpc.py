@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from websockets.asyncio.server import serve
+
+from vector_db.client import SurrealError
+from vector_db.rpc import RpcClient, ws_url
+
+LIVE_ID = "0189d6e3-8eac-703a-9a48-d9faa78b44b9"
+
+
+async def _stub_handler(ws):
+    """Answer queries after their ``delay`` var, so replies arrive out of order."""
+
+    async def reply(msg):
+        method, params = msg["method"], msg["params"]
+        out = {"id": msg["id"], "result": None}
+        if method == "query":
+            sql, vars = params
+            if sql.startswith("THROW"):
+                out = {"id": msg["id"], "error": {"code": -32000, "message": "boom"}}
+            else:
+                await asyncio.sleep(vars.get("delay", 0))
+                out["result"] = [{"status": "OK", "result": vars.get("n"), "time": "1µs"}]
+        elif method == "live":
+            # the first notification beats the response carrying the live id
+            note = {"action": "CREATE", "id": LIVE_ID, "result": {"id": "t:1"}}
+            await ws.send(json.dumps({"result": note}))
+            out["result"] = LIVE_ID
+        await ws.send(json.dumps(out))
+
+    async with asyncio.TaskGroup() as tg:
+        async for message in ws:
+            tg.create_task(reply(json.loads(message)))
+
+
+@pytest_asyncio.fixture
+async def rpc_stub():
+    async with serve(_stub_handler, "127.0.0.1", 0, subprotocols=["json"]) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"http://127.0.0.1:{port}"
+
+
+def test_ws_url():
+    assert ws_url("http://127.0.0.1:8000") == "ws://127.0.0.1:8000/rpc"
+    assert ws_url("https://db.local/") == "wss://db.local/rpc"
+    assert ws_url("ws://h:1/rpc") == "ws://h:1/rpc"
+
+
+@pytest.mark.asyncio
+async def test_multiplexed_replies_out_of_order(rpc_stub):
+    async with RpcClient(rpc_stub) as rpc:
+        results = await asyncio.gather(
+            *(rpc.query("RETURN $n;", {"n": n, "delay": (5 - n) / 100}) for n in range(5))
+        )
+    assert results == [[n] for n in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_rpc_error_raises(rpc_stub):
+    async with RpcClient(rpc_stub) as rpc:
+        with pytest.raises(SurrealError, match="boom"):
+            await rpc.query("THROW 'boom';")
+        assert await rpc.query("RETURN $n;", {"n": 1}) == [1]
+
+
+@pytest.mark.asyncio
+async def test_live_notification_before_live_id(rpc_stub):
+    async with RpcClient(rpc_stub) as rpc:
+        live = await rpc.live("t")
+        assert live.id == LIVE_ID
+        note = await anext(live)
+        assert note["action"] == "CREATE"
+        await live.kill()
+        assert [n async for n in live] == []
+
+
+@pytest.mark.asyncio
+async def test_live_select_against_surreal(surreal):
+    async with RpcClient(**surreal) as rpc:
+        await rpc.raw("DEFINE TABLE rpc_live SCHEMALESS;")
+        live = await rpc.live_query("LIVE SELECT * FROM rpc_live;")
+        await asyncio.gather(
+            *(rpc.query("CREATE rpc_live SET n = $n;", {"n": n}) for n in range(3))
+        )
+        notes = [await asyncio.wait_for(anext(live), 5) for _ in range(3)]
+        await live.kill()
+    assert sorted(n["result"]["n"] for n in notes) == [0, 1, 2]
+    assert {n["action"] for n in notes} == {"CREATE"}
@@ -0,0 +1,138 @@
+import contextlib
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from scripts.index_docs import SHARD_IN_FLIGHT, index_docs_sharded
+from vector_db.embeddings import FeatureHashEmbedder
+from vector_db.metrics import Metrics
+from vector_db.shard import ShardedClient, shard_of
+
+
+def test_shard_of_is_stable_and_spreads_keys():
+    assert shard_of("docs/knn.md", 4) == shard_of("docs/knn.md", 4)
+    counts = Counter(shard_of(f"docs/{i}.md", 4) for i in range(4000))
+    assert sorted(counts) == [0, 1, 2, 3]
+    assert min(counts.values()) > 800
+
+
+def test_knn_merges_partial_results_by_distance(httpx_mock: HTTPXMock):
+    partials = {
+        "ns_0": [{"id": "d:a", "distance": 0.1}, {"id": "d:c", "distance": 0.7}],
+        "ns_1": [{"id": "d:b", "distance": 0.3}, {"id": "d:d", "distance": 0.9}],
+    }
+    for namespace, rows in partials.items():
+        httpx_mock.add_response(
+            match_headers={"Surreal-NS": namespace},
+            json=[{"status": "OK", "result": None}, {"status": "OK", "result": rows}],
+        )
+    with ShardedClient.from_namespaces(["ns_0", "ns_1"]) as sharded:
+        hits = sharded.knn("d", [0.0, 1.0], k=3)
+    assert [hit["id"] for hit in hits] == ["d:a", "d:b", "d:c"]
+    for request in httpx_mock.get_requests():
+        assert "<|3|> $vector" in request.content.decode()
+
+
+def test_index_routes_each_file_to_its_shard(tmp_path: Path, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=[], is_reusable=True)
+    paths = []
+    for i in range(8):
+        paths.append(tmp_path / f"doc{i}.md")
+        paths[-1].write_text(f"document {i}")
+    with ShardedClient.from_namespaces(["ns_0", "ns_1"]) as sharded:
+        assert index_docs_sharded(tmp_path, sharded, batch_size=3) == 8
+
+    inserts = [
+        request
+        for request in httpx_mock.get_requests()
+        if b"INSERT INTO docs" in request.content
+    ]
+    for path in paths:
+        [request] = [r for r in inserts if json.dumps(str(path)).encode() in r.content]
+        assert request.headers["Surreal-NS"] == f"ns_{shard_of(str(path), 2)}"
+
+
+def test_index_bounds_batches_in_flight_per_shard(
+    tmp_path: Path, httpx_mock: HTTPXMock, monkeypatch
+):
+    def slow_insert(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.01)
+        return httpx.Response(200, json=[])
+
+    httpx_mock.add_callback(slow_insert, is_reusable=True)
+    for i in range(12):
+        (tmp_path / f"doc{i}.md").write_text(f"document {i}")
+    metrics = Metrics()
+    with ShardedClient.from_namespaces(["ns_0", "ns_1"]) as sharded:
+        submitted: list[list] = [[], []]
+        peak = [0, 0]
+        submit = sharded.submit
+
+        def tracked_submit(shard, fn, *args):
+            submitted[shard].append(submit(shard, fn, *args))
+            busy = sum(not future.done() for future in submitted[shard])
+            peak[shard] = max(peak[shard], busy)
+            return submitted[shard][-1]
+
+        monkeypatch.setattr(sharded, "submit", tracked_submit)
+        index_docs_sharded(tmp_path, sharded, batch_size=1, metrics=metrics)
+
+    assert sum(map(len, submitted)) == 2 + 12  # setup per shard, one batch per file
+    assert max(peak) <= SHARD_IN_FLIGHT
+    stages = metrics.summary()["histograms"]["index_stage_seconds"]
+    assert stages["stage=read"]["count"] == 12
+    assert stages["stage=upload"]["count"] == 12
+    assert stages["stage=embed"]["count"] >= 1
+
+
+def test_sharded_index_and_search_against_surreal(tmp_path: Path, surreal):
+    texts = {
+        f"doc{i}.md": f"document {i} about {topic}"
+        for i, topic in enumerate(["vectors", "users", "tables", "indexes"] * 3)
+    }
+    for name, text in texts.items():
+        (tmp_path / name).write_text(text)
+    embedder = FeatureHashEmbedder(dimension=32)
+    namespaces = [f"{surreal['namespace']}_{i}" for i in range(3)]
+    options = {k: v for k, v in surreal.items() if k != "namespace"}
+    with ShardedClient.from_namespaces(namespaces, **options) as sharded:
+        try:
+            count = index_docs_sharded(
+                tmp_path, sharded, table="docs_s", batch_size=2, embedder=embedder
+            )
+            assert count == len(texts)
+            totals = sharded.query("SELECT count() FROM docs_s GROUP ALL;")
+            per_shard = [rows[0]["count"] if rows else 0 for [rows] in totals]
+            assert sum(per_shard) == len(texts) and all(per_shard)
+
+            vector = embedder.embed([texts["doc5.md"]])[0]
+            hits = sharded.knn("docs_s", vector, k=4, fields="path")
+            assert Path(hits[0]["path"]).name == "doc5.md"
+            distances = [hit["distance"] for hit in hits]
+            assert len(hits) == 4 and distances == sorted(distances)
+        finally:
+            with contextlib.suppress(httpx.TransportError):
+                sharded.raw(
+                    "; ".join(f"REMOVE NAMESPACE IF EXISTS {ns}" for ns in namespaces)
+                )
+
+
+def test_shard_module_stays_light():
+    code = (
+        "import sys, vector_db.shard; "
+        "sys.exit(bool({'numpy', 'websockets'} & set(sys.modules)))"
+    )
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+
+def test_sharded_client_requires_a_shard():
+    with pytest.raises(ValueError):
+        ShardedClient([])
@@ -1,8 +1,8 @@
 import httpx
 
 
-def test_surrealdb_info_root():
-    url = "http://127.0.0.1:8000/info"
+def test_surrealdb_info_root(surreal_url):
+    url = f"{surreal_url}/info"
     auth = ("root", "root")
     response = httpx.get(url, auth=auth, timeout=10.0)
     # 404 is normal for /info in memory mode, 401 means auth failed
@@ -12,8 +12,8 @@ def test_surrealdb_info_root():
     ), f"Unexpected status: {response.status_code} {response.text}"
 
 
-def test_surrealdb_info_guest():
-    url = "http://127.0.0.1:8000/info"
-    auth = ("guest", "guest")
-    response = httpx.get(url, auth=auth, timeout=10.0)
-    assert response.status_code == 401, "Guest should not be able to access /info"
+def test_surrealdb_info_guest(guest):
+    # guest signs in as a database VIEWER; server-level info stays root-only
+    data = guest.raw("INFO FOR DB; INFO FOR ROOT;")
+    statuses = [stmt["status"] for stmt in data]
+    assert statuses == ["OK", "ERR"], f"Guest should only see its database: {data}"
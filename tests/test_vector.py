@@ -1,25 +1,7 @@
-import httpx
-import pytest
+from vector_db.client import SurrealClient
 
 
-@pytest.fixture(scope="module")
-def client():
-    with httpx.Client(
-        base_url="http://127.0.0.1:8000", auth=("root", "root"), timeout=10.0
-    ) as c:
-        yield c
-
-
-_SQL_HEADER = {"Accept": "application/json"}
-
-
-def _sql(client: httpx.Client, query: str):
-    res = client.post("/sql", headers=_SQL_HEADER, content=query)
-    res.raise_for_status()
-    return res.json()
-
-
-def _setup_table(client: httpx.Client):
+def _setup_table(client: SurrealClient):
     cmds = [
         "DEFINE TABLE item SCHEMALESS;",
         "DEFINE INDEX idx_emb ON item FIELDS embedding MTREE DIMENSION 3;",
@@ -27,14 +9,13 @@ def _setup_table(client: httpx.Client):
     for i in range(20):
         vec = [i, i + 1, i + 2]
         cmds.append(f"CREATE item:{i} SET embedding = {vec};")
-    _sql(client, "USE NS test DB test; " + " ".join(cmds))
+    client.raw(" ".join(cmds))
 
 
 def test_vector_search_success(client):
     _setup_table(client)
-    data = _sql(
-        client,
-        "USE NS test DB test; SELECT id FROM item WHERE embedding <|3|> [5,6,7];",
+    data = client.raw(
+        "SELECT id FROM item WHERE embedding <|3|> [5,6,7];",
     )
     ids = [row["result"][0]["id"] for row in data if row.get("result")]
     assert ids and ids[0] == "item:5", f"Expected item:5 first, got {ids}"
@@ -42,11 +23,10 @@ def test_vector_search_success(client):
 
 def test_vector_dimension_mismatch(client):
     _setup_table(client)
-    data = _sql(
-        client,
-        "USE NS test DB test; SELECT id FROM item WHERE embedding <|3|> [1,2];",
+    data = client.raw(
+        "SELECT id FROM item WHERE embedding <|3|> [1,2];",
     )
-    status = data[1]["status"] if len(data) > 1 else data[0]["status"]
+    status = data[0]["status"]
     assert status == "ERR" or "Incorrect vector dimension" in str(
         data
     ), "Expected dimension error"
@@ -54,10 +34,8 @@ def test_vector_dimension_mismatch(client):
 
 def test_vector_order_by_distance(client):
     _setup_table(client)
-    data = _sql(
-        client,
+    data = client.raw(
         (
-            "USE NS test DB test; "
             "SELECT id, vector::distance::euclidean(embedding, [8,9,10]) AS dist "
             "FROM item ORDER BY dist LIMIT 1;"
         ),
@@ -68,10 +46,8 @@ def test_vector_order_by_distance(client):
 
 def test_vector_dot_product(client):
     _setup_table(client)
-    data = _sql(
-        client,
+    data = client.raw(
         (
-            "USE NS test DB test; "
             "SELECT vector::dot(embedding, [1,1,1]) AS dot FROM item WHERE id = item:4;"
         ),
     )
@@ -80,8 +56,7 @@ def test_vector_dot_product(client):
 
 
 def test_vector_cross_length_error(client):
-    data = _sql(
-        client,
+    data = client.raw(
         "RETURN vector::cross([1,2,3], [1,2]);",
     )
     status = data[0]["status"]
@@ -90,19 +65,17 @@ def test_vector_cross_length_error(client):
 
 def test_vector_search_invalid_dimension(client):
     _setup_table(client)
-    data = _sql(
-        client,
-        "USE NS test DB test; SELECT id FROM item WHERE embedding <|4|> [1,2,3,4];",
+    data = client.raw(
+        "SELECT id FROM item WHERE embedding <|4|> [1,2,3,4];",
     )
-    status = data[1]["status"] if len(data) > 1 else data[0]["status"]
+    status = data[0]["status"]
     assert status == "ERR" or "Incorrect vector dimension" in str(
         data
     ), "Expected dimension error"
 
 
 def test_vector_compound_magnitude(client):
-    data = _sql(
-        client,
+    data = client.raw(
         "RETURN vector::magnitude(vector::add(vector::cross([1,0,0], [0,1,0]), [0,0,1]));",
     )
     mag = data[0]["result"]
@@ -110,8 +83,7 @@ def test_vector_compound_magnitude(client):
 
 
 def test_vector_add_dimension_error(client):
-    data = _sql(
-        client,
+    data = client.raw(
         "RETURN vector::dot(vector::add([1,2,3], [4,5]), [1,1,1]);",
     )
     status = data[0]["status"]
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from scripts.index_docs import simple_embedding
+from vector_db.client import SurrealClient
+
+
+def _setup_table(client: SurrealClient, name: str, items: int = 5) -> None:
+    rows = [
+        {"id": i, "embedding": [float(i), float(i + 1), float(i + 2)]}
+        for i in range(items)
+    ]
+    client.query(
+        f"DEFINE TABLE {name} SCHEMALESS; "
+        f"DEFINE INDEX idx_{name}_emb ON {name} FIELDS embedding MTREE DIMENSION 3; "
+        f"INSERT INTO {name} $rows;",
+        {"rows": rows},
+    )
+
+
+def test_knn_returns_ordered_results(client: SurrealClient):
+    _setup_table(client, "vec_order")
+    [rows] = client.query(
+        "SELECT id, vector::distance::knn() AS distance FROM vec_order "
+        "WHERE embedding <|3|> $vector ORDER BY distance;",
+        {"vector": [2, 3, 4]},
+    )
+    ids = [row["id"] for row in rows]
+    assert len(ids) == 3 and ids[0] == "vec_order:2", f"Expected vec_order:2: {ids}"
+
+
+def test_multiple_tables_isolated(client: SurrealClient) -> None:
+    _setup_table(client, "vec_a")
+    _setup_table(client, "vec_b", items=2)
+    sql = "SELECT count() FROM {} WHERE embedding <|3|> $vector GROUP ALL;"
+    counts = [
+        client.query(sql.format(table), {"vector": [1, 2, 3]})[0][0]["count"]
+        for table in ("vec_a", "vec_b")
+    ]
+    assert counts == [3, 2], f"Expected each table's own matches, got {counts}"
+
+
+def test_search_dimension_mismatch(client: SurrealClient) -> None:
+    _setup_table(client, "vec_err", items=1)
+    data = client.raw(
+        "SELECT id FROM vec_err WHERE embedding <|3|> $vector;", {"vector": [1, 2]}
+    )
+    assert data[-1]["status"] == "ERR", "Expected dimension mismatch error"
+
+
+def test_guest_cannot_write_vectors(client: SurrealClient, guest: SurrealClient):
+    _setup_table(client, "guest_vec")
+    params = {"vector": [0, 0, 0]}
+    [rows] = guest.query(
+        "SELECT id FROM guest_vec WHERE embedding <|1|> $vector;", params
+    )
+    assert rows == [{"id": "guest_vec:0"}], "Guest should be able to search"
+    data = guest.raw("CREATE guest_vec SET embedding = $vector;", params)
+    assert data[-1]["status"] == "ERR", "Guest should not be able to write"
+
+
+def test_simple_embedding_roundtrip(tmp_path: Path, client: SurrealClient):
+    text = "Vectors are cool"
+    path = tmp_path / "note.mdx"
+    path.write_text(text)
+    table = "simple_docs"
+    _setup_table(client, table, items=0)
+    emb = simple_embedding(text)
+    client.query(
+        f"CREATE {table}:1 SET path = $path, text = $text, embedding = $embedding;",
+        {"path": str(path), "text": text, "embedding": emb},
+    )
+    [rows] = client.query(
+        f"SELECT text FROM {table} WHERE embedding <|3|> $embedding LIMIT 1;",
+        {"embedding": emb},
+    )
+    assert rows[0]["text"] == text
@@ -0,0 +1,19 @@
+"""
+Shared building blocks for the SurrealDB vector scripts and demo.
+
+Only the dependency-light DB clients are re-exported here.  Import the
+other modules (``embeddings``, ``knn``, ``quantize``, ``rpc``, ``rag``, ...)
+directly, so that a caller only pays for numpy or websockets when it uses
+them.
+"""
+
+from .client import AsyncSurrealClient, SurrealClient, SurrealError
+from .cursor import iter_table, stream_query
+
+__all__ = [
+    "AsyncSurrealClient",
+    "SurrealClient",
+    "SurrealError",
+    "iter_table",
+    "stream_query",
+]
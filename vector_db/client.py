@@ -0,0 +1,293 @@
+"""Pooled HTTP clients for SurrealDB's ``/sql`` endpoint."""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import time
+from typing import Any, Mapping
+
+import httpx
+import jiter
+
+from .metrics import BYTE_BUCKETS, Metrics
+
+DEFAULT_URL = "http://127.0.0.1:8000"
+DEFAULT_NAMESPACE = "test"
+DEFAULT_DATABASE = "test"
+DEFAULT_MAX_CONNECTIONS = 16
+
+_PARAM_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class SurrealError(RuntimeError):
+    """A statement in a query batch returned ``status: ERR``."""
+
+
+def encode_query(sql: str, params: Mapping[str, Any] | None = None) -> str:
+    """
+    Return `sql` preceded by one ``LET $name = <literal>;`` per param.
+
+    ``/sql`` takes no bind variables, so this is not server-side
+    parameterisation: each value is spliced into the request as a SurrealQL
+    literal built by `encode_value`.  The statements in `sql` only ever
+    refer to ``$name``, so caller data cannot change their structure.  Use
+    `vector_db.rpc` where real RPC params are needed.
+    """
+    if not params:
+        return sql
+    lets = []
+    for name, value in params.items():
+        if not _PARAM_NAME.fullmatch(name):
+            raise ValueError(f"invalid parameter name {name!r}")
+        lets.append(f"LET ${name} = {encode_value(value)};")
+    return " ".join(lets) + " " + sql
+
+
+def encode_value(value: Any) -> str:
+    """
+    Encode a JSON-like value as a SurrealQL literal.
+
+    Strings carry the ``s`` prefix so SurrealDB never re-reads one that
+    looks like a record id, datetime or UUID as that type.  NaN, the
+    infinities and ints outside 64 bits raise `ValueError`; anything but
+    None, bools, numbers, strings, lists/tuples and str-keyed dicts
+    raises `TypeError`.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        if not -(2**63) <= value < 2**63:
+            raise ValueError(f"{value} does not fit SurrealQL's 64-bit int")
+        return str(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"{value!r} has no SurrealQL literal")
+        return repr(value)
+    if isinstance(value, str):
+        return "s" + _quote(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(encode_value(v) for v in value) + "]"
+    if isinstance(value, Mapping):
+        items = []
+        for key, v in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"object keys must be str, not {type(key).__name__}")
+            items.append(f"{_quote(key)}: {encode_value(v)}")
+        return "{" + ", ".join(items) + "}"
+    raise TypeError(f"cannot encode {type(value).__name__} as SurrealQL")
+
+
+def _quote(text: str) -> str:
+    # JSON string escapes are valid SurrealQL ones; keep non-ASCII as is
+    return json.dumps(text, ensure_ascii=False)
+
+
+def decode_response(content: bytes, params: Mapping[str, Any] | None = None) -> list[dict]:
+    """Parse a ``/sql`` response and drop the results of the LET prefix."""
+    data = jiter.from_json(content)
+    return data[len(params) :] if params else data
+
+
+def check(statements: list[dict]) -> list[Any]:
+    """Return each statement's ``result``; raise `SurrealError` on any ERR."""
+    for stmt in statements:
+        if stmt.get("status") == "ERR":
+            raise SurrealError(stmt["result"])
+    return [stmt["result"] for stmt in statements]
+
+
+def knn_query(table: str, k: int, fields: str = "id", ef: int | None = None) -> str:
+    """
+    Return the kNN ``SELECT`` over `table`'s ``embedding`` for ``$vector``.
+
+    Rows carry `fields` and ``distance``, nearest first; `ef` sets the
+    HNSW search breadth.
+    """
+    knn = f"<|{k},{ef}|>" if ef else f"<|{k}|>"
+    return (
+        f"SELECT {fields}, vector::distance::knn() AS distance FROM {table} "
+        f"WHERE embedding {knn} $vector ORDER BY distance;"
+    )
+
+
+def _describe(metrics: Metrics) -> None:
+    metrics.describe("surreal_query_seconds", "Round trip of one /sql request")
+    metrics.describe("surreal_request_bytes", "Encoded /sql request body size")
+    metrics.describe("surreal_response_bytes", "Decoded /sql response body size")
+
+
+def _record(metrics: Metrics, start: float, res: httpx.Response) -> None:
+    metrics.observe("surreal_query_seconds", time.perf_counter() - start)
+    metrics.observe("surreal_request_bytes", len(res.request.content), BYTE_BUCKETS)
+    metrics.observe("surreal_response_bytes", len(res.content), BYTE_BUCKETS)
+
+
+def _client_options(
+    url: str,
+    user: str | None,
+    password: str | None,
+    namespace: str,
+    database: str,
+    timeout: float,
+    max_connections: int,
+    http2: bool,
+    compress: bool,
+) -> dict[str, Any]:
+    headers = {
+        "Accept": "application/json",
+        "Surreal-NS": namespace,
+        "Surreal-DB": database,
+        # 1.x servers read the unprefixed names
+        "NS": namespace,
+        "DB": database,
+    }
+    if not compress:
+        headers["Accept-Encoding"] = "identity"
+    return {
+        "base_url": url,
+        "auth": (user, password) if user is not None else None,
+        "headers": headers,
+        "timeout": timeout,
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    }
+
+
+class SurrealClient:
+    """
+    Synchronous SurrealDB client over a keep-alive connection pool.
+
+    Namespace and database travel as headers, so queries need no ``USE``
+    prefix.  `http2` requires the optional ``h2`` package; `compress`
+    lets the server gzip responses.  With `metrics`, every request records
+    its latency and payload sizes there.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        user: str | None = "root",
+        password: str | None = "root",
+        namespace: str = DEFAULT_NAMESPACE,
+        database: str = DEFAULT_DATABASE,
+        timeout: float = 10.0,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        http2: bool = False,
+        compress: bool = True,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self.database = database
+        self.metrics = metrics
+        if metrics is not None:
+            _describe(metrics)
+        self.http = httpx.Client(
+            **_client_options(
+                url,
+                user,
+                password,
+                namespace,
+                database,
+                timeout,
+                max_connections,
+                http2,
+                compress,
+            )
+        )
+
+    @property
+    def url(self) -> str:
+        return str(self.http.base_url).rstrip("/")
+
+    def raw(self, sql: str, params: Mapping[str, Any] | None = None) -> list[dict]:
+        """Run `sql`; return the per-statement ``{status, result, time}`` list."""
+        start = time.perf_counter()
+        res = self.http.post("/sql", content=encode_query(sql, params))
+        if self.metrics is not None:
+            _record(self.metrics, start, res)
+        res.raise_for_status()
+        return decode_response(res.content, params)
+
+    def query(self, sql: str, params: Mapping[str, Any] | None = None) -> list[Any]:
+        """Run `sql`; return each statement's result, raising on errors."""
+        return check(self.raw(sql, params))
+
+    def close(self) -> None:
+        self.http.close()
+
+    def __enter__(self) -> "SurrealClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class AsyncSurrealClient:
+    """Asyncio counterpart of `SurrealClient` sharing one connection pool."""
+
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        user: str | None = "root",
+        password: str | None = "root",
+        namespace: str = DEFAULT_NAMESPACE,
+        database: str = DEFAULT_DATABASE,
+        timeout: float = 10.0,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        http2: bool = False,
+        compress: bool = True,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self.database = database
+        self.metrics = metrics
+        if metrics is not None:
+            _describe(metrics)
+        self.http = httpx.AsyncClient(
+            **_client_options(
+                url,
+                user,
+                password,
+                namespace,
+                database,
+                timeout,
+                max_connections,
+                http2,
+                compress,
+            )
+        )
+
+    @property
+    def url(self) -> str:
+        return str(self.http.base_url).rstrip("/")
+
+    async def raw(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> list[dict]:
+        start = time.perf_counter()
+        res = await self.http.post("/sql", content=encode_query(sql, params))
+        if self.metrics is not None:
+            _record(self.metrics, start, res)
+        res.raise_for_status()
+        return decode_response(res.content, params)
+
+    async def query(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> list[Any]:
+        return check(await self.raw(sql, params))
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+    async def __aenter__(self) -> "AsyncSurrealClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
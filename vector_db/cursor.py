@@ -0,0 +1,158 @@
+"""Stream large SELECTs row by row instead of materialising whole responses."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, Iterator
+
+import jiter
+
+from .client import SurrealClient, check
+
+DEFAULT_PAGE_SIZE = 1000
+PAGE_MODES = ("range", "offset")
+
+_TOKEN = re.compile(rb'["\[\]{},]')
+_STRING_END = re.compile(rb'["\\]')
+_RESULT_DEPTH = 3  # outer array > statement object > result array
+
+
+class RowSplitter:
+    """
+    Incremental splitter for a ``/sql`` response body.
+
+    `feed` takes raw chunks and returns every complete element of the
+    statements' ``result`` arrays, each parsed on its own with `jiter`.
+    Only the current row and one chunk are ever buffered.  Everything
+    outside the rows (status, time, error text) is kept as a small
+    skeleton that `finish` parses and checks once the body is complete.
+    """
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._row: int | None = None  # start of the current row in _buf
+        self._skel = 0  # start of skeleton bytes not yet copied out
+        self._skeleton = bytearray()
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        buf = self._buf = self._buf + chunk
+        rows: list[Any] = []
+        pos = self._pos
+        while True:
+            if self._in_string:
+                m = _STRING_END.search(buf, pos)
+                if m is None:
+                    pos = max(pos, len(buf))
+                    break
+                if m.group() == b"\\":
+                    pos = m.end() + 1  # may point past a chunk boundary
+                    continue
+                self._in_string = False
+                pos = m.end()
+                continue
+            m = _TOKEN.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            tok, pos = m.group(), m.end()
+            if tok == b'"':
+                self._in_string = True
+            elif tok == b"[" or tok == b"{":
+                self._depth += 1
+                if self._depth == _RESULT_DEPTH and tok == b"[":
+                    self._skeleton += buf[self._skel : pos]
+                    self._row = self._skel = pos
+            elif tok == b"]" or tok == b"}":
+                if self._depth == _RESULT_DEPTH and self._row is not None:
+                    self._emit(rows, buf[self._row : m.start()])
+                    self._row = None
+                    self._skel = m.start()
+                self._depth -= 1
+            elif self._depth == _RESULT_DEPTH and self._row is not None:
+                self._emit(rows, buf[self._row : m.start()])
+                self._row = self._skel = pos
+
+        cut = min(pos, len(buf), self._skel if self._row is None else self._row)
+        if self._row is None:
+            self._skeleton += buf[self._skel : cut]
+            self._skel = cut
+        self._buf = buf[cut:]
+        self._pos = pos - cut
+        self._skel -= cut
+        if self._row is not None:
+            self._row -= cut
+        return rows
+
+    @staticmethod
+    def _emit(rows: list[Any], raw: bytes) -> None:
+        raw = raw.strip()
+        if raw:
+            rows.append(jiter.from_json(raw))
+
+    def finish(self) -> list[dict]:
+        """Parse the skeleton; rows are replaced by empty result arrays."""
+        self._skeleton += self._buf[self._skel :]
+        return jiter.from_json(bytes(self._skeleton))
+
+
+def iter_json_rows(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield result rows from a chunked ``/sql`` body; raise on ERR at the end."""
+    splitter = RowSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    check(splitter.finish())
+
+
+def stream_query(client: SurrealClient, sql: str) -> Iterator[Any]:
+    """Run `sql` and yield its result rows as the response body arrives."""
+    with client.http.stream("POST", "/sql", content=sql) as res:
+        res.raise_for_status()
+        yield from iter_json_rows(res.iter_bytes())
+
+
+def iter_table(
+    client: SurrealClient,
+    table: str,
+    fields: str = "*",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    mode: str = "range",
+) -> Iterator[dict]:
+    """
+    Yield every row of `table` in record-id order, one page at a time.
+
+    ``range`` mode resumes each page from the last id seen with a
+    record-id range scan (``table:x>..``), so every page costs the same.
+    ``offset`` mode uses ``ORDER BY id START n LIMIT m``, which works on
+    any server but re-skips earlier rows on every page.  `fields` must
+    not drop ``id``; it is added when missing.
+    """
+    if mode not in PAGE_MODES:
+        raise ValueError(f"mode must be one of {PAGE_MODES}, got {mode!r}")
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    if fields.strip() != "*" and "id" not in re.split(r"\s*,\s*", fields.strip()):
+        fields = f"id, {fields}"
+
+    source = f"{table}:.."
+    start = 0
+    while True:
+        if mode == "range":
+            sql = f"SELECT {fields} FROM {source} LIMIT {page_size};"
+        else:
+            sql = (
+                f"SELECT {fields} FROM {table} "
+                f"ORDER BY id START {start} LIMIT {page_size};"
+            )
+        count = 0
+        last = None
+        for row in stream_query(client, sql):
+            count += 1
+            last = row["id"]
+            yield row
+        if count < page_size:
+            return
+        source = f"{last}>.."
+        start += count
@@ -0,0 +1,166 @@
+"""Persistent SQLite cache for embedding vectors with LRU eviction."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Sequence
+
+from .embeddings import EmbeddingProvider
+
+DEFAULT_CACHE_ENTRIES = 1_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+    text_sha256 BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (provider, model, dimension, text_sha256)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used);
+"""
+
+
+class EmbeddingCache:
+    """
+    Vectors keyed by ``(provider, model, dimension, sha256(text))``.
+
+    Vectors are stored as packed float32 blobs in a single SQLite file.
+    Once more than `max_entries` rows exist, the least recently used ones
+    are evicted.  `hits` and `misses` count lookups since opening.
+    """
+
+    def __init__(self, path: Path | str, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._tick, self._count = self._db.execute(
+            "SELECT COALESCE(MAX(used), 0), COUNT(*) FROM embeddings"
+        ).fetchone()
+
+    def get_many(
+        self, provider: str, model: str, dimension: int, texts: Sequence[str]
+    ) -> list[list[float] | None]:
+        """Return the cached vector for each text, or None on a miss."""
+        out: list[list[float] | None] = []
+        with self._lock, self._db:
+            for text in texts:
+                key = (provider, model, dimension, _digest(text))
+                row = self._db.execute(
+                    "SELECT vector FROM embeddings WHERE provider = ? AND model = ?"
+                    " AND dimension = ? AND text_sha256 = ?",
+                    key,
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    out.append(None)
+                    continue
+                self.hits += 1
+                self._tick += 1
+                self._db.execute(
+                    "UPDATE embeddings SET used = ? WHERE provider = ? AND model = ?"
+                    " AND dimension = ? AND text_sha256 = ?",
+                    (self._tick, *key),
+                )
+                out.append(array("f", row[0]).tolist())
+        return out
+
+    def put_many(
+        self,
+        provider: str,
+        model: str,
+        dimension: int,
+        items: Sequence[tuple[str, Sequence[float]]],
+    ) -> None:
+        """Store ``(text, vector)`` pairs, evicting LRU rows past the cap."""
+        with self._lock, self._db:
+            for text, vector in items:
+                self._tick += 1
+                key = (provider, model, dimension, _digest(text))
+                blob = array("f", vector).tobytes()
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, blob, self._tick),
+                )
+                if cur.rowcount:
+                    self._count += 1
+                else:
+                    self._db.execute(
+                        "UPDATE embeddings SET vector = ?, used = ? WHERE provider = ?"
+                        " AND model = ? AND dimension = ? AND text_sha256 = ?",
+                        (blob, self._tick, *key),
+                    )
+            excess = self._count - self.max_entries
+            if excess > 0:
+                # `used` ticks are unique, so this drops exactly `excess` rows
+                cur = self._db.execute(
+                    "DELETE FROM embeddings WHERE used <="
+                    " (SELECT used FROM embeddings ORDER BY used LIMIT 1 OFFSET ?)",
+                    (excess - 1,),
+                )
+                self._count -= cur.rowcount
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class CachedEmbedder:
+    """Wrap an `EmbeddingProvider` so repeated texts are served from `cache`."""
+
+    def __init__(self, inner: EmbeddingProvider, cache: EmbeddingCache) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+        self.model = inner.model
+
+    @property
+    def dimension(self) -> int:
+        return self.inner.dimension
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        dim = self.dimension
+        vectors = self.cache.get_many(self.name, self.model, dim, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = self.inner.embed([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+            self.cache.put_many(
+                self.name, self.model, dim, [(texts[i], vectors[i]) for i in missing]
+            )
+        return vectors  # type: ignore[return-value]
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode()).digest()
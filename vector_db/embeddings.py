@@ -0,0 +1,188 @@
+"""Pluggable text embedding providers."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Protocol, Sequence
+
+import httpx
+
+if TYPE_CHECKING:
+    import numpy as np
+
+OLLAMA_URL = "http://localhost:11434"
+DEFAULT_OLLAMA_MODEL = "qwen3:0.6b"
+DEFAULT_EMBED_BATCH = 64
+DEFAULT_HASH_DIMENSION = 256
+
+_TOKEN = re.compile(r"\w+")
+
+
+class EmbeddingProvider(Protocol):
+    """Anything that turns a batch of texts into equally sized vectors."""
+
+    name: str
+    model: str
+
+    @property
+    def dimension(self) -> int: ...
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]: ...
+
+
+class HashEmbedder:
+    """Deterministic 3-dimensional SHA-256 embedding; needs no model."""
+
+    name = "hash"
+    model = "sha256"
+    dimension = 3
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        return [
+            [b / 255 for b in hashlib.sha256(t.encode()).digest()[:3]] for t in texts
+        ]
+
+
+class FeatureHashEmbedder:
+    """
+    Deterministic feature-hashed bag of word n-grams, L2-normalised.
+
+    Every word 1..`ngram`-gram is hashed to a column and a sign; a batch of
+    texts becomes one ``(len(texts), dimension)`` float32 matrix built with a
+    single scatter-add, so no model is needed to get realistic vectors of any
+    dimension.
+    """
+
+    name = "fhash"
+
+    def __init__(self, dimension: int = DEFAULT_HASH_DIMENSION, ngram: int = 2):
+        if dimension < 1:
+            raise ValueError("dimension must be at least 1")
+        if ngram < 1:
+            raise ValueError("ngram must be at least 1")
+        self.dimension = dimension
+        self.ngram = ngram
+        self.model = f"word1-{ngram}gram"
+
+    def embed_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """Return the embeddings of `texts` as a float32 matrix."""
+        import numpy as np  # only this provider needs it; keep the module light
+
+        rows: list[int] = []
+        hashes: list[int] = []
+        for i, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            for n in range(1, self.ngram + 1):
+                for j in range(len(tokens) - n + 1):
+                    hashes.append(_feature_hash(" ".join(tokens[j : j + n])))
+            rows.extend([i] * (len(hashes) - len(rows)))
+        h = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        cols = (h % np.uint64(self.dimension)).astype(np.intp)
+        signs = np.where(h >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+        mat = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        np.add.at(mat, (np.asarray(rows, dtype=np.intp), cols), signs)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        np.divide(mat, norms, out=mat, where=norms > 0)
+        return mat
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        return self.embed_matrix(texts).tolist()
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest())
+
+
+class OllamaEmbedder:
+    """
+    Embed through Ollama's ``/api/embed`` endpoint.
+
+    Texts are sent `batch_size` at a time over one keep-alive connection.
+    The vector dimension is learned from the first response.
+    """
+
+    name = "ollama"
+
+    def __init__(
+        self,
+        model: str = DEFAULT_OLLAMA_MODEL,
+        base_url: str = OLLAMA_URL,
+        batch_size: int = DEFAULT_EMBED_BATCH,
+        timeout: float = 60.0,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.model = model
+        self.batch_size = batch_size
+        self._dimension: int | None = None
+        self._client = httpx.Client(base_url=base_url, timeout=timeout)
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            self.embed(["dimension probe"])
+        assert self._dimension is not None
+        return self._dimension
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        out: list[list[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            res = self._client.post(
+                "/api/embed",
+                json={
+                    "model": self.model,
+                    "input": list(texts[start : start + self.batch_size]),
+                },
+            )
+            res.raise_for_status()
+            out.extend(res.json()["embeddings"])
+        if out:
+            self._dimension = len(out[0])
+        return out
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> "OllamaEmbedder":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+PROVIDERS = {
+    "hash": HashEmbedder,
+    "fhash": FeatureHashEmbedder,
+    "ollama": OllamaEmbedder,
+}
+
+
+def get_provider(name: str, **kwargs) -> EmbeddingProvider:
+    """Instantiate the provider registered as `name`."""
+    try:
+        cls = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"unknown embedding provider {name!r}") from None
+    return cls(**kwargs)
+
+
+def build_provider(
+    name: str,
+    model: str = DEFAULT_OLLAMA_MODEL,
+    dimension: int = DEFAULT_HASH_DIMENSION,
+    base_url: str = OLLAMA_URL,
+) -> EmbeddingProvider:
+    """
+    `get_provider` from the scripts' ``--embedder`` options.
+
+    Each provider gets only the options it takes: `model` and `base_url`
+    for ``ollama``, `dimension` for ``fhash``.
+    """
+    if name == "ollama":
+        return get_provider(name, model=model, base_url=base_url)
+    if name == "fhash":
+        return get_provider(name, dimension=dimension)
+    return get_provider(name)
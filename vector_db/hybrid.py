@@ -0,0 +1,132 @@
+"""Hybrid BM25 + kNN retrieval with rank fusion."""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+from .client import SurrealClient
+
+TEXT_ANALYZER = "doc_text"
+RRF_K = 60
+FUSIONS = ("rrf", "weighted")
+
+
+def text_index_ddl(table: str, field: str = "text") -> str:
+    """
+    Return the analyzer and BM25 ``SEARCH`` index statements for `field`.
+
+    Both are ``IF NOT EXISTS``, so they can be run again on every index.
+
+    The analyzer splits on blanks and character classes and lowercases,
+    so API names such as ``vector::distance::knn`` or ``index_docs`` are
+    matched on their parts.
+    """
+    return (
+        f"DEFINE ANALYZER IF NOT EXISTS {TEXT_ANALYZER} TOKENIZERS blank, class "
+        "FILTERS lowercase, ascii; "
+        f"DEFINE INDEX IF NOT EXISTS idx_{table}_{field} ON {table} FIELDS {field} "
+        f"SEARCH ANALYZER {TEXT_ANALYZER} BM25 HIGHLIGHTS;"
+    )
+
+
+def hybrid_query(
+    table: str,
+    k: int,
+    fields: str = "path",
+    text_field: str = "text",
+    vector_field: str = "embedding",
+    ef: int | None = None,
+) -> str:
+    """
+    Return the two statements run by `hybrid_search`.
+
+    The first ranks by BM25 on `text_field` against ``$text``, the second
+    by kNN on `vector_field` against ``$vector``; both return `k` rows.
+    """
+    knn = f"<|{k},{ef}|>" if ef else f"<|{k}|>"
+    return (
+        f"SELECT id, {fields}, search::score(1) AS bm25 FROM {table} "
+        f"WHERE {text_field} @1@ $text ORDER BY bm25 DESC LIMIT {k}; "
+        f"SELECT id, {fields}, vector::distance::knn() AS distance FROM {table} "
+        f"WHERE {vector_field} {knn} $vector ORDER BY distance;"
+    )
+
+
+def fuse_rrf(
+    rankings: Sequence[Sequence[Mapping[str, Any]]], k: int = RRF_K
+) -> dict[str, float]:
+    """Reciprocal rank fusion: sum ``1 / (k + rank)`` over each ranking."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, 1):
+            scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+def fuse_weighted(
+    text_hits: Sequence[Mapping[str, Any]],
+    vector_hits: Sequence[Mapping[str, Any]],
+    text_weight: float = 0.5,
+) -> dict[str, float]:
+    """
+    Weighted sum of min-max normalised scores.
+
+    BM25 scores map to [0, 1] with the best hit at 1; kNN distances are
+    flipped so the closest hit scores 1.  Rows missing from one list get 0
+    from it.
+    """
+    scores: dict[str, float] = {}
+    for hits, key, weight, flip in (
+        (text_hits, "bm25", text_weight, False),
+        (vector_hits, "distance", 1.0 - text_weight, True),
+    ):
+        if not hits:
+            continue
+        values = [row[key] for row in hits]
+        lo, hi = min(values), max(values)
+        for row, value in zip(hits, values):
+            norm = (value - lo) / (hi - lo) if hi > lo else 1.0
+            if flip and hi > lo:
+                norm = 1.0 - norm
+            scores[row["id"]] = scores.get(row["id"], 0.0) + weight * norm
+    return scores
+
+
+def hybrid_search(
+    client: SurrealClient,
+    table: str,
+    text: str,
+    vector: Sequence[float],
+    k: int = 10,
+    fusion: str = "rrf",
+    candidates: int | None = None,
+    text_weight: float = 0.5,
+    fields: str = "path",
+    ef: int | None = None,
+) -> list[dict]:
+    """
+    Run BM25 and kNN over `table` in one request and fuse the rankings.
+
+    Each side fetches `candidates` rows (default ``4 * k``).  `fusion` is
+    ``rrf`` (reciprocal rank fusion) or ``weighted`` (normalised scores
+    mixed by `text_weight`).  Returns up to `k` rows, best first, each with
+    its `fields`, a fused ``score`` and the ``bm25`` / ``distance`` it got
+    from either side.
+    """
+    if fusion not in FUSIONS:
+        raise ValueError(f"fusion must be one of {FUSIONS}, got {fusion!r}")
+    depth = candidates or 4 * k
+    text_hits, vector_hits = client.query(
+        hybrid_query(table, depth, fields, ef=ef),
+        {"text": text, "vector": list(vector)},
+    )
+    if fusion == "rrf":
+        scores = fuse_rrf([text_hits, vector_hits])
+    else:
+        scores = fuse_weighted(text_hits, vector_hits, text_weight)
+
+    rows: dict[str, dict] = {}
+    for row in (*text_hits, *vector_hits):
+        rows.setdefault(row["id"], {}).update(row)
+    ranked = sorted(scores, key=scores.__getitem__, reverse=True)[:k]
+    return [{**rows[i], "score": scores[i]} for i in ranked]
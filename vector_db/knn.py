@@ -0,0 +1,128 @@
+"""Exact, in-process k-nearest-neighbour search over a NumPy matrix."""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .client import SurrealClient
+from .cursor import DEFAULT_PAGE_SIZE, iter_table
+
+METRICS = ("euclidean", "cosine", "dot")
+
+
+class KnnIndex:
+    """
+    Brute-force top-k search over a contiguous float32 matrix.
+
+    Distances are ``euclidean``, ``cosine`` (1 - cosine similarity) or
+    ``dot`` (negated inner product, so smaller is always closer).  Queries
+    may be a single vector or a ``(q, d)`` batch; the whole batch is scored
+    with one matrix product and reduced with `np.argpartition`.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray | Sequence[Sequence[float]],
+        metric: str = "euclidean",
+    ) -> None:
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError("vectors must be an (n, d) matrix with one row per id")
+        self.ids = np.asarray(ids, dtype=object)
+        self.metric = metric
+        if metric == "cosine":
+            matrix = _normalise(matrix)
+        self.matrix = matrix
+        self._sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[dict], field: str = "embedding", metric: str = "euclidean"
+    ) -> "KnnIndex":
+        """Build an index from records holding ``id`` and `field`."""
+        ids: list[str] = []
+        vectors: list[Sequence[float]] = []
+        for row in rows:
+            ids.append(row["id"])
+            vectors.append(row[field])
+        return cls(ids, vectors, metric)
+
+    @classmethod
+    def from_table(
+        cls,
+        client: SurrealClient,
+        table: str,
+        field: str = "embedding",
+        metric: str = "euclidean",
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> "KnnIndex":
+        """Page every ``id`` and `field` of SurrealDB `table` into an index."""
+        rows = iter_table(client, table, f"id, {field}", page_size)
+        return cls.from_rows(rows, field, metric)
+
+    def distances(self, queries: np.ndarray | Sequence) -> np.ndarray:
+        """Return the ``(q, n)`` distance matrix from each query to every row."""
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if q.shape[1] != self.dimension:
+            raise ValueError(
+                f"query dimension {q.shape[1]} != index dimension {self.dimension}"
+            )
+        if self.metric == "cosine":
+            return 1.0 - _normalise(q) @ self.matrix.T
+        dots = q @ self.matrix.T
+        if self.metric == "dot":
+            return -dots
+        sq = np.einsum("ij,ij->i", q, q)[:, None] - 2 * dots + self._sq_norms
+        return np.sqrt(np.maximum(sq, 0.0))
+
+    def search(
+        self, queries: np.ndarray | Sequence, k: int
+    ) -> tuple[list[list[str]], np.ndarray]:
+        """
+        Return the `k` closest ids and their distances for each query.
+
+        The result is ``(ids, distances)`` with one row per query, ordered
+        from closest to furthest.  `k` is clipped to the size of the index.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        dist = self.distances(queries)
+        k = min(k, dist.shape[1])
+        if k < dist.shape[1]:
+            part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(k), (len(dist), k))
+        part_dist = np.take_along_axis(dist, part, axis=1)
+        order = np.argsort(part_dist, axis=1, kind="stable")
+        top = np.take_along_axis(part, order, axis=1)
+        return (
+            [self.ids[row].tolist() for row in top],
+            np.take_along_axis(part_dist, order, axis=1),
+        )
+
+
+def recall_at_k(found: Sequence[Sequence[str]], exact: Sequence[Sequence[str]]) -> float:
+    """Mean fraction of each exact top-k list present in the matching `found` list."""
+    if len(found) != len(exact):
+        raise ValueError("found and exact must hold one list per query")
+    if not exact:
+        return 0.0
+    hits = [len(set(f) & set(e)) / len(e) for f, e in zip(found, exact) if e]
+    return sum(hits) / len(exact)
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
@@ -0,0 +1,167 @@
+"""In-memory cache of kNN results with TTL, LRU eviction and write invalidation."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Sequence
+
+from .client import SurrealClient, knn_query
+
+if TYPE_CHECKING:  # only `watch` needs it; keep websockets out of plain use
+    from .rpc import RpcClient
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL = 300.0
+DEFAULT_RESOLUTION = 1e-4
+
+
+class KnnCache:
+    """
+    Results keyed by ``(table, generation, k, metric, fields, ef, vector)``.
+
+    Query vectors are snapped to a grid of `resolution` before hashing, so
+    repeated queries whose embeddings differ only by float noise share an
+    entry.  Entries expire `ttl` seconds after they are stored and the
+    least recently used are evicted past `max_entries`.  `invalidate` bumps
+    a table's generation, which makes every entry cached for it unreachable
+    at once; the stale entries then age out of the LRU.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        resolution: float = DEFAULT_RESOLUTION,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.resolution = resolution
+        self.clock = clock
+        self.generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        table: str,
+        k: int,
+        metric: str,
+        vector: Sequence[float],
+        fields: str = "id",
+        ef: int | None = None,
+    ) -> Hashable:
+        """
+        Return the cache key for a query.
+
+        `fields` and `ef` change the rows a query returns, so they are part
+        of the key.  Take the key before running the query and store the
+        result under it, so a write that lands in between is not hidden by
+        the result.
+        """
+        return (
+            table,
+            self.generations.get(table, 0),
+            k,
+            metric,
+            fields,
+            ef,
+            tuple(round(x / self.resolution) for x in vector),
+        )
+
+    def get(self, key: Hashable) -> Any:
+        """Return the result cached under `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: str) -> None:
+        """Forget every result cached for `table`."""
+        with self._lock:
+            self.generations[table] = self.generations.get(table, 0) + 1
+            self.invalidations += 1
+
+    async def watch(self, rpc: RpcClient, table: str) -> asyncio.Task:
+        """
+        Invalidate `table` whenever a ``LIVE`` query reports a change.
+
+        This catches writes made by other processes.  Returns once the
+        subscription is registered; cancel the returned task to end it.
+        """
+        live = await rpc.live(table)
+
+        async def consume() -> None:
+            try:
+                async for _ in live:
+                    self.invalidate(table)
+            finally:
+                await live.kill()
+
+        return asyncio.create_task(consume())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "invalidations": self.invalidations,
+        }
+
+
+def knn_search(
+    client: SurrealClient,
+    table: str,
+    vector: Sequence[float],
+    k: int = 10,
+    fields: str = "id",
+    cache: KnnCache | None = None,
+    metric: str = "euclidean",
+    ef: int | None = None,
+) -> list[dict]:
+    """
+    Return the `k` rows of `table` closest to `vector`, with ``distance``.
+
+    With `cache`, a repeated query is answered from memory; `metric` only
+    labels the cache key and must match the table's index.  Rows served
+    from the cache are shared between callers, so treat them as read-only.
+    """
+    if cache is not None:
+        key = cache.key(table, k, metric, vector, fields, ef)
+        rows = cache.get(key)
+        if rows is not None:
+            return rows
+    [rows] = client.query(knn_query(table, k, fields, ef), {"vector": list(vector)})
+    if cache is not None:
+        cache.put(key, rows)
+    return rows
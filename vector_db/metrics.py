@@ -0,0 +1,240 @@
+"""Dependency-free counters, gauges and histograms with Prometheus text output."""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Sequence
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+BYTE_BUCKETS = tuple(64 * 4**i for i in range(11))  # 64 B .. 64 MiB
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as exposed by Prometheus."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the `q` quantile by interpolating inside its bucket.
+
+        Values in the +Inf bucket are reported as the largest observation.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.max
+                low = self.buckets[i - 1] if i else 0.0
+                high = min(self.buckets[i], self.max)
+                return low + (high - low) * max(rank - seen, 0) / n
+            seen += n
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        result = {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+        for q in SUMMARY_QUANTILES:
+            result[f"p{q * 100:g}"] = self.quantile(q)
+        return result
+
+
+class Metrics:
+    """
+    A registry of labelled metric families.
+
+    Families are created on first use: `inc` makes a counter, `observe` a
+    histogram and `gauge` registers a callback read at exposition time, so
+    instrumented code needs no set-up beyond an optional `describe`.  All
+    updates take one lock and are safe across threads.  `render` returns
+    the Prometheus text format; `summary` a JSON-friendly dict with
+    estimated quantiles.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self.gauges: dict[str, Callable[[], float]] = {}
+        self.help: dict[str, str] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str) -> None:
+        self.help[name] = text
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            family = self.counters.setdefault(name, {})
+            family[key] = family.get(key, 0) + amount
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> None:
+        key = _labels(labels)
+        with self._lock:
+            family = self.histograms.setdefault(name, {})
+            hist = family.get(key)
+            if hist is None:
+                # every series of a family shares the buckets it was made with
+                buckets = self._buckets.setdefault(name, buckets)
+                hist = family[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextlib.contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the seconds spent in the ``with`` block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def gauge(self, name: str, read: Callable[[], float], text: str = "") -> None:
+        """Expose ``read()`` as gauge `name` whenever metrics are collected."""
+        self.gauges[name] = read
+        if text:
+            self.describe(name, text)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self.help:
+                lines.append(f"# HELP {name} {_escape_help(self.help[name])}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, read in sorted(self.gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{name} {_number(read())}")
+        with self._lock:
+            for name, counters in sorted(self.counters.items()):
+                header(name, "counter")
+                for key, value in sorted(counters.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_number(value)}")
+            for name, family in sorted(self.histograms.items()):
+                header(name, "histogram")
+                for key, hist in sorted(family.items()):
+                    total = 0
+                    for bound, n in zip((*hist.buckets, "+Inf"), hist.counts):
+                        total += n
+                        le = bound if bound == "+Inf" else _number(bound)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(key, le=le)} {total}"
+                        )
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Return ``{"gauges", "counters", "histograms"}`` keyed by name.
+
+        Series are keyed by their labels as ``"k=v,k=v"`` (``""`` if none);
+        histograms summarise to count, sum, mean, max and p50/p95/p99.
+        """
+        gauges = {name: read() for name, read in sorted(self.gauges.items())}
+        with self._lock:
+            return {
+                "gauges": gauges,
+                "counters": {
+                    name: {_label_key(k): v for k, v in sorted(family.items())}
+                    for name, family in sorted(self.counters.items())
+                },
+                "histograms": {
+                    name: {_label_key(k): h.summary() for k, h in family.items()}
+                    for name, family in sorted(self.histograms.items())
+                },
+            }
+
+    def dump(self, path: Path) -> None:
+        """Write `summary` to `path` as indented JSON."""
+        path.write_text(json.dumps(self.summary(), indent=2) + "\n", encoding="utf-8")
+
+
+def timer(metrics: Metrics | None, name: str, **labels: str):
+    """`Metrics.time`, or a no-op context when `metrics` is None."""
+    if metrics is None:
+        return contextlib.nullcontext()
+    return metrics.time(name, **labels)
+
+
+def percentiles_ms(samples: Sequence[float]) -> dict[str, float | None]:
+    """
+    Exact p50/p95/p99 of `samples` (seconds) in milliseconds.
+
+    Ranks are interpolated linearly, as ``numpy.percentile`` does; with no
+    samples every value is None.
+    """
+    ordered = sorted(samples)
+    result: dict[str, float | None] = {}
+    for q in SUMMARY_QUANTILES:
+        value = None
+        if ordered:
+            rank = q * (len(ordered) - 1)
+            low = int(rank)
+            high = min(low + 1, len(ordered) - 1)
+            value = ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+            value *= 1000
+        result[f"p{q * 100:g}_ms"] = value
+    return result
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_key(key: Labels) -> str:
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+def _format_labels(key: Labels, **extra: str) -> str:
+    pairs = (*key, *extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,62 @@
+"""Thin client for the resident ask_qwen server (``scripts/qwen_server.py``)."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import httpx
+
+DEFAULT_QWEN_SERVER = "http://127.0.0.1:8765"
+
+
+class QwenClient:
+    """
+    Send prompts to a warm ``qwen_server.py`` instead of spawning processes.
+
+    Pass `unix_socket` to talk to a server started with ``--unix``; `url`
+    is then only used for the Host header.  The connection is kept alive
+    across calls, so each request costs one local round trip plus model
+    time.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_QWEN_SERVER,
+        unix_socket: str | None = None,
+        timeout: float = 300.0,
+    ) -> None:
+        transport = httpx.HTTPTransport(uds=unix_socket) if unix_socket else None
+        self.http = httpx.Client(base_url=url, transport=transport, timeout=timeout)
+
+    def complete(
+        self,
+        prompts: Sequence[str],
+        model: str | None = None,
+        system: str | None = None,
+        max_tokens: int | None = None,
+    ) -> list[str]:
+        """Answer every prompt in one request; answers keep the prompt order."""
+        body: dict = {"prompts": list(prompts)}
+        options = {"model": model, "system": system, "max_tokens": max_tokens}
+        body.update({k: v for k, v in options.items() if v is not None})
+        res = self.http.post("/complete", json=body)
+        res.raise_for_status()
+        return res.json()["answers"]
+
+    def ask(self, prompt: str, **kwargs) -> str:
+        """Answer a single prompt."""
+        return self.complete([prompt], **kwargs)[0]
+
+    def health(self) -> dict:
+        res = self.http.get("/health")
+        res.raise_for_status()
+        return res.json()
+
+    def close(self) -> None:
+        self.http.close()
+
+    def __enter__(self) -> "QwenClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,107 @@
+"""Retrieval-augmented prompting over the indexed docs table."""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Sequence
+
+from .client import SurrealClient
+from .embeddings import EmbeddingProvider
+from .hybrid import hybrid_search
+
+DEFAULT_TOP_K = 4
+DEFAULT_CONTEXT_TOKENS = 2048
+DEFAULT_ANSWER_CACHE = 256
+CHARS_PER_TOKEN = 4
+
+SYSTEM_PROMPT = (
+    "Answer the question using only the documentation excerpts provided. "
+    "If they do not contain the answer, say so."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English/code)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def retrieve(
+    client: SurrealClient,
+    embedder: EmbeddingProvider,
+    question: str,
+    table: str = "docs",
+    k: int = DEFAULT_TOP_K,
+) -> list[dict]:
+    """Embed `question` and return the `k` best chunks by hybrid BM25 + kNN."""
+    [vector] = embedder.embed([question])
+    return hybrid_search(client, table, question, vector, k=k, fields="path, text")
+
+
+def build_messages(
+    question: str,
+    chunks: Sequence[dict],
+    max_tokens: int = DEFAULT_CONTEXT_TOKENS,
+) -> list[dict]:
+    """
+    Return chat messages with as many `chunks` as fit in `max_tokens`.
+
+    Chunks are added best first; the first one that does not fit is cut to
+    the remaining budget and the rest are dropped.  The question and the
+    system prompt count against the budget too.
+    """
+    tail = f"\n\nQuestion: {question}"
+    budget = max_tokens - estimate_tokens(SYSTEM_PROMPT) - estimate_tokens(tail)
+    parts = []
+    for chunk in chunks:
+        header = f"[{chunk.get('path', chunk['id'])}]\n"
+        cost = estimate_tokens(header + chunk["text"] + "\n\n")
+        if cost > budget:
+            room = (budget - estimate_tokens(header + "\n\n")) * CHARS_PER_TOKEN
+            if room > 0:
+                parts.append(header + chunk["text"][:room])
+            break
+        parts.append(header + chunk["text"])
+        budget -= cost
+    context = "\n\n".join(parts)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": context + tail},
+    ]
+
+
+class AnswerCache:
+    """
+    In-memory LRU of answers keyed by (model, question, retrieved ids).
+
+    Keying on the retrieved ids means a re-index that changes the context
+    misses the cache instead of serving a stale answer.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_ANSWER_CACHE) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, question: str, chunks: Sequence[dict]) -> tuple:
+        return (model, question.strip(), tuple(chunk["id"] for chunk in chunks))
+
+    def get(self, key: tuple) -> str | None:
+        answer = self._entries.get(key)
+        if answer is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, key: tuple, answer: str) -> None:
+        self._entries[key] = answer
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
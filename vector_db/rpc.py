@@ -0,0 +1,189 @@
+"""Multiplexed WebSocket RPC client for SurrealDB's ``/rpc`` endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from typing import Any, AsyncIterator, Mapping
+
+import jiter
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+
+from .client import (
+    DEFAULT_DATABASE,
+    DEFAULT_NAMESPACE,
+    DEFAULT_URL,
+    SurrealError,
+    check,
+)
+
+
+def ws_url(url: str) -> str:
+    """Map an ``http(s)://host:port`` server URL to its ``ws(s)://.../rpc`` endpoint."""
+    url = url.rstrip("/")
+    if url.startswith("http"):
+        url = "ws" + url[len("http") :]
+    return url if url.endswith("/rpc") else url + "/rpc"
+
+
+class RpcClient:
+    """
+    One long-lived WebSocket carrying many in-flight requests.
+
+    Every call is tagged with a fresh ``id`` and parked on a future; a
+    single reader task resolves futures as responses arrive, in any order.
+    Live query notifications carry no ``id`` and are routed by live query
+    UUID to the matching `LiveQuery` instead.  `query` and `raw` mirror
+    `AsyncSurrealClient`, so either can be handed to the same callers.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        user: str | None = "root",
+        password: str | None = "root",
+        namespace: str = DEFAULT_NAMESPACE,
+        database: str = DEFAULT_DATABASE,
+        timeout: float = 10.0,
+    ) -> None:
+        self.url = ws_url(url)
+        self.user = user
+        self.password = password
+        self.namespace = namespace
+        self.database = database
+        self.timeout = timeout
+        self._ws: ClientConnection | None = None
+        self._reader: asyncio.Task | None = None
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._live: dict[str, asyncio.Queue] = {}
+
+    async def connect(self) -> "RpcClient":
+        """Open the socket, sign in and select the namespace/database."""
+        self._ws = await connect(self.url, subprotocols=["json"], max_size=None)
+        self._reader = asyncio.create_task(self._read())
+        if self.user is not None:
+            await self.call("signin", {"user": self.user, "pass": self.password})
+        await self.call("use", self.namespace, self.database)
+        return self
+
+    async def _read(self) -> None:
+        assert self._ws is not None
+        error: BaseException = ConnectionError("RPC connection closed")
+        try:
+            async for message in self._ws:
+                if isinstance(message, str):
+                    message = message.encode()
+                self._dispatch(jiter.from_json(message))
+        except ConnectionClosed as exc:
+            error = exc
+        finally:
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(error)
+            self._pending.clear()
+            for queue in self._live.values():
+                queue.put_nowait(None)
+
+    def _dispatch(self, msg: dict) -> None:
+        msg_id = msg.get("id")
+        if msg_id is None:
+            note = msg.get("result") or {}
+            if "action" in note:
+                self._queue(str(note["id"])).put_nowait(note)
+            return
+        fut = self._pending.pop(msg_id, None)
+        if fut is None or fut.done():
+            return
+        if "error" in msg:
+            fut.set_exception(SurrealError(msg["error"].get("message", msg["error"])))
+        else:
+            fut.set_result(msg.get("result"))
+
+    def _queue(self, live_id: str) -> asyncio.Queue:
+        # notifications can beat the response that tells us the live id
+        return self._live.setdefault(live_id, asyncio.Queue())
+
+    async def call(self, method: str, *params: Any) -> Any:
+        """Send one RPC request and wait for its result."""
+        if self._ws is None:
+            raise RuntimeError("RpcClient is not connected")
+        msg_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = fut
+        try:
+            await self._ws.send(
+                json.dumps({"id": msg_id, "method": method, "params": list(params)})
+            )
+            return await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self._pending.pop(msg_id, None)
+
+    async def raw(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> list[dict]:
+        """Run `sql`; return the per-statement ``{status, result, time}`` list."""
+        return await self.call("query", sql, dict(params or {}))
+
+    async def query(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> list[Any]:
+        """Run `sql`; return each statement's result, raising on errors."""
+        return check(await self.raw(sql, params))
+
+    async def live(self, table: str, diff: bool = False) -> "LiveQuery":
+        """Subscribe to every change on `table`."""
+        return LiveQuery(self, str(await self.call("live", table, diff)))
+
+    async def live_query(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> "LiveQuery":
+        """Start a ``LIVE SELECT ...`` statement and subscribe to it."""
+        [live_id] = await self.query(sql, params)
+        return LiveQuery(self, str(live_id))
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+        self._ws = self._reader = None
+
+    async def __aenter__(self) -> "RpcClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+
+class LiveQuery:
+    """
+    Async iterator over the notifications of one live query.
+
+    Each item is the server's ``{action, id, result}`` object.  Iteration
+    ends after `kill` or when the connection closes.
+    """
+
+    def __init__(self, client: RpcClient, live_id: str) -> None:
+        self.client = client
+        self.id = live_id
+        self._queue = client._queue(live_id)
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        return self
+
+    async def __anext__(self) -> dict:
+        note = await self._queue.get()
+        if note is None:
+            raise StopAsyncIteration
+        return note
+
+    async def kill(self) -> None:
+        """Stop the live query on the server and end iteration."""
+        self.client._live.pop(self.id, None)
+        try:
+            await self.client.call("kill", self.id)
+        finally:
+            self._queue.put_nowait(None)
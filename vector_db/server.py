@@ -0,0 +1,96 @@
+"""Start throwaway instances of the bundled SurrealDB binary."""
+
+from __future__ import annotations
+
+import socket
+import subprocess
+import time
+from pathlib import Path
+
+import httpx
+
+SURREAL_BIN = Path(__file__).resolve().parents[1] / "bin" / "surreal"
+
+
+def free_port() -> int:
+    """Return a TCP port on 127.0.0.1 that is free right now."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class SurrealServer:
+    """
+    An in-memory ``bin/surreal`` process on its own port.
+
+    Use as a context manager; `url` is ready for queries once ``__enter__``
+    returns and the process is killed on exit.
+    """
+
+    def __init__(
+        self,
+        port: int | None = None,
+        binary: Path = SURREAL_BIN,
+        user: str = "root",
+        password: str = "root",
+        startup_timeout: float = 30.0,
+    ) -> None:
+        self.port = port or free_port()
+        self.binary = binary
+        self.user = user
+        self.password = password
+        self.startup_timeout = startup_timeout
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._proc: subprocess.Popen | None = None
+
+    def start(self) -> None:
+        if not self.binary.exists():
+            raise FileNotFoundError(f"SurrealDB binary not found at {self.binary}")
+        self._proc = subprocess.Popen(
+            [
+                str(self.binary),
+                "start",
+                "memory",
+                "--user",
+                self.user,
+                "--pass",
+                self.password,
+                "--allow-guests",
+                "--bind",
+                f"127.0.0.1:{self.port}",
+                "--log",
+                "none",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"surreal exited with code {self._proc.returncode}")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.1)
+        self.stop()
+        raise TimeoutError(f"surreal not ready on {self.url}")
+
+    def stop(self) -> None:
+        if self._proc is None:
+            return
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+
+    def __enter__(self) -> "SurrealServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
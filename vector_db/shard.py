@@ -0,0 +1,130 @@
+"""Hash-partitioned tables across several SurrealDB endpoints or namespaces."""
+
+from __future__ import annotations
+
+import heapq
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Mapping, Sequence
+
+from .client import (
+    DEFAULT_DATABASE,
+    DEFAULT_NAMESPACE,
+    DEFAULT_URL,
+    SurrealClient,
+    knn_query,
+)
+
+
+def shard_of(key: str, num_shards: int) -> int:
+    """Stable shard for `key`: CRC-32 of its UTF-8 bytes modulo `num_shards`."""
+    return zlib.crc32(key.encode()) % num_shards
+
+
+class ShardedClient:
+    """
+    One `SurrealClient` per shard plus a thread pool to drive them at once.
+
+    Shards are separate servers (`from_urls`) or separate namespaces of one
+    server (`from_namespaces`).  Records are routed by `shard_of` their key,
+    DDL and queries are broadcast, and `knn` merges each shard's top-k by
+    distance.  Use as a context manager to close every client.
+    """
+
+    def __init__(self, clients: Sequence[SurrealClient]) -> None:
+        if not clients:
+            raise ValueError("at least one shard is required")
+        self.clients = list(clients)
+        self._pool = ThreadPoolExecutor(len(self.clients), "shard")
+
+    @classmethod
+    def from_urls(
+        cls,
+        urls: Sequence[str],
+        user: str | None = "root",
+        password: str | None = "root",
+        namespace: str = DEFAULT_NAMESPACE,
+        database: str = DEFAULT_DATABASE,
+        **options: Any,
+    ) -> "ShardedClient":
+        return cls(
+            [
+                SurrealClient(url, user, password, namespace, database, **options)
+                for url in urls
+            ]
+        )
+
+    @classmethod
+    def from_namespaces(
+        cls,
+        namespaces: Sequence[str],
+        url: str = DEFAULT_URL,
+        user: str | None = "root",
+        password: str | None = "root",
+        database: str = DEFAULT_DATABASE,
+        **options: Any,
+    ) -> "ShardedClient":
+        return cls(
+            [
+                SurrealClient(url, user, password, ns, database, **options)
+                for ns in namespaces
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def shard_for(self, key: str) -> SurrealClient:
+        return self.clients[shard_of(key, len(self.clients))]
+
+    def submit(self, shard: int, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run ``fn(client, *args)`` on the pool for shard number `shard`."""
+        return self._pool.submit(fn, self.clients[shard], *args)
+
+    def map(self, fn: Callable[..., Any], *args: Any) -> list[Any]:
+        """Run ``fn(client, *args)`` on every shard at once; return the results."""
+        futures = [self.submit(i, fn, *args) for i in range(len(self.clients))]
+        return [f.result() for f in futures]
+
+    def raw(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> list[list[dict]]:
+        """Broadcast `sql`; errors are returned per shard, not raised."""
+        return self.map(SurrealClient.raw, sql, params)
+
+    def query(
+        self, sql: str, params: Mapping[str, Any] | None = None
+    ) -> list[list[Any]]:
+        """Broadcast `sql`; raises if any shard reports an error."""
+        return self.map(SurrealClient.query, sql, params)
+
+    def knn(
+        self,
+        table: str,
+        vector: Sequence[float],
+        k: int = 10,
+        fields: str = "id",
+        ef: int | None = None,
+    ) -> list[dict]:
+        """
+        Return the `k` rows closest to `vector` across every shard.
+
+        Each shard answers its own top-`k` concurrently; the union is
+        merged by ``distance``, which is exact because every global top-k
+        row is in the top-k of its own shard.
+        """
+        sql = knn_query(table, k, fields, ef)
+        partials = self.query(sql, {"vector": list(vector)})
+        rows = (row for [shard_rows] in partials for row in shard_rows)
+        return heapq.nsmallest(k, rows, key=lambda row: row["distance"])
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        for client in self.clients:
+            client.close()
+
+    def __enter__(self) -> "ShardedClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()